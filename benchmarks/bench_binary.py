@@ -0,0 +1,36 @@
+"""Load times of the binary database format."""
+import os
+import tempfile
+
+from common import timed, report
+from thermodata import binary
+from thermodata import thermoinp
+
+
+def main():
+    db, seconds = timed(thermoinp.DB)
+    report('thermo.inp parse (all species)', len(db.all), seconds,
+           unit='species')
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'thermo.tdb')
+    try:
+        _, seconds = timed(binary.write, db, path)
+        report('binary write (all species)', len(db.all), seconds,
+               unit='species')
+        bdb, seconds = timed(binary.BinaryDB, path)
+        report('binary open (all species)', len(bdb), seconds,
+               unit='species')
+        _, seconds = timed(bdb.verify)
+        report('binary verify (all species)', len(bdb), seconds,
+               unit='species')
+        loaded, seconds = timed(bdb.to_db)
+        report('binary to DB (all species)', len(loaded.all), seconds,
+               unit='species')
+        del bdb
+    finally:
+        os.remove(path)
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
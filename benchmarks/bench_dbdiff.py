@@ -0,0 +1,23 @@
+"""Content hashing and diff rates of database versions."""
+from common import timed, report
+from thermodata import thermoinp
+
+
+def main():
+    old, new = thermoinp.DB(), thermoinp.DB()
+
+    def content_hashes():
+        for record in new.all:
+            record.__dict__.pop('_content_hash', None)
+        return [record.content_hash for record in new.all]
+
+    hashes, seconds = timed(content_hashes)
+    report('content hash (all species)', len(hashes), seconds,
+           unit='species')
+    _, seconds = timed(old.diff, new)
+    report('diff (all species, hashed)', len(new.all), seconds,
+           unit='species')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Equilibrium solver and sweep throughput."""
+import os
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.equilibrium import Equilibrium
+from thermodata.sweep import Sweep
+
+
+def main():
+    db = thermoinp.DB()
+    reactants = Mixture.from_composition(
+        {'CH4': 1., 'O2': np.linspace(1., 3., 2000), 'N2': 7.52}, db)
+    eq = Equilibrium(reactants.elements, db)
+    b = reactants.element_moles(eq.elements)
+
+    _, seconds = timed(eq.tp, b, 2500., 1e5)
+    report('tp (CHON, cold start)', len(b), seconds)
+    _, seconds = timed(eq.hp, b, reactants.h(298.15), 1e5)
+    report('hp (CHON, cold start)', len(b), seconds)
+
+    sweep = Sweep({'CH4': 1.}, {'O2': 1.}, db)
+    of, P = np.linspace(2., 6., 40), np.logspace(5., 7., 10)
+    T = np.linspace(1500., 4000., 51)
+    count = len(of) * len(P) * len(T)
+    _, seconds = timed(sweep.solve, of, P, T)
+    report('sweep (CHO, continuation, serial)', count, seconds)
+
+    cores = multiprocessing.cpu_count()
+    with tempfile.TemporaryDirectory() as tmpd:
+        path = os.path.join(tmpd, 'sweep.npy')
+        _, seconds = timed(sweep.run, of, P, T, path, processes=cores)
+    report('sweep (CHO, process pool)', count, seconds, cores=cores)
+
+
+if __name__ == '__main__':
+    main()
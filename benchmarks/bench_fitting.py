@@ -0,0 +1,27 @@
+"""Polynomial fitting throughput (refits of the database gases)."""
+import numpy as np
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+from thermodata.fitting import fit
+
+
+def main():
+    db = thermoinp.DB()
+    records = [r for r in db.gaseous if r.nintervals >= 2 and
+               r.intervals[0].lim == (200., 1000.) and
+               r.intervals[1].lim[1] == 6000.]
+    pa = PolyArray(records)
+    T = np.linspace(200., 6000., 581)
+    cp, h298, s298 = pa.cpmol(T).T, pa.hmol(298.15), pa.smol(298.15)
+    _, seconds = timed(fit, T, cp, h298, s298)
+    report('fit (shared grid)', len(records), seconds, unit='species')
+    T = np.broadcast_to(T, cp.shape)
+    _, seconds = timed(fit, T, cp, h298, s298)
+    report('fit (per-species grids)', len(records), seconds,
+           unit='species')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""Adiabatic flame temperature throughput."""
+import numpy as np
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.flame import flame_temperature
+
+
+def main():
+    db = thermoinp.DB()
+    reactants = Mixture.from_composition(
+        {'Jet-A(g)': 1., 'Air': np.linspace(40., 120., 10000)}, db)
+    T0 = np.linspace(300., 700., 10000)
+    _, seconds = timed(flame_temperature, reactants, T0, db=db)
+    report('flame temperature (frozen)', len(T0), seconds)
+    _, seconds = timed(flame_temperature, reactants, T0, db=db,
+                       equilibrium=True)
+    report('flame temperature (equilibrium)', len(T0), seconds)
+
+
+if __name__ == '__main__':
+    main()
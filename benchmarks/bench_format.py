@@ -0,0 +1,41 @@
+"""Output rates of thermo.inp formatting and subset files."""
+import os
+import random
+import shutil
+import tempfile
+
+from common import timed, report
+from thermodata import thermoinp
+
+
+def main():
+    db = thermoinp.DB()
+    _, seconds = timed(db.format)
+    report('format (all species)', len(db.all), seconds, unit='species')
+
+    random.seed(0)
+    names = sorted(db._dict)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        subsets = {os.path.join(tmpdir, 'case{:04d}.inp'.format(k)):
+                   random.sample(names, 20) for k in range(1000)}
+
+        def each():
+            for path, species in subsets.items():
+                species = set(species)
+                with open(path, 'w') as f:
+                    f.write(db.subset(
+                        filt=lambda r: r.name in species).format())
+
+        _, seconds = timed(each)
+        report('subset + format files (20 species)', len(subsets),
+               seconds, unit='files')
+        _, seconds = timed(db.write_subsets, subsets)
+        report('write_subsets files (20 species)', len(subsets),
+               seconds, unit='files')
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""Heating-value throughput for the whole database."""
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.fuel import heating_values
+
+
+def main():
+    db = thermoinp.DB()
+    result, seconds = timed(heating_values, db.all, db)
+    report('heating values (all species)', len(result.species), seconds,
+           unit='species')
+
+
+if __name__ == '__main__':
+    main()
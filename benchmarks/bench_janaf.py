@@ -0,0 +1,24 @@
+"""Reference table generation for the whole database."""
+import os
+import tempfile
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.janaf import JanafTables
+
+
+def main():
+    db = thermoinp.DB()
+    tables, seconds = timed(JanafTables, db)
+    count = tables.data.size
+    report('tables (evaluation)', count, seconds, unit='entries')
+    path = os.path.join(tempfile.mkdtemp(), 'janaf.txt')
+    _, seconds = timed(tables.write, path)
+    report('tables (formatted, pool)', len(tables.species), seconds,
+           unit='species')
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main()
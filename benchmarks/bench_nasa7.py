@@ -0,0 +1,27 @@
+"""NASA-7 conversion and export throughput for the whole database."""
+import os
+import tempfile
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata import nasa7
+
+
+def main():
+    db = thermoinp.DB()
+    result, seconds = timed(nasa7.convert, db.all)
+    report('convert (all species)', len(result.records), seconds,
+           unit='species')
+    tmpd = tempfile.mkdtemp()
+    for name, write in (('chemkin', nasa7.write_chemkin),
+                        ('yaml', nasa7.write_yaml)):
+        path = os.path.join(tmpd, name)
+        _, seconds = timed(write, result, path)
+        report('write ({})'.format(name), len(result.records), seconds,
+               unit='species')
+        os.remove(path)
+    os.rmdir(tmpd)
+
+
+if __name__ == '__main__':
+    main()
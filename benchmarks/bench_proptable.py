@@ -0,0 +1,29 @@
+"""Mixture property table throughput."""
+import os
+import tempfile
+
+import numpy as np
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.proptable import PropertyTable, write_binary
+
+
+def main():
+    db = thermoinp.DB()
+    table = PropertyTable([{'CH4': 1.}, {'N2': 0.79, 'O2': 0.21}], db)
+    T = np.linspace(200., 3000., 2801)
+    Z = np.linspace(0., 1., 501)
+    result, seconds = timed(table.run, T, Z, processes=1)
+    report('table (serial)', result.data.size, seconds, unit='points')
+    result, seconds = timed(table.run, T, Z)
+    report('table (pool)', result.data.size, seconds, unit='points')
+    path = os.path.join(tempfile.mkdtemp(), 'table.npz')
+    _, seconds = timed(write_binary, result, path)
+    report('write (binary)', result.data.size, seconds, unit='points')
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Property query throughput over the whole database."""
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.query import Field
+
+
+def main():
+    db = thermoinp.DB()
+    db.query('cp', 300.)                    # build the cached polynomials
+    for T in (300., 1500., 15000.):
+        results, seconds = timed(db.query, 'cp', T, gt=30.)
+        report('cp query at {:g} K (all species)'.format(T), len(db.all),
+               seconds, unit='species')
+    results, seconds = timed(db.query, 'h_formation', ge=-100e3, le=0.)
+    report('h_formation query (all species)', len(db.all), seconds,
+           unit='species')
+
+    ions = ((Field('category') == 'gaseous') & (Field('charge') != 0) &
+            (Field('molwt') < 50.))
+    db.where(ions)                          # build the cached columns
+    results, seconds = timed(db.where, ions)
+    report('metadata predicate (all species)', len(db.all), seconds,
+           unit='species')
+    results, seconds = timed(db.subset, where=Field('phase') == 0)
+    report('subset by predicate (all species)', len(db.all), seconds,
+           unit='species')
+
+    index = db.coverage                     # build the interval index
+    for name, query, args in (('stabbing query at 15000 K', index.valid,
+                               (15000.,)),
+                              ('coverage query 300-5000 K', index.covering,
+                               (300., 5000.))):
+        results, seconds = timed(query, *args)
+        report(name, len(results), seconds, unit='species')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Load rates and memory of database versions in a registry."""
+import gc
+import tracemalloc
+
+from common import timed, report
+from thermodata import registry
+from thermodata import thermoinp
+
+
+def memory(function, *args):
+    """Return (result, bytes allocated and held by the call)."""
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def main():
+    nversions = 4
+    db, seconds = timed(thermoinp.DB)
+    report('thermo.inp parse (all species)', len(db.all), seconds,
+           unit='species')
+
+    def separate():
+        return [thermoinp.DB() for _ in range(nversions)]
+
+    def shared():
+        reg = registry.Registry()
+        for k in range(nversions):
+            reg.load(k)
+        return reg
+
+    reg, seconds = timed(shared)
+    report('registry load (4 versions)', nversions * len(db.all),
+           seconds, unit='species')
+    for label, function in (('separate DBs', separate),
+                            ('registry', shared)):
+        _, held = memory(function)
+        print('{:<40s}{:>10d} bytes'.format(
+            '{} memory (4 versions)'.format(label), held))
+
+
+if __name__ == '__main__':
+    main()
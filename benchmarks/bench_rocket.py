@@ -0,0 +1,26 @@
+"""Rocket performance trade-study throughput."""
+import numpy as np
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.rocket import Rocket
+
+
+def main():
+    db = thermoinp.DB()
+    propellants = Mixture.from_composition(
+        {'RP-1': 1., 'O2(L)': np.linspace(2., 3.4, 50)}, db, basis='mass')
+    area_ratio = np.linspace(2., 100., 100)
+    count = 50 * len(area_ratio)
+    for frozen in (False, True):
+        def trade():
+            rocket = Rocket(propellants, 7e6, db=db)
+            return rocket.exit(area_ratio=area_ratio, frozen=frozen)
+        _, seconds = timed(trade)
+        report('rocket exit ({})'.format('frozen' if frozen else
+                                         'shifting'), count, seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""Database access rates with and without the shared database."""
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.thermodata import ChemDB
+
+
+def main():
+    requests = 10
+
+    def load():
+        return [thermoinp.DB() for _ in range(requests)]
+
+    def shared():
+        return [thermoinp.shared() for _ in range(requests)]
+
+    def chemdb():
+        return [ChemDB() for _ in range(requests)]
+
+    for name, function in (('DB() requests', load),
+                           ('shared() requests', shared),
+                           ('ChemDB() requests', chemdb)):
+        _, seconds = timed(function)
+        report(name, requests, seconds, unit='requests')
+
+
+if __name__ == '__main__':
+    main()
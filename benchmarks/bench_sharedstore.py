@@ -0,0 +1,43 @@
+"""Publishing, attaching and pickling costs of the shared store."""
+import pickle
+
+from common import timed, report
+from thermodata import sharedstore
+from thermodata import thermoinp
+
+
+def main():
+    db = thermoinp.DB()
+
+    def publish():
+        with sharedstore.publish(db) as store:
+            return len(store)
+
+    count, seconds = timed(publish)
+    report('shared store publish (all species)', count, seconds,
+           unit='species')
+    store = sharedstore.publish(db)
+    shared = store.to_db()
+    for label, records in (('thermo.inp', db.all), ('shared', shared.all)):
+        data, seconds = timed(pickle.dumps, records)
+        report('pickle {} records'.format(label), len(records), seconds,
+               unit='species')
+        print('{:<40s}{:>10d} bytes'.format('  pickled size', len(data)))
+        _, seconds = timed(pickle.loads, data)
+        report('unpickle {} records'.format(label), len(records), seconds,
+               unit='species')
+
+    def attach():
+        attached = sharedstore.SharedStore(store.handle)
+        attached.close()
+        return len(store)
+
+    count, seconds = timed(attach)
+    report('shared store attach (all species)', count, seconds,
+           unit='species')
+    store.close()
+    store.unlink()
+
+
+if __name__ == '__main__':
+    main()
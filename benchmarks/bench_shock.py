@@ -0,0 +1,26 @@
+"""Shock and isentropic-flow throughput."""
+import numpy as np
+
+from common import timed, report
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata import shock
+
+
+def main():
+    db = thermoinp.DB()
+    air = Mixture.from_composition({'N2': 0.78, 'O2': 0.21, 'Ar': 0.01},
+                                   db)
+    M = np.linspace(1.1, 25., 100000)
+    _, seconds = timed(shock.normal_shock, air, M, 220., 1e3)
+    report('normal shock', len(M), seconds)
+    _, seconds = timed(shock.isentropic, air, M, 3000., 1e6)
+    report('isentropic flow', len(M), seconds)
+    theta = np.radians(np.linspace(1., 30., 1000))
+    _, seconds = timed(shock.oblique_shock, air, 8., 220., 1e3,
+                       theta=theta)
+    report('oblique shock (deflection)', len(theta), seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Export and query times of the SQLite database."""
+import os
+import tempfile
+
+from common import timed, report
+from thermodata import sqlitedb
+from thermodata import thermoinp
+
+
+def main():
+    db = thermoinp.DB()
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'thermo.sqlite')
+
+    def export():
+        if os.path.exists(path):
+            os.remove(path)
+        sqlitedb.export(db, path)
+
+    try:
+        _, seconds = timed(export)
+        report('SQLite export (all species)', len(db.all), seconds,
+               unit='species')
+        sdb = sqlitedb.SQLiteDB(path)
+        found, seconds = timed(sdb.lookup, 'CH4')
+        report('SQLite lookup (CH4)', len(found), seconds, unit='species')
+        subset, seconds = timed(sdb.subset, 'C.*', T=(300., 5000.),
+                                sql='molwt < ?', params=(50.,))
+        report('SQLite subset (C.*, 300-5000 K)',
+               len(subset.all), seconds, unit='species')
+        subset, seconds = timed(db.subset, 'C.*', T=(300., 5000.),
+                                filt=lambda r: r.molwt < 50.)
+        report('DB subset (C.*, 300-5000 K)',
+               len(subset.all), seconds, unit='species')
+        sdb.close()
+    finally:
+        os.remove(path)
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""XML export and load throughput for the whole database."""
+import os
+import tempfile
+
+from common import timed, report
+from thermodata.thermodata import ChemDB
+
+
+def main():
+    db = ChemDB()
+    db.select()
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'chemdb.xml')
+
+    def write():
+        if os.path.exists(path):
+            os.remove(path)
+        db.write(path)
+
+    try:
+        _, seconds = timed(write)
+        report('XML write (all species)', len(db), seconds, unit='species')
+        loaded, seconds = timed(ChemDB.from_xml, path)
+        report('XML load (all species)', len(loaded), seconds,
+               unit='species')
+    finally:
+        os.remove(path)
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""Timing helpers shared by the benchmark scripts."""
+import os
+import sys
+import time
+
+# Run from a checkout without installing the package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(function, *args, **kwargs):
+    """Return (result, best of three wall-clock times in seconds)."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def report(name, count, seconds, unit='states', cores=1):
+    """Print the throughput of a benchmark case."""
+    line = '{:<40s}{:>10d} {}  {:>12.0f} {}/s'.format(
+        name, count, unit, count / seconds, unit)
+    if cores > 1:
+        line += '  {:>10.0f} {}/s/core'.format(count / seconds / cores, unit)
+    print(line)
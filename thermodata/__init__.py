@@ -0,0 +1,29 @@
+"""Interface to the NASA Glenn thermodynamic database.
+
+Submodules are imported on first access as attributes of the package,
+so that importing the package itself is cheap:
+
+    >>> import thermodata
+    >>> db = thermodata.thermoinp.DB()      # imports thermoinp
+"""
+import importlib
+
+
+# Submodules, imported on first access (see `__getattr__`)
+SUBMODULES = ('binary', 'constants', 'dbdiff', 'equilibrium', 'fitting',
+              'flame', 'fuel', 'intervalindex', 'janaf', 'kinetics',
+              'mixture', 'nasa7', 'phase', 'poly', 'polyarray',
+              'proptable', 'query', 'registry', 'rocket', 'sharedstore',
+              'shock', 'sqlitedb', 'sweep', 'thermodata', 'thermoinp',
+              'workers')
+
+
+def __getattr__(name):
+    # Import a submodule, which is then an attribute of the package
+    if name in SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    errmsg = "module {!r} has no attribute {!r}".format(__name__, name)
+    raise AttributeError(errmsg)
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES))
@@ -0,0 +1,8 @@
+# Generated from data/constants.xml by constants.freeze();
+# do not edit.
+VALUES = {
+    'cea molar gas constant': 8.31451,
+    'molar gas constant': 8.3144621,
+    'molar mass constant': 0.001,
+    'standard-state pressure': 100000.0,
+}
@@ -0,0 +1,385 @@
+"""Compact binary database format with memory-mapped loading.
+
+A binary database holds the polynomial arrays of every species of a
+`thermoinp.DB` together with the species metadata and a name table in
+a single file which is opened with `numpy.memmap`. Opening reads only
+the header; the arrays are zero-copy views of the file, so that only
+the pages actually used are read from disk.
+
+    >>> write(thermoinp.DB(), 'thermo.tdb')
+    >>> bdb = BinaryDB('thermo.tdb')
+    >>> bdb.coeffs[bdb.slice('CO2')]        # (nintervals, 9) view
+    >>> bdb.record('CO2')                   # SpeciesRecord
+    >>> db = bdb.to_db()                    # thermoinp.DB
+
+The image of the file is also returned by `dumps` and opened from a
+buffer by `BinaryDB.from_buffer` (see `sharedstore`).
+
+Layout (version 1, little-endian)
+---------------------------------
+
+    header   : magic b'THERMODB', version (uint32), number of species
+               (uint32), number of intervals (uint32) and number of
+               sections (uint32)
+    sections : one entry per section; name (16 bytes, NUL padded),
+               offset and size in bytes (uint64) and CRC-32 (uint32)
+    checksum : CRC-32 (uint32) of the header and section table
+    data     : the sections, each aligned to `ALIGN` bytes
+
+The sections are those of `SECTIONS`. Per species ('meta', see
+`META`) are the phase, product flag, category, number of intervals,
+first interval, molar mass, heat of formation and assigned enthalpy
+and its temperature (NaN where undefined). Per interval are the
+coefficients a1..a7, b1, b2 ('coeffs', as `polyarray.PolyArray`), the
+bounds ('bounds') and H(298.15) - H(0) ('dh'). Strings are stored as
+UTF-8 blobs with (nspecies + 1) uint64 offsets: names, comments,
+reference codes, formulae and, optionally, the source datasets
+('text', for `thermoinp.DB.format`).
+
+The section checksums are verified by `BinaryDB.verify` (or on opening
+with verify=True), which reads the whole file.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+from thermodata import poly
+from thermodata import thermoinp
+from thermodata.polyarray import EXPONENTS
+
+
+MAGIC = b'THERMODB'
+VERSION = 1
+
+# Alignment of the sections, bytes
+ALIGN = 64
+
+_HEADER = struct.Struct('<8sIIII')
+_SECTION = struct.Struct('<16sQQI')
+_CHECKSUM = struct.Struct('<I')
+
+# Species metadata; category indexes thermoinp.DB.list_categories()
+META = np.dtype([('phase', '<i4'),
+                 ('isproduct', 'u1'),
+                 ('category', 'u1'),
+                 ('nintervals', '<i2'),
+                 ('start', '<u4'),
+                 ('molwt', '<f8'),
+                 ('h_formation', '<f8'),
+                 ('h_assigned', '<f8'),
+                 ('T_reference', '<f8')])
+
+# String tables (SpeciesRecord fields)
+STRINGS = ('name', 'comments', 'refcode', 'formula')
+
+# Sections: name, dtype, trailing shape ('species' and 'intervals' are
+# the leading dimensions of the array sections; blobs are bytes)
+SECTIONS = (('meta', META, 'species', ()),
+            ('coeffs', '<f8', 'intervals', (9,)),
+            ('bounds', '<f8', 'intervals', (2,)),
+            ('dh', '<f8', 'intervals', ()))
+
+
+def write(db, path, text=True):
+    """Write a database in the binary format.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB instance
+        path : output file name
+        text : store the source datasets (needed to format the loaded
+            database as thermo.inp)
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps(db, text))
+
+def dumps(db, text=True):
+    """Return a database in the binary format (bytes), as `write`."""
+    records, categories = [], []
+    for k, category in enumerate(db.list_categories()):
+        records.extend(getattr(db, category))
+        categories.extend([k] * len(getattr(db, category)))
+
+    nintervals = [r.nintervals for r in records]
+    start = np.concatenate(([0], np.cumsum(nintervals)))
+    meta = np.zeros(len(records), META)
+    meta['phase'] = [r.phase for r in records]
+    meta['isproduct'] = [r.isproduct for r in records]
+    meta['category'] = categories
+    meta['nintervals'] = nintervals
+    meta['start'] = start[:-1]
+    meta['molwt'] = [r.molwt for r in records]
+    for field in ('h_formation', 'h_assigned', 'T_reference'):
+        meta[field] = [np.nan if getattr(r, field) is None else
+                       getattr(r, field) for r in records]
+
+    intervals = [i for r in records for i in (r.intervals or ())]
+    for record in records:
+        if any(tuple(i.exp) != EXPONENTS for i in record.intervals or ()):
+            errmsg = "{} has non-standard exponents.".format(record.name)
+            raise ValueError(errmsg)
+    coeffs = np.array([tuple(i.a[:7]) + tuple(i.b) for i in intervals],
+                      dtype='<f8').reshape(-1, 9)
+    bounds = np.array([i.lim for i in intervals], dtype='<f8').reshape(-1, 2)
+    dh = np.array([i.dh for i in intervals], dtype='<f8')
+
+    sections = [('meta', meta), ('coeffs', coeffs), ('bounds', bounds),
+                ('dh', dh)]
+    for field in STRINGS:
+        sections.extend(_strings(field, [getattr(r, field) for r in records]))
+    if text:
+        sections.extend(_strings('text', [r.formatted for r in records]))
+
+    # Section offsets follow the header, section table and checksum.
+    offset = _HEADER.size + len(sections) * _SECTION.size + _CHECKSUM.size
+    table = []
+    for name, array in sections:
+        offset = -(-offset // ALIGN) * ALIGN
+        data = np.ascontiguousarray(array).tobytes()
+        table.append((name, offset, data))
+        offset += len(data)
+
+    header = _HEADER.pack(MAGIC, VERSION, len(records), len(intervals),
+                          len(table))
+    header += b''.join(_SECTION.pack(name.encode('ascii'), offset,
+                                     len(data), zlib.crc32(data))
+                       for name, offset, data in table)
+    header += _CHECKSUM.pack(zlib.crc32(header))
+    image = bytearray(offset)
+    image[:len(header)] = header
+    for name, offset, data in table:
+        image[offset:offset + len(data)] = data
+    return bytes(image)
+
+
+class BinaryDB(object):
+    """Memory-mapped binary database.
+
+    Arguments
+    ---------
+
+        path : file name of a database written by `write`
+        verify : verify the section checksums on opening (reads the
+            whole file)
+
+    Attributes
+    ----------
+
+        version : format version of the file
+        meta : (nspecies,) species metadata (see `META`)
+        coeffs : (nintervals, 9) coefficients a1..a7, b1, b2
+        bounds : (nintervals, 2) interval bounds, K
+        dh : (nintervals,) H(298.15) - H(0), J/mol
+
+    The arrays are read-only views of the file. Species are in the
+    order of `thermoinp.DB.all` and are indexed by position or name.
+    """
+
+    def __init__(self, path, verify=False):
+        self.path = path
+        self._open(np.memmap(path, dtype=np.uint8, mode='r'), verify)
+
+    @classmethod
+    def from_buffer(cls, buffer, name='<buffer>', verify=False):
+        """Open a database held in a buffer (e.g. from `dumps`).
+
+        The arrays are read-only views of the buffer; `name` is used
+        in error messages.
+        """
+        inst = cls.__new__(cls)
+        inst.path = name
+        image = np.frombuffer(buffer, dtype=np.uint8)
+        image.flags.writeable = False
+        inst._open(image, verify)
+        return inst
+
+    def __len__(self):
+        return self._nspecies
+
+    def __contains__(self, name):
+        return name in self._index
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    @property
+    def names(self):
+        """Species names."""
+        try:
+            return self._names
+        except AttributeError:
+            self._names = tuple(self._strings('name'))
+            return self._names
+
+    def index(self, key):
+        """Return the position of a species (by name or position)."""
+        if isinstance(key, str):
+            try:
+                return self._index[key]
+            except KeyError:
+                raise KeyError("{} not in source database.".format(key))
+        return int(key)
+
+    def slice(self, key):
+        """Return the slice of the intervals of a species."""
+        meta = self.meta[self.index(key)]
+        return slice(int(meta['start']),
+                     int(meta['start']) + int(meta['nintervals']))
+
+    def record(self, key, polytype=''):
+        """Return the SpeciesRecord of a species.
+
+        Species are indexed by position or name; where names are
+        shared the last species of the name is returned, as by
+        `thermoinp.DB`. `polytype` selects the interval class as for
+        `thermoinp.DB`.
+        """
+        record, = self._records([self.index(key)], polytype)
+        return record
+
+    def to_db(self, polytype=''):
+        """Return a thermoinp.DB of every species."""
+        db = thermoinp.DB.__new__(thermoinp.DB)
+        db._select_polytype(polytype)
+        categories = db.list_categories()
+        lists = {category: [] for category in categories}
+        records = self._records(range(len(self)), polytype)
+        for record, k in zip(records, self.meta['category'].tolist()):
+            lists[categories[k]].append(record)
+        for category in categories:
+            setattr(db, '_{}'.format(category), lists[category])
+        db._dict = {s.name: s for s in db.all}
+        return db
+
+    def verify(self):
+        """Verify the section checksums; raises ValueError on error."""
+        for name in self._sections:
+            offset, size, crc = self._sections[name]
+            if zlib.crc32(self._map[offset:offset + size]) != crc:
+                errmsg = "{}: section {} is corrupt.".format(self.path, name)
+                raise ValueError(errmsg)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    @property
+    def _index(self):
+        # Name -> position (the last of shared names)
+        try:
+            return self._names_index
+        except AttributeError:
+            self._names_index = {name: i for i, name in enumerate(self.names)}
+            return self._names_index
+
+    def _records(self, index, polytype, cls=thermoinp.SpeciesRecord):
+        # SpeciesRecords (of class `cls`) of a sequence of positions
+        polycls = getattr(poly, 'NASAPoly{}'.format(polytype.upper()))
+        index = list(index)
+        fields = list(STRINGS)
+        if 'text' in self._sections:
+            fields.append('text')
+        strings = [self._strings(field, index) for field in fields]
+        meta = self.meta[index]
+        values = {field: [None if x != x else x
+                          for x in meta[field].tolist()]
+                  for field in ('h_formation', 'h_assigned', 'T_reference')}
+
+        # Gather the intervals of the records in one pass
+        nintervals = meta['nintervals'].astype(int)
+        first = np.cumsum(nintervals) - nintervals
+        rows = (np.repeat(meta['start'] - first, nintervals) +
+                np.arange(nintervals.sum()))
+        coeffs = self.coeffs[rows].tolist()
+        bounds = self.bounds[rows].tolist()
+        dh = self.dh[rows].tolist()
+
+        records = []
+        for k, (a, nint, phase, molwt, isproduct) in enumerate(zip(
+                first.tolist(), nintervals.tolist(), meta['phase'].tolist(),
+                meta['molwt'].tolist(), meta['isproduct'].tolist())):
+            intervals = tuple(
+                polycls(tuple(bounds[j]), tuple(coeffs[j][:7]),
+                        tuple(coeffs[j][7:]), 7, EXPONENTS, dh[j])
+                for j in range(a, a + nint))
+            name, comments, refcode, formula = (s[k] for s in strings[:4])
+            record = cls(name, comments, nint, refcode, formula, phase,
+                         molwt, values['h_formation'][k],
+                         values['h_assigned'][k], values['T_reference'][k],
+                         intervals or None)
+            record._isproduct = bool(isproduct)
+            record._formatted = strings[4][k] if len(strings) > 4 else None
+            records.append(record)
+        return records
+
+    def _open(self, image, verify):
+        # Map the sections of an image of the file (uint8 array)
+        self._map = image
+        self._sections = self._read_header()
+        for name, dtype, rows, shape in SECTIONS:
+            count = self._nspecies if rows == 'species' else self._nintervals
+            setattr(self, name, self._section(name).view(dtype).reshape(
+                (count,) + shape))
+        if verify:
+            self.verify()
+
+    def _read_header(self):
+        # Validate the header; returns a dict of section name ->
+        # (offset, size, crc).
+        buf = self._map
+        if len(buf) < _HEADER.size or \
+                bytes(buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError("{} is not a binary database.".format(self.path))
+        _, self.version, self._nspecies, self._nintervals, nsections = \
+            _HEADER.unpack(bytes(buf[:_HEADER.size]))
+        if self.version > VERSION:
+            errmsg = "{}: unsupported version {}.".format(self.path,
+                                                          self.version)
+            raise ValueError(errmsg)
+        end = _HEADER.size + nsections * _SECTION.size
+        if len(buf) < end + _CHECKSUM.size:
+            raise ValueError("{}: header is corrupt.".format(self.path))
+        crc, = _CHECKSUM.unpack(bytes(buf[end:end + _CHECKSUM.size]))
+        if zlib.crc32(bytes(buf[:end])) != crc:
+            raise ValueError("{}: header is corrupt.".format(self.path))
+        sections = {}
+        for k in range(nsections):
+            start = _HEADER.size + k * _SECTION.size
+            name, offset, size, crc = _SECTION.unpack(
+                bytes(buf[start:start + _SECTION.size]))
+            name = name.rstrip(b'\0').decode('ascii')
+            if offset + size > len(buf):
+                errmsg = "{}: section {} is corrupt.".format(self.path, name)
+                raise ValueError(errmsg)
+            sections[name] = (offset, size, crc)
+        return sections
+
+    def _section(self, name):
+        offset, size, _ = self._sections[name]
+        return self._map[offset:offset + size]
+
+    def _strings(self, field, index=None):
+        # Decode the strings of a table (at positions `index`)
+        offsets = self._section(field + '_off').view('<u8')
+        if index is None:
+            index = range(len(offsets) - 1)
+        elif len(index) < len(offsets) // 64:
+            # Few strings: touch only their pages
+            return [bytes(self._section(field)[a:b]).decode('utf-8')
+                    for a, b in (offsets[i:i + 2].tolist() for i in index)]
+        offsets = offsets.tolist()
+        blob = bytes(self._section(field))
+        return [blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                for i in index]
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _strings(field, strings):
+    # String table sections: offsets and UTF-8 blob
+    data = [s.encode('utf-8') for s in strings]
+    offsets = np.concatenate(([0], np.cumsum([len(d) for d in data])))
+    return [(field + '_off', offsets.astype('<u8')),
+            (field, np.frombuffer(b''.join(data), dtype=np.uint8))]
@@ -6,6 +6,11 @@ constants:
     R     : Molar gas constant (sometimes universal or ideal), J/mol-K
     R_CEA : Molar gas constant defined by Gordon and McBride
     M	  : Molar mass constant, kg/mol 
+    P0    : Standard-state pressure, Pa
+
+The values are given in data/constants.xml and are frozen into the
+generated module `_constants`, so that importing this module reads no
+data; `freeze` regenerates it after the XML data are changed.
 
 Note:
 
@@ -31,20 +36,37 @@ References
 
 """
 import os
-from xml.etree import ElementTree as ET
+
+from thermodata import _constants
+
+# Source of the constants (frozen into `_constants` by `freeze`)
+SOURCE = os.path.join(os.path.dirname(__file__), 'data', 'constants.xml')
 
 def fetch_value(name):
-    """Return physical constant value from the XML tree"""
-    tree = ET.parse(os.path.join(os.path.dirname(__file__), 
-                                 'data',
-                                 'constants.xml'
-                                 )
-                    )
-    root = tree.getroot()
-    xpath = "./PhysicalConstant[@name='{}']/value".format(name)
-    text = root.find(xpath).text
-    return float(text)
+    """Return physical constant value (as frozen from the XML data)"""
+    return _constants.VALUES[name]
+
+def parse(path=SOURCE):
+    """Return a name-keyed dict of the constant values of an XML file"""
+    from xml.etree import ElementTree as ET
+
+    root = ET.parse(path).getroot()
+    return {node.get('name'): float(node.find('value').text)
+            for node in root.iter('PhysicalConstant')}
+
+def freeze(path=SOURCE):
+    """Regenerate the `_constants` module from the XML data"""
+    lines = ['# Generated from data/constants.xml by constants.freeze();',
+             '# do not edit.',
+             'VALUES = {']
+    lines.extend('    {!r}: {!r},'.format(name, value)
+                 for name, value in sorted(parse(path).items()))
+    lines.append('}')
+    target = os.path.join(os.path.dirname(__file__), '_constants.py')
+    with open(target, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
 
 M = fetch_value('molar mass constant') 			# kg/mol
 R = fetch_value('molar gas constant') 			# J/mol-K
 R_CEA = fetch_value('cea molar gas constant')	# J/mol-K
+P0 = fetch_value('standard-state pressure')		# Pa
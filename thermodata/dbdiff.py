@@ -0,0 +1,104 @@
+"""Differences between two versions of the database.
+
+Species are compared by their content hashes
+(`thermoinp.SpeciesRecord.content_hash`), in one pass over the species
+names of both databases. Modified species are detailed by the metadata
+fields and temperature intervals which differ:
+
+    >>> changes = diff(thermoinp.DB(), thermoinp.DB())   # or DB.diff
+    >>> changes.added, changes.removed
+    >>> [(c.name, c.fields, c.intervals) for c in changes.modified]
+
+Results derived from species data (property tables, fits, ...) are
+stale where they use changed species:
+
+    >>> if changes.invalidates(table_species):
+    ...     rebuild()
+
+Species are identified by name; where names are shared the record
+looked up by name (the last) is compared, as in `thermoinp.DB`.
+"""
+import collections
+
+
+# Compared metadata fields of SpeciesRecord
+FIELDS = ('comments', 'nintervals', 'refcode', 'formula', 'phase',
+          'molwt', 'h_formation', 'h_assigned', 'T_reference',
+          'isproduct')
+
+
+SpeciesChange = collections.namedtuple('SpeciesChange',
+                                       'name old new fields intervals')
+SpeciesChange.__doc__ = """Modification of a species.
+
+Fields
+------
+
+    name : species name
+    old, new : SpeciesRecords
+    fields : names of the differing metadata fields (see `FIELDS`)
+    intervals : bounds (Tmin, Tmax) of the intervals which differ or
+        are in only one of the records, ascending
+"""
+
+
+_Diff = collections.namedtuple('Diff', 'added removed modified')
+
+
+class Diff(_Diff):
+    """Differences between two databases.
+
+    Fields
+    ------
+
+        added : names of species only in the new database
+        removed : names of species only in the old database
+        modified : SpeciesChanges of species whose data differ
+
+    Names are sorted.
+    """
+
+    @property
+    def changed(self):
+        """Names of added, removed and modified species."""
+        return frozenset(self.added + self.removed +
+                         tuple(c.name for c in self.modified))
+
+    def invalidates(self, species):
+        """Test whether results using `species` (names) are stale."""
+        changed = self.changed
+        return any(name in changed for name in species)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+
+def diff(old, new):
+    """Return the Diff from one database to another.
+
+    Arguments
+    ---------
+
+        old, new : thermoinp.DB instances
+    """
+    added = tuple(sorted(set(new._dict) - set(old._dict)))
+    removed = tuple(sorted(set(old._dict) - set(new._dict)))
+    modified = []
+    for name in sorted(set(old._dict) & set(new._dict)):
+        a, b = old[name], new[name]
+        if a.content_hash != b.content_hash:
+            modified.append(_change(name, a, b))
+    return Diff(added, removed, tuple(modified))
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _change(name, old, new):
+    # SpeciesChange of two records of a species
+    fields = tuple(f for f in FIELDS if getattr(old, f) != getattr(new, f))
+    a = {tuple(i[0]): tuple(i) for i in old.intervals or ()}
+    b = {tuple(i[0]): tuple(i) for i in new.intervals or ()}
+    intervals = tuple(sorted(lim for lim in set(a) | set(b)
+                             if a.get(lim) != b.get(lim)))
+    return SpeciesChange(name, old, new, fields, intervals)
@@ -0,0 +1,641 @@
+"""Chemical equilibrium by Gibbs energy minimisation.
+
+This module provides a native replacement for the equilibrium
+calculations of CEA. The solver uses the element-potential method of
+Gordon and McBride (the iteration equations of NASA RP-1311, chapter
+2) for assigned temperature and pressure (TP), enthalpy and pressure
+(HP) and entropy and pressure (SP) problems with gaseous and condensed
+species. Species, formulas and polynomials are drawn from the
+`thermoinp` database and Gibbs energies are evaluated through the
+vectorised polynomial path (`polyarray`).
+
+Problems are solved in batches: every argument broadcasts to a common
+number of states and a Newton iteration is performed for all
+unconverged states at once.
+
+    >>> reactants = Mixture.from_composition({'H2': 2., 'O2': 1.})
+    >>> eq = Equilibrium(reactants.elements)
+    >>> b = reactants.element_moles(eq.elements)
+    >>> state = eq.hp(b, reactants.h(298.15), P=[1e5, 1e6, 1e7])
+    >>> state.T                         # shape (3,)
+    >>> state.mole_fractions()['OH']
+
+Units are SI throughout. Amounts are per kilogram of mixture: element
+amounts `b` in mol/kg, enthalpy `h` in J/kg and entropy `s` in J/kg-K.
+
+Condensed species are introduced once the gas-phase iteration has
+converged, by the test of RP-1311 section 3.3: of the condensed
+species valid at the current temperature the one that most lowers the
+Gibbs energy is added, and condensed species with a negative amount
+are removed. Phases of the same composition replace one another.
+
+Ionised species are excluded unless `ions=True`, in which case the
+electron, 'E', is added to the elements with a zero (charge balance)
+amount.
+
+Initial estimates follow CEA (0.1 kmol/kg of gas split evenly and
+3800 K for HP and SP problems) unless a previous state is given as a
+guess, in which case the composition is reconstructed from its
+element potentials at the new conditions.
+"""
+import numpy as np
+
+from thermodata import constants
+from thermodata import thermoinp
+from thermodata.mixture import formula_matrix
+from thermodata.polyarray import PolyArray
+
+
+# Convergence and control parameters (RP-1311, chapter 3)
+SIZE = 18.420681          # -ln(1e-8); trace species threshold
+TRACE = 9.2103404         # -ln(1e-4); trace species control factor
+TOLERANCE = 0.5e-5        # Composition convergence criterion
+T_TOLERANCE = 1e-4        # Temperature convergence criterion
+T_ESTIMATE = 3800.0       # Initial temperature estimate, K
+
+
+class Equilibrium(object):
+    """Equilibrium solver for a fixed set of chemical elements.
+
+    Arguments
+    ---------
+
+        elements : sequence of element symbols as used in the source
+            data (e.g. ('C', 'H', 'O', 'N', 'AR'))
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+        species : optional sequence of species names to restrict the
+            products to (all products of the elements otherwise)
+        condensed : include condensed products
+        ions : include ionised products
+        max_iterations : Newton iterations allowed per state
+
+    Attributes
+    ----------
+
+        elements : element symbols (the columns of `b`)
+        gas, condensed : PolyArray instances for the product species
+        species : names of gaseous then condensed products
+    """
+
+    def __init__(self, elements, db=None, species=None, condensed=True,
+                 ions=False, max_iterations=50):
+        if db is None:
+            db = thermoinp.shared()
+        elements = [e.upper() for e in elements if e.upper() != 'E']
+        allowed = set(elements) | ({'E'} if ions else set())
+
+        def select(records):
+            selected = []
+            for record in records:
+                if species is not None and record.name not in species:
+                    continue
+                if record.nintervals and set(record.composition) <= allowed:
+                    selected.append(record)
+            return selected
+
+        gas = select(db.gaseous)
+        cond = select(db.condensed) if condensed else []
+        if ions and any('E' in r.composition for r in gas):
+            elements.append('E')
+        if not gas:
+            raise ValueError("No gaseous products for the elements.")
+
+        self.elements = tuple(elements)
+        self.gas = PolyArray(gas)
+        self.condensed = PolyArray(cond)
+        self.species = self.gas.names + self.condensed.names
+        self.max_iterations = max_iterations
+
+        self._A = formula_matrix(gas, self.elements)
+        self._Ac = formula_matrix(cond, self.elements)
+        # Products of formula rows, for sum_j a_ij a_kj n_j
+        A = self._A
+        self._AA = (A[:, None, :] * A[None, :, :]).reshape(-1, len(gas)).T
+        # Condensed phases of identical composition
+        Ac = self._Ac.T
+        self._same = np.all(Ac[:, None, :] == Ac[None, :, :], axis=-1)
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def tp(self, b, T, P, guess=None):
+        """Equilibrium at assigned temperature and pressure.
+
+        Arguments
+        ---------
+
+            b : element amounts (..., nelements), mol/kg
+            T : temperature, K
+            P : pressure, Pa
+            guess : EquilibriumState to start the iteration from
+        """
+        return self._solve('tp', b, P, T=T, guess=guess)
+
+    def hp(self, b, h, P, guess=None, T=None):
+        """Equilibrium at assigned enthalpy and pressure.
+
+        Arguments
+        ---------
+
+            b : element amounts (..., nelements), mol/kg
+            h : specific enthalpy, J/kg
+            P : pressure, Pa
+            guess : EquilibriumState to start the iteration from
+            T : initial temperature estimate, K (defaults to that of
+                the guess or T_ESTIMATE)
+        """
+        return self._solve('hp', b, P, T=T, value=h, guess=guess)
+
+    def sp(self, b, s, P, guess=None, T=None):
+        """Equilibrium at assigned entropy and pressure.
+
+        Arguments
+        ---------
+
+            b : element amounts (..., nelements), mol/kg
+            s : specific entropy, J/kg-K
+            P : pressure, Pa
+            guess : EquilibriumState to start the iteration from
+            T : initial temperature estimate, K (defaults to that of
+                the guess or T_ESTIMATE)
+        """
+        return self._solve('sp', b, P, T=T, value=s, guess=guess)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _solve(self, problem, b, P, T=None, value=None, guess=None):
+        # Solve a batch of problems; returns an EquilibriumState with
+        # the broadcast shape of the arguments.
+        b = np.asarray(b, dtype=float)
+        if b.shape[-1:] != (len(self.elements),):
+            raise ValueError("Element amounts do not match elements.")
+        if T is None:
+            T = T_ESTIMATE if guess is None else guess.T
+        if value is None:
+            value = np.nan
+        shape = np.broadcast_shapes(b.shape[:-1], np.shape(T),
+                                    np.shape(P), np.shape(value),
+                                    () if guess is None else guess.T.shape)
+        N = int(np.prod(shape))
+        b = np.broadcast_to(b, shape + b.shape[-1:]).reshape(N, -1)
+        P = np.broadcast_to(np.asarray(P, dtype=float), shape).ravel()
+        T = np.broadcast_to(np.asarray(T, dtype=float), shape).ravel()
+        value = np.broadcast_to(np.asarray(value, dtype=float),
+                                shape).ravel()
+
+        ngas, ncond = len(self.gas), len(self.condensed)
+        lnT = np.log(T)
+        if guess is None:
+            lnn = np.full(N, np.log(100.0))
+            lnnj = np.repeat((lnn - np.log(ngas))[:, None], ngas, axis=1)
+            nc = np.zeros((N, ncond))
+            active = np.zeros((N, ncond), dtype=bool)
+            pi = np.zeros((N, len(self.elements)))
+        else:
+            # Rebuild the gas composition from the element potentials
+            # of the guess at the new temperature and pressure.
+            # The guess broadcasts against the other arguments.
+            def expand(x):
+                return np.broadcast_to(x, shape + x.shape[guess.T.ndim:]
+                                       ).reshape(N, *x.shape[guess.T.ndim:])
+            pi = expand(guess.pi).copy()
+            lnn = np.log(expand(guess.n))
+            lnnj = (lnn[:, None] + pi @ self._A
+                    - self.gas.gnd(T) - np.log(P / constants.P0)[:, None])
+            # Far from the guess the potentials need not give the right
+            # total; rescale the composition to the moles of the guess.
+            top = lnnj.max(axis=-1, keepdims=True)
+            total = top[:, 0] + np.log(np.exp(lnnj - top).sum(axis=-1))
+            lnnj = lnnj + (lnn - total)[:, None]
+            nc = expand(guess.nc).copy()
+            active = expand(guess.active).copy()
+
+        iterations = np.zeros(N, dtype=int)
+        converged = np.zeros(N, dtype=bool)
+        pending = np.ones(N, dtype=bool)
+        limit = self.max_iterations * (ncond + 1)
+        count = np.zeros(N, dtype=int)
+        if problem == 'tp':
+            # Temperature is fixed; evaluate the polynomials once.
+            thermo = self._thermo(T)
+        while np.any(pending):
+            idx = np.flatnonzero(pending)
+            if problem == 'tp':
+                props = tuple(x[idx] for x in thermo)
+            else:
+                props = self._thermo(np.exp(lnT[idx]))
+            step = self._step(problem, props, b[idx], P[idx], value[idx],
+                              lnT[idx], lnn[idx], lnnj[idx], nc[idx],
+                              active[idx])
+            lnT[idx], lnn[idx], lnnj[idx], nc[idx], pi[idx], done = step
+            iterations[idx] += 1
+            count[idx] += 1
+
+            if ncond and np.any(done):
+                # Condensed phase test for states that converged
+                sub = idx[done]
+                changed = self._test_condensed(np.exp(lnT[sub]),
+                                               pi[sub], nc, active, sub)
+                done[done] = ~changed
+                count[sub[changed]] = 0
+            converged[idx[done]] = True
+            pending[idx[done]] = False
+
+            failed = pending & ((count >= self.max_iterations) |
+                                (iterations >= limit))
+            pending[failed] = False
+
+        state = EquilibriumState(self,
+                                 np.exp(lnT).reshape(shape),
+                                 P.reshape(shape),
+                                 np.exp(lnn).reshape(shape),
+                                 np.exp(lnnj).reshape(shape + (ngas,)),
+                                 nc.reshape(shape + (ncond,)),
+                                 active.reshape(shape + (ncond,)),
+                                 pi.reshape(shape + (-1,)),
+                                 converged.reshape(shape),
+                                 iterations.reshape(shape))
+        return state
+
+    def _thermo(self, T):
+        # Non-dimensional Cp, H and S of the gaseous and condensed
+        # species at temperatures T.
+        cp, h, s = self.gas.evaluate(T)
+        if len(self.condensed):
+            cpc, hc, sc = self.condensed.evaluate(T)
+        else:
+            cpc = hc = sc = np.zeros(T.shape + (0,))
+        return cp, h, s, cpc, hc, sc
+
+    def _step(self, problem, props, b0, P, value, lnT, lnn, lnnj, nc,
+              active):
+        # One Newton iteration of RP-1311 equations 2.24-2.28 for a
+        # batch of states with the species properties `props` (see
+        # `_thermo`). Returns the updated variables, the element
+        # potentials and a convergence mask.
+        A, Ac = self._A, self._Ac
+        nel, ncond = A.shape[0], Ac.shape[1]
+        energy = problem != 'tp'
+        k = nel + ncond
+        m = k + 1 + energy
+        N = len(lnT)
+
+        T = np.exp(lnT)
+        lnP = np.log(P / constants.P0)
+        cp, h, s, cpc, hc, sc = props
+        gc = hc - sc
+        nj = np.exp(lnnj)
+        n = np.exp(lnn)
+        mu = h - s + lnnj - lnn[:, None] + lnP[:, None]
+
+        B = nj @ A.T
+        bj = B + nc @ Ac.T
+        M = np.zeros((N, m, m))
+        rhs = np.zeros((N, m))
+
+        # Element rows
+        M[:, :nel, :nel] = (nj @ self._AA).reshape(N, nel, nel)
+        M[:, :nel, nel:k] = Ac
+        M[:, :nel, k] = B
+        rhs[:, :nel] = b0 - bj + (nj * mu) @ A.T
+
+        # Condensed rows (identity rows fix inactive species at zero)
+        if ncond:
+            cond = np.arange(nel, k)
+            M[:, nel:k, :nel] = np.where(active[..., None], Ac.T, 0.0)
+            M[:, cond, cond] = np.where(active, 0.0, 1.0)
+            rhs[:, nel:k] = np.where(active, gc, 0.0)
+
+        # Total gas moles row
+        sum_nj = nj.sum(axis=-1)
+        M[:, k, :nel] = B
+        M[:, k, k] = sum_nj - n
+        rhs[:, k] = n - sum_nj + (nj * mu).sum(axis=-1)
+
+        if energy:
+            e = k + 1
+            Hj = nj * h
+            cpsum = (nj * cp).sum(axis=-1)
+            M[:, :nel, e] = Hj @ A.T
+            M[:, k, e] = Hj.sum(axis=-1)
+            if ncond:
+                M[:, nel:k, e] = np.where(active, hc, 0.0)
+                cpsum = cpsum + (nc * cpc).sum(axis=-1)
+            if problem == 'hp':
+                M[:, e, :nel] = Hj @ A.T
+                M[:, e, k] = Hj.sum(axis=-1)
+                M[:, e, e] = cpsum + (Hj * h).sum(axis=-1)
+                rhs[:, e] = (value / (constants.R_CEA * T)
+                             - Hj.sum(axis=-1) + (Hj * mu).sum(axis=-1))
+                if ncond:
+                    M[:, e, nel:k] = np.where(active, hc, 0.0)
+                    rhs[:, e] -= (nc * hc).sum(axis=-1)
+            else:
+                Sj = s - (lnnj - lnn[:, None]) - lnP[:, None]
+                NS = nj * Sj
+                M[:, e, :nel] = NS @ A.T
+                M[:, e, k] = NS.sum(axis=-1)
+                M[:, e, e] = cpsum + (Hj * Sj).sum(axis=-1)
+                rhs[:, e] = (value / constants.R_CEA - NS.sum(axis=-1)
+                             + n - sum_nj + (NS * mu).sum(axis=-1))
+                if ncond:
+                    M[:, e, nel:k] = np.where(active, sc, 0.0)
+                    rhs[:, e] -= (nc * sc).sum(axis=-1)
+
+        # Elements whose species are all negligible (e.g. the electron
+        # in a weakly ionised gas) have degenerate rows; fix their
+        # potentials at zero.
+        diag = M[:, np.arange(nel), np.arange(nel)]
+        degenerate = diag <= 1e-12 * diag.max(axis=-1, keepdims=True)
+        if np.any(degenerate):
+            rows, cols = np.nonzero(degenerate)
+            M[rows, cols, :] = 0.0
+            M[rows, cols, cols] = 1.0
+            rhs[rows, cols] = 0.0
+
+        x = _solve_batch(M, rhs)
+        pi = x[:, :nel]
+        dnc = x[:, nel:k]
+        dlnn = x[:, k]
+        dlnT = x[:, k + 1] if energy else np.zeros(N)
+        dlnnj = (-mu + pi @ A + dlnn[:, None] + h * dlnT[:, None])
+
+        # Convergence (RP-1311 section 3.2), tested on the corrections
+        total = sum_nj + nc.sum(axis=-1)
+        done = (
+            ((nj * np.abs(dlnnj)).max(axis=-1) <= TOLERANCE * total) &
+            (n * np.abs(dlnn) <= TOLERANCE * total) &
+            (np.abs(dlnT) <= T_TOLERANCE) &
+            np.all(np.abs(b0 - bj) <= 1e-6 * b0.max(axis=-1, keepdims=True),
+                   axis=-1)
+        )
+        if ncond:
+            done &= np.abs(dnc).max(axis=-1) <= TOLERANCE * total
+
+        # Control factor (RP-1311 section 3.1)
+        lnx = lnnj - lnn[:, None]
+        major = lnx > -SIZE
+        largest = np.where(major & (dlnnj > 0), dlnnj, 0.0).max(axis=-1)
+        largest = np.maximum.reduce([5 * np.abs(dlnT), 5 * np.abs(dlnn),
+                                     largest])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lam1 = np.where(largest > 2.0, 2.0 / largest, 1.0)
+            minor = ~major & (dlnnj >= 0) & (dlnnj != dlnn[:, None])
+            ratio = np.abs((-lnx - TRACE) / (dlnnj - dlnn[:, None]))
+            lam2 = np.where(minor, ratio, np.inf).min(axis=-1)
+        lam = np.minimum.reduce([np.ones(N), lam1, lam2])
+
+        lnT = lnT + lam * dlnT
+        lnn = lnn + lam * dlnn
+        lnnj = np.maximum(lnnj + lam[:, None] * dlnnj,
+                          lnn[:, None] - 700.0)
+        nc = nc + lam[:, None] * dnc
+        return lnT, lnn, lnnj, nc, pi, done
+
+    def _test_condensed(self, T, pi, nc, active, idx):
+        # Update the condensed species of converged states `idx` in
+        # place; returns a mask of the states that changed.
+        valid = self.condensed.valid(T)
+        act, amounts = active[idx], nc[idx]
+
+        # Remove species with negative amounts or out of range
+        remove = act & ((amounts <= 0) | ~valid)
+        changed = remove.any(axis=-1)
+        act[remove] = False
+        amounts[remove] = 0.0
+
+        # Add the species most lowering the Gibbs energy
+        dg = self.condensed.gnd(T) - pi @ self._Ac
+        dg = np.where(~act & valid, dg, np.inf)
+        best = dg.argmin(axis=-1)
+        rows = np.flatnonzero(~changed & (dg.min(axis=-1) < 0))
+        for i in rows:
+            c = best[i]
+            same = self._same[c] & act[i]
+            amounts[i, c] = amounts[i, same].sum()
+            amounts[i, same] = 0.0
+            act[i, same] = False
+            act[i, c] = True
+        changed[rows] = True
+
+        active[idx], nc[idx] = act, amounts
+        return changed
+
+
+class EquilibriumState(object):
+    """Batch of equilibrium states.
+
+    Attributes
+    ----------
+
+        T : temperature, K
+        P : pressure, Pa
+        n : moles of gas per kg of mixture, mol/kg
+        nj : moles of each gaseous species, mol/kg (..., ngas)
+        nc : moles of each condensed species, mol/kg (..., ncondensed)
+        active : mask of condensed species included
+        pi : element potentials, -lambda/RT (..., nelements)
+        converged : convergence flag
+        iterations : number of Newton iterations
+
+    Derived properties (enthalpy, entropy, heat capacity etc.) are
+    those of the mixture with its composition frozen, except for the
+    equilibrium derivatives (`dlnV_dlnT`, `dlnV_dlnP`, `cp_eq`,
+    `gamma_s` and `sound_speed_eq`), which allow for the shift in
+    composition (RP-1311 section 2.5).
+    """
+
+    def __init__(self, solver, T, P, n, nj, nc, active, pi, converged,
+                 iterations):
+        self.solver = solver
+        self.T, self.P, self.n = T, P, n
+        self.nj, self.nc, self.active = nj, nc, active
+        self.pi = pi
+        self.converged = converged
+        self.iterations = iterations
+        self._cache = None
+
+    def __len__(self):
+        return len(self.T)
+
+    @property
+    def species(self):
+        """Species names (gaseous then condensed)."""
+        return self.solver.species
+
+    @property
+    def moles(self):
+        """Moles of each species per kg of mixture, mol/kg."""
+        return np.concatenate((self.nj, self.nc), axis=-1)
+
+    @property
+    def X(self):
+        """Mole fractions of all species (including condensed)."""
+        moles = self.moles
+        return moles / moles.sum(axis=-1, keepdims=True)
+
+    def mole_fractions(self, threshold=0.0):
+        """Return a species-keyed dict of mole fraction arrays.
+
+        Species whose mole fraction never exceeds `threshold` are
+        omitted.
+        """
+        X = self.X
+        return {name: X[..., j]
+                for j, name in enumerate(self.species)
+                if np.any(X[..., j] > threshold)}
+
+    @property
+    def molwt(self):
+        """Molecular weight of the gas, 1/n, kg/kmol."""
+        return 1.0 / (self.n * constants.M)
+
+    @property
+    def rho(self):
+        """Density, kg/m**3 (condensed volume neglected)."""
+        return self.P / (self.n * constants.R_CEA * self.T)
+
+    @property
+    def h(self):
+        """Specific enthalpy, J/kg."""
+        return self._sum('h') * constants.R_CEA * self.T
+
+    @property
+    def s(self):
+        """Specific entropy, J/kg-K."""
+        return self._sum('s') * constants.R_CEA
+
+    @property
+    def cp(self):
+        """Frozen specific heat at constant pressure, J/kg-K."""
+        return self._sum('cp') * constants.R_CEA
+
+    @property
+    def gamma(self):
+        """Frozen ratio of specific heats."""
+        cp = self.cp
+        return cp / (cp - self.n * constants.R_CEA)
+
+    @property
+    def sound_speed(self):
+        """Frozen speed of sound, m/s."""
+        return np.sqrt(self.gamma * self.n * constants.R_CEA * self.T)
+
+    @property
+    def dlnV_dlnT(self):
+        """Equilibrium derivative (dlnV/dlnT) at constant pressure."""
+        return 1.0 + self._derivatives()[0]
+
+    @property
+    def dlnV_dlnP(self):
+        """Equilibrium derivative (dlnV/dlnP) at constant temperature."""
+        return -1.0 + self._derivatives()[1]
+
+    @property
+    def cp_eq(self):
+        """Equilibrium specific heat at constant pressure, J/kg-K."""
+        return self._derivatives()[2] * constants.R_CEA
+
+    @property
+    def gamma_s(self):
+        """Isentropic exponent, (dlnP/dlnrho) at constant entropy."""
+        cp = self.cp_eq
+        cv = cp + (self.n * constants.R_CEA * self.dlnV_dlnT**2 /
+                   self.dlnV_dlnP)
+        return -cp / cv / self.dlnV_dlnP
+
+    @property
+    def sound_speed_eq(self):
+        """Equilibrium speed of sound, m/s."""
+        return np.sqrt(self.gamma_s * self.n * constants.R_CEA * self.T)
+
+    def _derivatives(self):
+        # Solve RP-1311 equations 2.56-2.58 (temperature) and 2.64-2.66
+        # (pressure) derivatives; returns (dlnn/dlnT, dlnn/dlnP,
+        # cp_eq/R) per kg of mixture. The two systems share a matrix.
+        if self._cache is not None:
+            return self._cache
+        solver = self.solver
+        A, Ac, AA = solver._A, solver._Ac, solver._AA
+        nel, ncond = A.shape[0], Ac.shape[1]
+        k = nel + ncond
+        shape = self.T.shape
+        N = int(np.prod(shape))
+        nj = self.nj.reshape(N, -1)
+        active = self.active.reshape(N, -1)
+        T = self.T.reshape(N)
+        cp, h, _ = solver.gas.evaluate(T)
+        Hj = nj * h
+
+        M = np.zeros((N, k + 1, k + 1))
+        rhs = np.zeros((N, k + 1, 2))
+        B = nj @ A.T
+        M[:, :nel, :nel] = (nj @ AA).reshape(N, nel, nel)
+        M[:, :nel, nel:k] = Ac
+        M[:, :nel, k] = B
+        M[:, k, :nel] = B
+        rhs[:, :nel, 0] = -(Hj @ A.T)
+        rhs[:, :nel, 1] = B
+        rhs[:, k, 0] = -Hj.sum(axis=-1)
+        rhs[:, k, 1] = nj.sum(axis=-1)
+        cpsum = (nj * (cp + h * h)).sum(axis=-1)
+        if ncond:
+            cpc, hc, _ = solver.condensed.evaluate(T)
+            cond = np.arange(nel, k)
+            M[:, nel:k, :nel] = np.where(active[..., None], Ac.T, 0.0)
+            M[:, cond, cond] = np.where(active, 0.0, 1.0)
+            rhs[:, nel:k, 0] = np.where(active, -hc, 0.0)
+            cpsum = cpsum + (self.nc.reshape(N, -1) * cpc).sum(axis=-1)
+
+        # Element rows of states in which all species of an element
+        # are negligible are degenerate (see Equilibrium._step).
+        diag = M[:, np.arange(nel), np.arange(nel)]
+        degenerate = diag <= 1e-12 * diag.max(axis=-1, keepdims=True)
+        if np.any(degenerate):
+            rows, cols = np.nonzero(degenerate)
+            M[rows, cols, :] = 0.0
+            M[rows, cols, cols] = 1.0
+            rhs[rows, cols, :] = 0.0
+
+        x = np.linalg.solve(M, rhs)
+        dpi, dnc, dlnn = x[:, :nel, 0], x[:, nel:k, 0], x[:, k]
+        cp_eq = ((Hj @ A.T) * dpi).sum(axis=-1) + cpsum
+        cp_eq = cp_eq + Hj.sum(axis=-1) * dlnn[:, 0]
+        if ncond:
+            cp_eq = cp_eq + (np.where(active, hc, 0.0) * dnc).sum(axis=-1)
+        self._cache = (dlnn[:, 0].reshape(shape), dlnn[:, 1].reshape(shape),
+                       cp_eq.reshape(shape))
+        return self._cache
+
+    def _sum(self, kind):
+        # Sum of a non-dimensional state function over species, per kg
+        # of mixture (gas entropies at their partial pressures).
+        solver = self.solver
+        cp, h, s = solver.gas.evaluate(self.T)
+        values = {'cp' : cp, 'h' : h, 's' : s}[kind]
+        if kind == 's':
+            with np.errstate(divide='ignore'):
+                lnx = np.log(self.nj / self.n[..., None])
+            lnP = np.log(self.P / constants.P0)[..., None]
+            values = values - np.where(self.nj > 0, lnx + lnP, 0.0)
+        total = (self.nj * values).sum(axis=-1)
+        if len(solver.condensed):
+            cpc, hc, sc = solver.condensed.evaluate(self.T)
+            values = {'cp' : cpc, 'h' : hc, 's' : sc}[kind]
+            total = total + (self.nc * values).sum(axis=-1)
+        return total
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def _solve_batch(M, rhs):
+    # Solve a batch of linear systems; singular systems (rare, e.g. a
+    # poorly chosen species set) fall back to least squares.
+    try:
+        return np.linalg.solve(M, rhs[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.stack([np.linalg.lstsq(Mi, ri, rcond=None)[0]
+                         for Mi, ri in zip(M, rhs)])
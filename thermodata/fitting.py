@@ -0,0 +1,207 @@
+"""Least-squares fitting of NASA polynomials.
+
+New species data (e.g. from statistical thermodynamics or tabulated
+heat capacities) are fitted to the 9-coefficient form of the database
+in the manner of the NASA PAC program: the heat capacity is fitted by
+least squares in each temperature interval subject to continuity of Cp
+at the breakpoints, and the integration constants are then fixed by
+the enthalpy and entropy at 298.15 K and continuity of H and S.
+
+    >>> T = np.linspace(200., 6000., 300)
+    >>> result = fit(T, cp, h298, s298, breaks=(1000.,))
+    >>> result.coeffs.shape              # (nspecies, 2, 9)
+    >>> text = format_record('CO2', {'C': 1., 'O': 2.}, 44.0095,
+    ...                      result.coeffs[0], result.bounds[0],
+    ...                      h298[0])
+    >>> SpeciesRecord.from_dataset(text.split('\\n'))
+
+Many species are fitted at once: when they share the temperature grid
+the constrained least-squares problem is factorised once and solved
+for every species as a matrix of right-hand sides; otherwise the
+solves are stacked. Coefficients are in the layout of
+`polyarray.PolyArray.coeffs` (a1..a7, b1, b2); a subset of the Cp terms
+may be fitted (as by the `nasa7` converter).
+"""
+import collections
+
+import numpy as np
+
+from thermodata import constants
+from thermodata import poly
+from thermodata.polyarray import EXPONENTS, cp_basis, h_basis, s_basis
+
+
+# Default interval breakpoint, K
+BREAKS = (1000.,)
+
+# Reference temperature of h298 and s298, K
+T_REFERENCE = 298.15
+
+Fit = collections.namedtuple('Fit', 'coeffs, bounds, error')
+Fit.__doc__ = """Fitted polynomials.
+
+Fields
+------
+
+    coeffs : (..., nintervals, 9) coefficients a1..a7, b1, b2
+    bounds : (..., nintervals, 2) interval bounds, K
+    error : (...,) maximum heat capacity error, J/mol-K
+"""
+
+
+def fit(T, cp, h298, s298, breaks=BREAKS, exponents=EXPONENTS[:7],
+        T_reference=T_REFERENCE):
+    """Return polynomials fitted to heat capacity data.
+
+    Arguments
+    ---------
+
+        T : temperatures, K; shape (n,) if shared by the species or
+            (..., n)
+        cp : heat capacities, J/mol-K; shape (..., n)
+        h298 : enthalpy at T_reference, J/mol; shape (...)
+        s298 : entropy at T_reference, J/mol-K; shape (...)
+        breaks : temperatures of the interval breakpoints, K (within
+            the data range)
+        exponents : exponents of the fitted Cp terms (a subset of
+            -2 to 4; the remaining coefficients are zero)
+        T_reference : temperature of h298 and s298, K
+
+    Each interval requires at least as many data points as terms.
+    """
+    R = constants.R_CEA
+    T = np.asarray(T, dtype=float)
+    y = np.asarray(cp, dtype=float) / R
+    breaks = np.asarray(breaks, dtype=float)
+    nint = len(breaks) + 1
+    columns = [EXPONENTS.index(e) for e in exponents]
+    nterms = len(columns)
+    if np.any(T.min(axis=-1, keepdims=True) >= breaks) or np.any(
+            T.max(axis=-1, keepdims=True) <= breaks):
+        raise ValueError("Breakpoints must be within the data range.")
+
+    # Block design matrix: the Cp basis of each point in the columns of
+    # its interval.
+    index = (T[..., None] > breaks).sum(axis=-1)
+    onehot = index[..., None] == np.arange(nint)
+    basis = cp_basis(T)[..., columns]
+    A = (onehot[..., :, None] * basis[..., None, :]).reshape(
+        T.shape + (nterms * nint,))
+
+    # Continuity of Cp at the breakpoints: C x = 0
+    C = np.zeros((len(breaks), nterms * nint))
+    at = cp_basis(breaks)[:, columns]
+    for j in range(len(breaks)):
+        C[j, nterms * j:nterms * (j + 1)] = at[j]
+        C[j, nterms * (j + 1):nterms * (j + 2)] = -at[j]
+
+    # Scale the columns (the basis spans many orders of magnitude) and
+    # solve in the null space of the constraints.
+    D = 1.0 / np.abs(A).max(axis=-2)
+    _, _, Vt = np.linalg.svd(C * D[..., None, :])
+    N = np.swapaxes(Vt[..., len(breaks):, :], -1, -2)
+    z = np.linalg.pinv((A * D[..., None, :]) @ N) @ y[..., None]
+    a = (D * (N @ z)[..., 0]).reshape(y.shape[:-1] + (nint, nterms))
+
+    coeffs = np.zeros(a.shape[:-1] + (9,))
+    coeffs[..., columns] = a
+    _integration_constants(coeffs, breaks, np.asarray(h298) / R,
+                           np.asarray(s298) / R, T_reference)
+
+    lim = np.stack((T.min(axis=-1), T.max(axis=-1)), axis=-1)
+    inner = np.broadcast_to(breaks, lim.shape[:-1] + breaks.shape)
+    edges = np.concatenate((lim[..., :1], inner, lim[..., 1:]), axis=-1)
+    bounds = np.broadcast_to(
+        np.stack((edges[..., :-1], edges[..., 1:]), axis=-1),
+        coeffs.shape[:-1] + (2,))
+    fitted = (basis * np.take_along_axis(
+        np.broadcast_to(a, y.shape[:-1] + (nint, nterms)),
+        np.broadcast_to(index, y.shape)[..., None], axis=-2)).sum(axis=-1)
+    error = np.abs(fitted - y).max(axis=-1) * R
+    return Fit(coeffs, np.array(bounds), error)
+
+def intervals(coeffs, bounds, dh=0.0, polycls=poly.NASAPoly):
+    """Return the polynomial intervals of one fitted species.
+
+    Arguments
+    ---------
+
+        coeffs, bounds : (nintervals, 9) and (nintervals, 2) arrays of
+            one species (see `fit`)
+        dh : H(298.15) - H(0), J/mol
+        polycls : NASAPoly class of the intervals
+    """
+    return tuple(polycls(tuple(lim), tuple(c[:7]), tuple(c[7:]),
+                         7, EXPONENTS, dh)
+                 for c, lim in zip(np.asarray(coeffs).tolist(),
+                                   np.asarray(bounds).tolist()))
+
+def format_record(name, composition, molwt, coeffs, bounds, h298, phase=0,
+                  refcode='', comments='', dh=0.0):
+    """Return the thermo.inp species dataset of a fitted species.
+
+    Arguments
+    ---------
+
+        name : species name
+        composition : element-keyed dict of atoms (at most five
+            elements)
+        molwt : molar mass, kg/kmol
+        coeffs, bounds : (nintervals, 9) and (nintervals, 2) arrays of
+            one species (see `fit`)
+        h298 : heat of formation at 298.15 K, J/mol
+        phase : phase (0 for gases)
+        refcode : reference-date code (at most six characters)
+        comments : references and comments
+        dh : H(298.15) - H(0), J/mol
+    """
+    if len(composition) > 5:
+        raise ValueError("At most five elements per species.")
+    formula = ''.join('{:<2s}{:>6.2f}'.format(element, atoms)
+                      for element, atoms in composition.items())
+    formula += '{:>8.2f}'.format(0.0) * (5 - len(composition))
+    exponents = ''.join('{:>5.1f}'.format(e) for e in EXPONENTS)
+    lines = ['{:<18s}{:<62s}'.format(name, comments),
+             '{:>2d} {:<6s} {}{:>2d}{:>13.7f}{:>15.3f}'.format(
+                 len(coeffs), refcode, formula, phase, molwt, h298)]
+    for c, (lo, hi) in zip(np.asarray(coeffs).tolist(),
+                           np.asarray(bounds).tolist()):
+        lines.append('{:>11.3f}{:>11.3f}7{}  {:>15.3f}'.format(
+            lo, hi, exponents, dh))
+        lines.append(''.join(_double(x) for x in c[:5]))
+        lines.append(''.join(_double(x) for x in c[5:7]) + ' ' * 16 +
+                     ''.join(_double(x) for x in c[7:]))
+    return '\n'.join(lines)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _integration_constants(coeffs, breaks, h, s, T0):
+    # Set b1 and b2 in place from H/R and S/R at T0 in the interval
+    # containing it, and continuity of H and S at the breakpoints on
+    # either side.
+    def enthalpy(k, T):
+        # H/R less b1
+        return T * (h_basis(T)[:7] * coeffs[..., k, :7]).sum(axis=-1)
+
+    def entropy(k, T):
+        # S/R less b2
+        return (s_basis(T)[:7] * coeffs[..., k, :7]).sum(axis=-1)
+
+    k0 = int((T0 > breaks).sum())
+    coeffs[..., k0, 7] = h - enthalpy(k0, T0)
+    coeffs[..., k0, 8] = s - entropy(k0, T0)
+    order = (list(range(k0 + 1, len(breaks) + 1)) +
+             list(range(k0 - 1, -1, -1)))
+    for k in order:
+        j = k - 1 if k > k0 else k + 1       # neighbour already set
+        Tb = breaks[min(j, k)]
+        coeffs[..., k, 7] = (coeffs[..., j, 7] + enthalpy(j, Tb) -
+                             enthalpy(k, Tb))
+        coeffs[..., k, 8] = (coeffs[..., j, 8] + entropy(j, Tb) -
+                             entropy(k, Tb))
+
+def _double(x):
+    # Fortran double in the 16-character field of thermo.inp
+    return '{:>16.9E}'.format(x).replace('E', 'D')
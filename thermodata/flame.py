@@ -0,0 +1,190 @@
+"""Adiabatic flame temperatures for batches of reactant mixtures.
+
+The constant-pressure adiabatic flame temperature is the temperature
+at which the products have the enthalpy of the reactants. Reactants
+are given as a (possibly batched) `mixture.Mixture`, typically of
+species from the `reactant` category of the database:
+
+    >>> reactants = Mixture.from_composition(
+    ...     {'Jet-A(g)': 1., 'Air': np.linspace(40., 120., 1000)})
+    >>> flame = flame_temperature(reactants, T0=[298.15] * 1000)
+    >>> flame.T                          # shape (1000,)
+    >>> flame_temperature(reactants, equilibrium=True).T
+
+Two product models are available:
+
+  - Frozen (the default): complete combustion products by the
+    Kistiakowsky-Wilson rules (see `complete_combustion`), with the
+    temperature found by a Newton iteration on the product enthalpy
+    shared by the whole batch.
+  - Equilibrium: the HP problem of the `equilibrium` solver, started
+    from the frozen flame temperature where complete combustion
+    products are defined (elements `ELEMENTS`), otherwise from
+    `equilibrium.T_ESTIMATE`.
+
+Reactants without temperature intervals (e.g. 'RP-1', 'CH4(L)')
+contribute their assigned enthalpy, `h_assigned`, which applies at the
+species' own `T_reference`; the initial temperature T0 applies to the
+remaining reactants only.
+"""
+import collections
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.equilibrium import Equilibrium, T_ESTIMATE
+
+
+# Product species of complete combustion, and the elements they cover
+PRODUCTS = ('CO2', 'H2O', 'N2', 'O2', 'CO', 'H2', 'C(gr)', 'Ar', 'He')
+ELEMENTS = ('C', 'H', 'O', 'N', 'AR', 'HE')
+
+# Temperature range of the frozen-products iteration, K
+T_MIN, T_MAX = 200.0, 6000.0
+
+TOLERANCE = 1e-6          # Relative enthalpy tolerance (frozen)
+MAX_ITERATIONS = 50
+
+Flame = collections.namedtuple('Flame',
+                               'T, products, converged, iterations')
+Flame.__doc__ = """Adiabatic flame result.
+
+Fields
+------
+
+    T : flame temperature, K
+    products : Mixture of frozen products or EquilibriumState
+    converged : convergence flag
+    iterations : number of Newton iterations
+"""
+
+
+def flame_temperature(reactants, T0=298.15, P=1e5, equilibrium=False,
+                      db=None, **options):
+    """Return the constant-pressure adiabatic flame temperature.
+
+    Arguments
+    ---------
+
+        reactants : Mixture (or species-keyed dict of amounts, see
+            `Mixture.from_composition`)
+        T0 : initial temperature of the reactants, K
+        P : pressure, Pa (equilibrium products only)
+        equilibrium : use equilibrium rather than frozen products
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+
+    Remaining keyword arguments are passed to the `Equilibrium` solver.
+    Returns a Flame instance; fields have the broadcast shape of the
+    reactant batch, T0 and P.
+    """
+    if db is None:
+        db = thermoinp.shared()
+    if not isinstance(reactants, Mixture):
+        reactants = Mixture.from_composition(reactants, db)
+    h0 = reactants.h(T0)
+
+    shape = np.broadcast_shapes(np.shape(h0), np.shape(P))
+    if equilibrium and not set(reactants.elements) <= set(ELEMENTS):
+        # No complete combustion products (e.g. metallised reactants);
+        # the equilibrium iteration starts from its own estimate.
+        T = np.full(shape, T_ESTIMATE)
+    else:
+        products = frozen_products(reactants, db)
+        T, converged, iterations = _solve_temperature(
+            products, np.broadcast_to(h0, shape))
+        if not equilibrium:
+            return Flame(T, products, converged, iterations)
+        # The frozen flame temperature is the initial estimate for the
+        # equilibrium iteration.
+        T = np.where(converged, T, T_ESTIMATE)
+
+    solver = Equilibrium(reactants.elements, db, **options)
+    b = reactants.element_moles(solver.elements)
+    state = solver.hp(b, h0, P, T=T)
+    return Flame(state.T, state, state.converged, state.iterations)
+
+def frozen_products(reactants, db=None):
+    """Return the Mixture of complete combustion products."""
+    if db is None:
+        db = thermoinp.shared()
+    b = reactants.element_moles()
+    moles = complete_combustion(dict(zip(reactants.elements,
+                                         np.moveaxis(b, -1, 0))))
+    # Round-off residues (e.g. O2 at stoichiometric) are dropped.
+    total = sum(moles.values())
+    names = [name for name in PRODUCTS
+             if np.any(moles[name] > 1e-12 * total)]
+    amounts = np.stack(np.broadcast_arrays(*(moles[name] for name in names)),
+                       axis=-1)
+    return Mixture([db[name] for name in names], amounts)
+
+def complete_combustion(elements):
+    """Return the complete combustion products of element amounts.
+
+    Oxygen is allocated by the Kistiakowsky-Wilson rules: carbon is
+    first burnt to CO, hydrogen to H2O and then CO to CO2; any excess
+    oxygen remains as O2. With insufficient oxygen the remaining
+    hydrogen forms H2 and carbon forms graphite. Nitrogen forms N2 and
+    the noble gases are inert.
+
+    Arguments
+    ---------
+
+        elements : dict of element symbol -> amount (array_like)
+
+    Returns a dict of species name -> amount (see `PRODUCTS`).
+    """
+    unknown = set(elements) - set(ELEMENTS)
+    if unknown:
+        errmsg = "No combustion products for elements: {}".format(
+            ', '.join(sorted(unknown)))
+        raise ValueError(errmsg)
+    C, H, O, N, Ar, He = (np.asarray(elements.get(e, 0.0), dtype=float)
+                          for e in ELEMENTS)
+
+    CO = np.minimum(C, O)
+    O = O - CO
+    H2O = np.minimum(H / 2, O)
+    O = O - H2O
+    CO2 = np.minimum(CO, O)
+    CO, O = CO - CO2, O - CO2
+    return {'CO2': CO2,
+            'H2O': H2O,
+            'N2': N / 2,
+            'O2': O / 2,
+            'CO': CO,
+            'H2': H / 2 - H2O,
+            'C(gr)': C - CO - CO2,
+            'Ar': Ar,
+            'He': He}
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _solve_temperature(products, h0):
+    # Newton iteration on h(T) = h0 for every state of the batch at
+    # once, safeguarded by bisection within [T_MIN, T_MAX].
+    lo = np.full(h0.shape, T_MIN)
+    hi = np.full(h0.shape, T_MAX)
+    T = np.full(h0.shape, 2000.0)
+    converged = np.zeros(h0.shape, dtype=bool)
+    iterations = np.zeros(h0.shape, dtype=int)
+    scale = np.maximum(np.abs(h0), products.cp(298.15) * 298.15)
+    for _ in range(MAX_ITERATIONS):
+        pending = ~converged
+        if not np.any(pending):
+            break
+        residual = products.h(T) - h0
+        cp = products.cp(T)
+        lo = np.where(residual < 0, T, lo)
+        hi = np.where(residual > 0, T, hi)
+        step = np.where(pending, T - residual / cp, T)
+        outside = (step <= lo) | (step >= hi)
+        step = np.where(outside & pending, (lo + hi) / 2, step)
+        iterations += pending
+        converged |= np.abs(residual) <= TOLERANCE * scale
+        T = np.where(converged, T, step)
+    return T, converged, iterations
@@ -0,0 +1,129 @@
+"""Heating values and stoichiometry of fuel species.
+
+The complete combustion of a fuel of composition CcHhOoNn with oxygen
+is
+
+    CcHhOoNn + (c + h/4 - o/2) O2 -> c CO2 + h/2 H2O + n/2 N2
+
+and its heating value is the enthalpy released at 298.15 K. The lower
+heating value (LHV) has gaseous water as the product and the higher
+heating value (HHV) liquid water. The reactions are derived from the
+element composition of every species and evaluated for a whole set of
+species at once:
+
+    >>> fuels = heating_values(db.reactant, db)
+    >>> fuels.LHV[fuels.species.index('RP-1')]       # J/kg
+    >>> heating_values(db.subset('C.*H.*').all, db).stoichiometric
+
+Fuel enthalpies are the `h_formation` of the database species or,
+for reactants without temperature intervals (e.g. 'RP-1' or 'H2(L)'),
+the assigned enthalpy, `h_assigned`, at the species' own reference
+temperature. Product enthalpies are those of CO2, H2O, H2O(L) and N2
+at 298.15 K.
+
+Species containing elements other than C, H, O, N and the inert gases
+Ar and He, and species that require no oxygen to burn (e.g. O2, N2O or
+CO2), are not fuels; their results are NaN.
+"""
+import collections
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import formula_matrix
+from thermodata.flame import complete_combustion, PRODUCTS
+
+
+# Elements of the fuels, in the order expected by `complete_combustion`
+ELEMENTS = ('C', 'H', 'O', 'N', 'AR', 'HE')
+
+HeatingValues = collections.namedtuple(
+    'HeatingValues',
+    'species, LHV, HHV, oxygen, stoichiometric, products'
+)
+HeatingValues.__doc__ = """Heating values and stoichiometry of fuels.
+
+Fields
+------
+
+    species : species names
+    LHV : lower heating value, J/kg of fuel
+    HHV : higher heating value, J/kg of fuel
+    oxygen : stoichiometric O2 per mol of fuel
+    stoichiometric : stoichiometric oxidizer to fuel mass ratio
+    products : dict of product name -> mol per mol of fuel (see
+        `flame.PRODUCTS`)
+"""
+
+
+def heating_values(species, db=None, oxidizer='Air'):
+    """Return the heating values of a set of species.
+
+    Arguments
+    ---------
+
+        species : sequence of SpeciesRecord or species names (e.g. a
+            category of a thermoinp.DB, or `DB.subset(...).all`)
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+        oxidizer : oxidizer species name (or SpeciesRecord) for the
+            stoichiometric ratio, e.g. 'Air' or 'O2'
+
+    Returns a HeatingValues instance; array fields have one entry per
+    species.
+    """
+    if db is None:
+        db = thermoinp.shared()
+    records = [db[s] if isinstance(s, str) else s for s in species]
+    if isinstance(oxidizer, str):
+        oxidizer = db[oxidizer]
+
+    molwt = np.array([r.molwt for r in records])
+    h = np.array([r.h_assigned if r.h_formation is None else
+                  r.h_formation for r in records])
+    atoms = formula_matrix(records, ELEMENTS)
+    supported = np.array([set(r.composition) <= set(ELEMENTS)
+                          for r in records], dtype=bool)
+    oxygen = _oxygen_demand(atoms)
+    fuel = supported & (oxygen > 0)
+
+    # Products of the stoichiometric reaction: the oxygen supplied is
+    # exactly that required for complete combustion.
+    elements = dict(zip(ELEMENTS, np.where(fuel, atoms, 0.0)))
+    elements['O'] = elements['O'] + 2 * np.where(fuel, oxygen, 0.0)
+    products = complete_combustion(elements)
+    reference = {name: db[name].h_formation for name in PRODUCTS}
+
+    # Heat released per mol of fuel (O2 enthalpy is zero at 298.15 K)
+    lower = h + oxygen * db['O2'].h_formation - sum(
+        products[name] * reference[name] for name in PRODUCTS)
+    condensation = products['H2O'] * (reference['H2O'] -
+                                       db['H2O(L)'].h_formation)
+    mass = molwt * 1e-3
+
+    supply = -_oxygen_demand(formula_matrix([oxidizer], ELEMENTS))[0]
+    if supply <= 0 or not set(oxidizer.composition) <= set(ELEMENTS):
+        errmsg = "{} is not an oxidizer.".format(oxidizer.name)
+        raise ValueError(errmsg)
+    ratio = oxygen / molwt / (supply / oxidizer.molwt)
+
+    def mask(x):
+        return np.where(fuel, x, np.nan)
+
+    return HeatingValues(species=tuple(r.name for r in records),
+                         LHV=mask(lower / mass),
+                         HHV=mask((lower + condensation) / mass),
+                         oxygen=mask(oxygen),
+                         stoichiometric=mask(ratio),
+                         products={name: mask(n)
+                                   for name, n in products.items()})
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _oxygen_demand(atoms):
+    # O2 required per mol for complete combustion from the rows (C, H,
+    # O, ...) of a formula matrix; negative for oxidizers.
+    C, H, O = atoms[:3]
+    return C + H / 4 - O / 2
@@ -0,0 +1,194 @@
+"""Temperature-range index of database species.
+
+Questions such as "which species have data covering 300-5000 K" or
+"which species are valid at 15000 K" are answered from an index of
+the overall data range of every species and of the bounds of each of
+its temperature intervals, without inspecting the interval tuples:
+
+    >>> index = db.coverage                 # a TemperatureIndex
+    >>> index.valid(15000.)                 # stabbing query
+    >>> index.covering(300., 5000.)         # range within the data
+    >>> index.within(200., 1000.)           # data within the range
+    >>> db.subset(T=(300., 5000.))
+
+An IntervalIndex stores closed intervals [lo, hi]. The sorted distinct
+endpoints split the temperature axis into elementary slots (each
+endpoint and each open gap between endpoints), over which a segment
+tree holds every interval at the O(log n) nodes spanning its slots.
+A stabbing query locates its slot by binary search and collects the
+intervals of the nodes on the path to the root; a coverage query
+[lo, hi] follows the path of lo and bisects the upper bounds, by
+which the intervals of each node are sorted. Containment queries
+bisect the intervals sorted by lower bound. Queries cost O(log n)
+(O(log^2 n) for coverage) plus the size of the result.
+"""
+import numpy as np
+
+
+class IntervalIndex(object):
+    """Static index of closed intervals.
+
+    Arguments
+    ---------
+
+        lo, hi : lower and upper bounds of the intervals
+
+    Attributes
+    ----------
+
+        lo, hi : bounds of the intervals
+        edges : sorted distinct bounds
+
+    Queries return arrays of interval indices in ascending order.
+    """
+
+    def __init__(self, lo, hi):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        if np.any(self.lo > self.hi):
+            raise ValueError("Interval lower bound exceeds upper bound.")
+        self.edges = np.unique(np.concatenate((self.lo, self.hi)))
+
+        # Segment tree over the slots (heap layout, leaves from
+        # `_size`); each interval is stored at the O(log n) nodes
+        # spanning its slots, and the intervals of a node by
+        # descending upper bound.
+        nslots = max(2 * len(self.edges) - 1, 1)
+        self._size = 1 << (nslots - 1).bit_length()
+        first = 2 * np.searchsorted(self.edges, self.lo) + self._size
+        last = 2 * np.searchsorted(self.edges, self.hi) + self._size + 1
+        nodes, members = [], []
+        for i, (l, r) in enumerate(zip(first.tolist(), last.tolist())):
+            while l < r:
+                if l & 1:
+                    nodes.append(l)
+                    members.append(i)
+                    l += 1
+                if r & 1:
+                    r -= 1
+                    nodes.append(r)
+                    members.append(i)
+                l >>= 1
+                r >>= 1
+        nodes = np.array(nodes, dtype=int)
+        members = np.array(members, dtype=int)
+        order = np.lexsort((-self.hi[members], nodes))
+        self._members = members[order]
+        self._neghi = -self.hi[self._members]
+        self._start = np.searchsorted(nodes[order],
+                                      np.arange(2 * self._size + 1))
+
+        self._by_lo = np.argsort(self.lo, kind='stable')
+        self._lo = self.lo[self._by_lo]
+
+    def __len__(self):
+        return len(self.lo)
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def stab(self, x):
+        """Return the intervals containing x (lo <= x <= hi)."""
+        return self._gather(x, None)
+
+    def covering(self, lo, hi):
+        """Return the intervals containing [lo, hi]."""
+        if lo > hi:
+            return np.zeros(0, dtype=int)
+        return self._gather(lo, hi)
+
+    def within(self, lo, hi):
+        """Return the intervals contained in [lo, hi]."""
+        a = np.searchsorted(self._lo, lo, side='left')
+        b = np.searchsorted(self._lo, hi, side='right')
+        candidates = self._by_lo[a:b]
+        return np.sort(candidates[self.hi[candidates] <= hi])
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _gather(self, x, hi):
+        # Intervals containing x (and hi, if given): the members of
+        # the nodes from the leaf of the slot of x to the root.
+        i = int(np.searchsorted(self.edges, x, side='left'))
+        if i < len(self.edges) and self.edges[i] == x:
+            node = 2 * i + self._size
+        elif 0 < i < len(self.edges):
+            node = 2 * i - 1 + self._size
+        else:
+            return np.zeros(0, dtype=int)
+        found = []
+        while node:
+            a, b = self._start[node], self._start[node + 1]
+            if hi is not None:
+                b = a + np.searchsorted(self._neghi[a:b], -hi, side='right')
+            found.append(self._members[a:b])
+            node >>= 1
+        return np.sort(np.concatenate(found))
+
+
+class TemperatureIndex(object):
+    """Temperature-range index of a sequence of species.
+
+    Arguments
+    ---------
+
+        records : sequence of SpeciesRecord (species without
+            temperature intervals are not indexed)
+
+    Attributes
+    ----------
+
+        records : indexed SpeciesRecords
+        species : IntervalIndex of the overall data range per record
+        intervals : IntervalIndex of the bounds of every interval
+        owner : (nintervals,) record index of each interval
+    """
+
+    def __init__(self, records):
+        self.records = tuple(r for r in records if r.nintervals)
+        bounds = [(i, k, interval.lim)
+                  for i, r in enumerate(self.records)
+                  for k, interval in enumerate(r.intervals)]
+        owner, position, lim = zip(*bounds) if bounds else ((), (), ())
+        lim = np.array(lim, dtype=float).reshape(-1, 2)
+        self.owner = np.array(owner, dtype=int)
+        self._position = np.array(position, dtype=int)
+        self.intervals = IntervalIndex(lim[:, 0], lim[:, 1])
+
+        # Overall range: the first and last interval of each record
+        first = np.flatnonzero(self._position == 0)
+        last = np.append(first[1:], len(self.owner)) - 1
+        self.species = IntervalIndex(lim[first, 0], lim[last, 1])
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def valid(self, T):
+        """Return the species with data at T."""
+        return self._records(self.species.stab(T))
+
+    def covering(self, Tmin, Tmax):
+        """Return the species whose data range includes [Tmin, Tmax]."""
+        return self._records(self.species.covering(Tmin, Tmax))
+
+    def within(self, Tmin, Tmax):
+        """Return the species whose data range is within [Tmin, Tmax]."""
+        return self._records(self.species.within(Tmin, Tmax))
+
+    def interval(self, T):
+        """Return (SpeciesRecord, interval) pairs of intervals at T.
+
+        Both intervals either side of a breakpoint are returned where
+        T is a breakpoint.
+        """
+        index = self.intervals.stab(T).tolist()
+        return [(self.records[self.owner[j]],
+                 self.records[self.owner[j]].intervals[self._position[j]])
+                for j in index]
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _records(self, index):
+        return [self.records[i] for i in index.tolist()]
@@ -0,0 +1,280 @@
+"""JANAF-style reference tables for the whole database.
+
+Each table lists, at standard temperatures, the heat capacity, entropy,
+Gibbs energy function -(G-H298)/T and enthalpy increment H-H298 of a
+species together with its enthalpy and Gibbs energy of formation and
+the logarithm of its equilibrium constant of formation, log Kf.
+
+    >>> tables = JanafTables(db)
+    >>> print(tables.formatted('H2O'))
+    >>> tables.table('CO2')['dfg']      # J/mol, valid temperatures only
+    >>> tables.write('janaf.txt')       # every species
+
+Formation reactions are from the elements in their reference states,
+i.e. the database species marked 'Ref-Elm' (or 'Ref-Species' for the
+electron and deuterium) in their comments, e.g. H2, O2 and C(gr). Where
+an element has several reference phases (e.g. Fe(a), Fe(c), Fe(d) and
+Fe(L)), the stable phase at each temperature is taken from a
+`phase.PhaseIndex`. The reference states are evaluated once for all
+temperatures and every species is evaluated through `polyarray` in a
+single pass; formatting the tables is spread over a pool of worker
+processes by `write`.
+
+H298 is the enthalpy of the species at 298.15 K as given in the
+database (`h_formation`), as for `thermodata.Table`. Rows are listed
+for temperatures within the data range of the species only; formation
+properties are blank where an element reference state is undefined.
+Species sharing a name (e.g. the phases either side of a lambda
+transition) are tabulated together.
+"""
+import collections
+import multiprocessing
+
+import numpy as np
+
+from thermodata import constants
+from thermodata import thermoinp
+from thermodata import workers
+from thermodata.mixture import formula_matrix
+from thermodata.phase import PhaseIndex
+from thermodata.polyarray import PolyArray
+
+
+# Standard temperatures, K
+TEMPERATURES = (200., 250., 298.15, 300., 350., 400., 450.) + tuple(
+    np.arange(500., 6001., 100.))
+
+# Table columns: field, header, units (as formatted)
+COLUMNS = (('T', 'T', 'K'),
+           ('cp', 'Cp', 'J/mol-K'),
+           ('s', 'S', 'J/mol-K'),
+           ('gef', '-(G-H298)/T', 'J/mol-K'),
+           ('dh', 'H-H298', 'kJ/mol'),
+           ('dfh', 'dfH', 'kJ/mol'),
+           ('dfg', 'dfG', 'kJ/mol'),
+           ('logkf', 'log Kf', ''))
+
+# Comment markers of element reference states
+REFERENCE_MARKERS = ('Ref-Elm', 'Ref-Species')
+
+
+class JanafTables(object):
+    """Reference tables for database species.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+        temperatures : tabulated temperatures, K
+        species : names of the species to tabulate (by default every
+            species with temperature intervals)
+
+    Attributes
+    ----------
+
+        species : tabulated species names
+        temperatures : tabulated temperatures, K
+        references : dict of element -> names of its reference phases
+        data : structured array (nrecords, ntemperatures) of the
+            table fields (see `COLUMNS`; SI units, J/mol and J/mol-K)
+            with a 'valid' flag, per database record
+    """
+
+    def __init__(self, db=None, temperatures=TEMPERATURES, species=None):
+        if db is None:
+            db = thermoinp.shared()
+        records = [r for r in db.all if r.nintervals]
+        if species is not None:
+            species = set(species)
+            missing = species - set(r.name for r in records)
+            if missing:
+                errmsg = "{} not in source database.".format(
+                    ', '.join(sorted(missing)))
+                raise KeyError(errmsg)
+            records = [r for r in records if r.name in species]
+        self.records = tuple(records)
+        self.temperatures = np.asarray(temperatures, dtype=float)
+
+        self._records = collections.OrderedDict()
+        for i, record in enumerate(self.records):
+            self._records.setdefault(record.name, []).append(i)
+        self.species = tuple(self._records)
+
+        self._reference(db)
+        self.data = self._tabulate()
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def table(self, name):
+        """Return the rows of a species table (valid temperatures).
+
+        Records sharing the name are combined; at each temperature the
+        first record whose data range includes it is taken.
+        """
+        try:
+            rows = self.data[self._records[name]]
+        except KeyError:
+            raise KeyError("{} not in source database.".format(name))
+        first = np.argmax(rows['valid'], axis=0)
+        rows = rows[first, np.arange(rows.shape[1])]
+        return rows[rows['valid']]
+
+    def formatted(self, name):
+        """Format the table of a species for printing/writing to file."""
+        return _format(name, self.table(name))
+
+    def write(self, path, processes=None, block=None):
+        """Write the tables of every species to a text file.
+
+        Arguments
+        ---------
+
+            path : output file name
+            processes : number of worker processes (defaults to the
+                number of CPUs; 1 formats in this process)
+            block : number of species per unit of work (by default the
+                species are split into four blocks per process)
+        """
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if block is None:
+            block = max(1, -(-len(self.species) // (4 * processes)))
+        names = self.species
+        tasks = [(i, (names[i:i + block],))
+                 for i in range(0, len(names), block)]
+        with open(path, 'w') as f:
+            for _, text in workers.imap(self, '_format_block', tasks,
+                                        processes, ordered=True):
+                f.write(text)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _format_block(self, names):
+        # Format the tables of a block of species (a unit of `write`)
+        return ''.join(self.formatted(name) + '\n' for name in names)
+
+    def _reference(self, db):
+        # Locate the reference states of every element present: gases
+        # are single records and condensed elements a set of phases.
+        elements = []
+        for record in self.records:
+            for element in record.composition:
+                if element not in elements:
+                    elements.append(element)
+        self.elements = tuple(elements)
+
+        gases, condensed = [], []
+        for record in db.all:
+            if not record.nintervals or len(record.composition) != 1:
+                continue
+            if any(m in record.comments for m in REFERENCE_MARKERS):
+                (condensed if record.phase else gases).append(record)
+        self._gases = PolyArray(gases)
+        self._phases = PhaseIndex(condensed)
+
+        # Reference state of each element: a gas index or a condensed
+        # substance key, the data range and the atoms per molecule.
+        sources = {}
+        for i, record in enumerate(gases):
+            (element, atoms), = record.composition.items()
+            sources[element] = (i, None, record.intervals[0].lim[0],
+                                record.intervals[-1].lim[1], atoms)
+        for record in condensed:
+            (element, atoms), = record.composition.items()
+            key = self._phases.substances[self._phases.index(record.name)]
+            _, _, lo, hi, _ = sources.get(element,
+                                          (None, key, np.inf, -np.inf, 0))
+            sources[element] = (None, key,
+                                min(lo, record.intervals[0].lim[0]),
+                                max(hi, record.intervals[-1].lim[1]), atoms)
+
+        self.references = collections.OrderedDict()
+        self._sources = []
+        for element in self.elements:
+            source = sources.get(element)
+            if source is None:
+                self.references[element] = ()
+            elif source[0] is not None:
+                self.references[element] = (gases[source[0]].name,)
+            else:
+                self.references[element] = self._phases.phases[source[1]]
+            self._sources.append(source)
+
+    def _reference_functions(self):
+        # H/RT and G/RT per atom of every element's reference state
+        # (ntemperatures, nelements); NaN outside the data range.
+        T = self.temperatures
+        h = np.full((len(T), len(self.elements)), np.nan)
+        g = np.full(h.shape, np.nan)
+        _, hg, sg = self._gases.evaluate(T)
+        for k, source in enumerate(self._sources):
+            if source is None:
+                continue
+            i, key, lo, hi, atoms = source
+            if i is not None:
+                hr, sr = hg[:, i], sg[:, i]
+            else:
+                _, hr, sr = self._phases.evaluate(key, T)
+            inside = (lo <= T) & (T <= hi)
+            h[:, k] = np.where(inside, hr, np.nan) / atoms
+            g[:, k] = np.where(inside, hr - sr, np.nan) / atoms
+        return h, g
+
+    def _tabulate(self):
+        # Evaluate every record at every temperature at once.
+        T = self.temperatures
+        R = constants.R_CEA
+        pa = PolyArray(self.records)
+        cp, h, s = pa.evaluate(T)
+        href, gref = self._reference_functions()
+        A = formula_matrix(self.records, self.elements)
+        h298 = np.array([r.h_formation for r in self.records])
+
+        # Formation properties are undefined where the reference state
+        # of any constituent element is.
+        undefined = np.isnan(href) @ (A > 0) > 0
+        href, gref = np.nan_to_num(href), np.nan_to_num(gref)
+
+        RT = R * T[:, None]
+        H = h * RT
+        data = np.zeros((len(self.records), len(T)),
+                        [(field, float) for field, _, _ in COLUMNS] +
+                        [('valid', bool)])
+        dfg = np.where(undefined, np.nan, (h - s - gref @ A) * RT)
+        columns = {'T': np.broadcast_to(T[:, None], H.shape),
+                   'cp': cp * R,
+                   's': s * R,
+                   'gef': s * R - (H - h298) / T[:, None],
+                   'dh': H - h298,
+                   'dfh': np.where(undefined, np.nan, (h - href @ A) * RT),
+                   'dfg': dfg,
+                   'logkf': -dfg / (RT * np.log(10)),
+                   'valid': pa.valid(T)}
+        for field, values in columns.items():
+            data[field] = values.T
+        return data
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def _format(name, rows):
+    # Format the rows of a species table; energies in kJ/mol.
+    spec = '{:>12}'
+    header = '  {:<8}'.format(COLUMNS[0][1]) + ''.join(
+        spec.format(title) for _, title, _ in COLUMNS[1:])
+    units = '  {:<8}'.format(COLUMNS[0][2]) + ''.join(
+        spec.format(unit) for _, _, unit in COLUMNS[1:])
+    table = [name, header, units, '-' * len(header)]
+    values = np.stack([rows[field] / 1000 if unit == 'kJ/mol'
+                       else rows[field] for field, _, unit in COLUMNS],
+                      axis=-1)
+    blank = spec.format('')
+    for row in values.tolist():
+        table.append('  {:<8g}'.format(row[0]) + ''.join(
+            blank if value != value else '{:>12.3f}'.format(value)
+            for value in row[1:]))
+    return '\n'.join(table).replace(' -0.000', '  0.000') + '\n'
@@ -0,0 +1,204 @@
+"""Equilibrium constants for reaction mechanisms.
+
+Kinetics codes evaluate reverse rate constants from the equilibrium
+constant of every reaction at every timestep. This module builds the
+(sparse) stoichiometric matrix of a mechanism once, against species in
+the `thermoinp` database, so that each evaluation costs a single pass
+over the species polynomials (see `polyarray`) and a single sparse
+matrix-vector product.
+
+    >>> reactions = ['H2 + O2 <=> 2 OH', 'H + O2 <=> O + OH']
+    >>> kc = EquilibriumConstants(reactions)
+    >>> kc.Kp(1500.)                   # shape (2,)
+    >>> kc.Kc(np.linspace(300., 3000., 10)) # shape (10, 2)
+
+Reaction equations are written with species names as they appear in
+the database, separated by ' + ' (whitespace either side, so ionic
+species such as 'H2O+' are unambiguous). Stoichiometric coefficients
+precede the species name separated by whitespace. Reactants and
+products are separated by '=', '=>' or '<=>'.
+
+Kp is referred to the standard-state pressure, `constants.P0`, and Kc
+is given in units of (mol/m**3)**dn where dn is the change in moles of
+gas. Condensed species have unit activity and so do not contribute to
+dn.
+"""
+import re
+import collections
+
+import numpy as np
+
+from thermodata import constants
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+
+
+Reaction = collections.namedtuple('Reaction', 'reactants, products')
+Reaction.__doc__ = """Reaction stoichiometry.
+
+Fields
+------
+
+    reactants : species-keyed dict of stoichiometric coefficients
+    products : species-keyed dict of stoichiometric coefficients
+"""
+
+_arrow = re.compile(r'\s*(?:<=>|=>|=)\s*')
+_plus = re.compile(r'\s+\+\s+')
+
+
+class EquilibriumConstants(object):
+    """Equilibrium constants for a list of reactions.
+
+    Arguments
+    ---------
+
+        reactions : iterable of equation strings or Reaction instances
+        db : thermoinp.DB instance providing the species data (the
+            full database is loaded if unspecified)
+
+    Attributes
+    ----------
+
+        reactions : tuple of Reaction instances
+        species : tuple of species names (stoichiometric matrix columns)
+        dn : change in moles of gas per reaction
+    """
+
+    def __init__(self, reactions, db=None):
+        if db is None:
+            db = thermoinp.shared()
+        self.reactions = tuple(
+            parse_reaction(r) if isinstance(r, str) else Reaction(*r)
+            for r in reactions
+        )
+
+        # Number the species in order of appearance.
+        columns = {}
+        for reaction in self.reactions:
+            for name in (tuple(reaction.reactants) +
+                         tuple(reaction.products)):
+                columns.setdefault(name, len(columns))
+        self.species = tuple(columns)
+
+        records = []
+        for name in self.species:
+            try:
+                records.append(db[name])
+            except KeyError:
+                errmsg = "{} not in source database.".format(name)
+                raise KeyError(errmsg)
+        self.polyarray = PolyArray(records)
+
+        # Stoichiometric matrix in compressed sparse row form. Every
+        # row has at least one entry (empty reactions are rejected)
+        # which the row reduction in `_matvec` relies on.
+        indptr, indices, data = [0], [], []
+        for reaction in self.reactions:
+            nu = _net_stoichiometry(reaction)
+            if not nu:
+                raise ValueError("Reaction {} has no net change.".format(
+                    format_reaction(reaction)))
+            for name, coeff in nu.items():
+                indices.append(columns[name])
+                data.append(coeff)
+            indptr.append(len(indices))
+        self._indptr = np.array(indptr, dtype=np.intp)
+        self._indices = np.array(indices, dtype=np.intp)
+        self._data = np.array(data, dtype=float)
+
+        isgas = (self.polyarray.phase == 0).astype(float)
+        self.dn = self._matvec(isgas)
+
+    def __len__(self):
+        return len(self.reactions)
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def delta_gnd(self, T):
+        """Return the standard Gibbs energy of reaction, dG/RT []."""
+        return self._matvec(self.polyarray.gnd(T))
+
+    def lnKp(self, T):
+        """Return the natural log of the equilibrium constant, Kp."""
+        return -self.delta_gnd(T)
+
+    def Kp(self, T):
+        """Return the equilibrium constant in terms of pressure, Kp.
+
+        Partial pressures are normalised by the standard-state
+        pressure.
+        """
+        return np.exp(self.lnKp(T))
+
+    def lnKc(self, T):
+        """Return the natural log of the equilibrium constant, Kc."""
+        T = np.asarray(T, dtype=float)[..., None]
+        return self.lnKp(T[..., 0]) + self.dn * np.log(
+            constants.P0 / (constants.R_CEA * T))
+
+    def Kc(self, T):
+        """Return the equilibrium constant in terms of concentration.
+
+        Concentrations are in mol/m**3.
+        """
+        return np.exp(self.lnKc(T))
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _matvec(self, x):
+        # Sparse product of the stoichiometric matrix with the
+        # trailing (species) axis of x; returns x.shape[:-1] + (nrxn,)
+        products = x[..., self._indices] * self._data
+        return np.add.reduceat(products, self._indptr[:-1], axis=-1)
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def parse_reaction(string):
+    """Return a Reaction instance for an equation string.
+
+        >>> parse_reaction('2 H2 + O2 <=> 2 H2O')
+        Reaction(reactants={'H2': 2.0, 'O2': 1.0}, products={'H2O': 2.0})
+    """
+    sides = _arrow.split(string.strip())
+    if len(sides) != 2:
+        raise ValueError("Invalid reaction equation: {}".format(string))
+    return Reaction(*(_parse_side(side) for side in sides))
+
+def format_reaction(reaction):
+    """Return the equation string for a Reaction instance."""
+    def side(terms):
+        return ' + '.join(
+            name if coeff == 1 else '{:g} {}'.format(coeff, name)
+            for name, coeff in terms.items()
+        )
+    return '{} <=> {}'.format(side(reaction.reactants),
+                              side(reaction.products))
+
+def _parse_side(string):
+    # Parse one side of an equation into a dict of coefficients.
+    terms = {}
+    for term in _plus.split(string):
+        fields = term.split()
+        if len(fields) == 2:
+            coeff, name = float(fields[0]), fields[1]
+        elif len(fields) == 1:
+            coeff, name = 1.0, fields[0]
+        else:
+            raise ValueError("Invalid reaction term: {}".format(term))
+        terms[name] = terms.get(name, 0.0) + coeff
+    return terms
+
+def _net_stoichiometry(reaction):
+    # Net (products - reactants) stoichiometric coefficients, omitting
+    # species that cancel.
+    nu = {}
+    for name, coeff in reaction.reactants.items():
+        nu[name] = nu.get(name, 0.0) - coeff
+    for name, coeff in reaction.products.items():
+        nu[name] = nu.get(name, 0.0) + coeff
+    return {k: v for k, v in nu.items() if v}
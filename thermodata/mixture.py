@@ -0,0 +1,223 @@
+"""Ideal mixtures of database species.
+
+A Mixture is a fixed (frozen) composition of species from the
+`thermoinp` database. State functions are evaluated through the
+vectorised polynomial path (`polyarray`) and compositions may be
+batched: the trailing axis of the amounts array runs over species and
+any leading axes describe separate mixtures.
+
+    >>> air = Mixture.from_composition({'N2': 0.78, 'O2': 0.21,
+    ...                                 'Ar': 0.01})
+    >>> air.cp(300.)              # J/kg-K
+    >>> air.gamma([300., 1000.])
+
+Mass-specific properties are per kg of mixture and molar properties
+per mol of mixture. Entropies are for the standard-state pressure,
+`constants.P0`, unless a pressure is given, and include the ideal
+entropy of mixing of the gaseous species.
+
+Species without temperature intervals (reactants with an assigned
+enthalpy, e.g. 'RP-1') contribute their assigned enthalpy to `hmol`
+and `h`. The assigned value applies at the species' `T_reference`
+only; the mask `assigned` identifies these species. Their other state
+functions are undefined (NaN) unless the species is absent.
+"""
+import numpy as np
+
+from thermodata import constants
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+
+
+class Mixture(object):
+    """Ideal mixture of species with a fixed composition.
+
+    Arguments
+    ---------
+
+        records : sequence of SpeciesRecord
+        moles : array_like (..., nspecies) of relative amounts (mol),
+            normalised to mole fractions on instantiation
+
+    Attributes
+    ----------
+
+        species : species names
+        X : mole fractions (..., nspecies)
+        elements : element symbols present in the mixture
+        assigned : mask of species with an assigned enthalpy
+    """
+
+    def __init__(self, records, moles):
+        self.polyarray = PolyArray(records)
+        self.species = self.polyarray.names
+
+        moles = np.asarray(moles, dtype=float)
+        if moles.shape[-1:] != (len(self.species),):
+            raise ValueError("Amounts do not match species.")
+        self.X = moles / moles.sum(axis=-1, keepdims=True)
+
+        elements = []
+        for record in self.polyarray.records:
+            for element in record.composition:
+                if element not in elements:
+                    elements.append(element)
+        self.elements = tuple(elements)
+        self._formula = formula_matrix(self.polyarray.records,
+                                       self.elements)
+
+        records = self.polyarray.records
+        self.assigned = self.polyarray.nintervals == 0
+        self._h_assigned = np.array([r.h_assigned or 0.0 for r in records])
+        self.T_reference = np.array([r.T_reference or np.nan
+                                     for r in records])
+
+    @classmethod
+    def from_composition(cls, composition, db=None, basis='mole'):
+        """Return a Mixture from a species-keyed dict of amounts.
+
+        Arguments
+        ---------
+
+            composition : dict of species name -> amount; amounts may
+                be array_like to describe a batch of mixtures
+            db : thermoinp.DB instance (the full database is loaded if
+                unspecified)
+            basis : 'mole' or 'mass' amounts
+        """
+        if db is None:
+            db = thermoinp.shared()
+        records = []
+        for name in composition:
+            try:
+                records.append(db[name])
+            except KeyError:
+                errmsg = "{} not in source database.".format(name)
+                raise KeyError(errmsg)
+        amounts = np.stack(np.broadcast_arrays(
+            *(np.asarray(a, dtype=float) for a in composition.values())
+        ), axis=-1)
+        if basis == 'mass':
+            amounts = amounts / np.array([r.molwt for r in records])
+        elif basis != 'mole':
+            raise ValueError("Invalid basis: {}".format(basis))
+        return cls(records, amounts)
+
+    # ----------------------------------------------------------------
+    # Composition
+    # ----------------------------------------------------------------
+    @property
+    def molwt(self):
+        """Molar mass/molecular weight, kg/kmol."""
+        return self.X @ self.polyarray.molwt
+
+    @property
+    def M(self):
+        """Molar mass, kg/mol."""
+        return self.molwt * constants.M
+
+    @property
+    def R(self):
+        """Specific gas constant, J/kg-K."""
+        return constants.R_CEA / self.M
+
+    @property
+    def Y(self):
+        """Mass fractions."""
+        return self.X * self.polyarray.molwt / self.molwt[..., None]
+
+    def element_moles(self, elements=None):
+        """Return moles of each element per kg of mixture, mol/kg.
+
+        Arguments
+        ---------
+
+            elements : sequence of element symbols (defaults to
+                `elements`); symbols absent from the mixture are zero
+        """
+        if elements is None:
+            elements = self.elements
+        atoms = self.X @ self._formula.T / self.M[..., None]
+        columns = [self.elements.index(e) if e in self.elements else None
+                   for e in elements]
+        zero = np.zeros(atoms.shape[:-1])
+        return np.stack([zero if i is None else atoms[..., i]
+                         for i in columns], axis=-1)
+
+    # ----------------------------------------------------------------
+    # Molar state functions
+    # ----------------------------------------------------------------
+    def cpmol(self, T):
+        """Return molar heat cap. at const. pressure [J/(mol K)]."""
+        return self._average(self.polyarray.cpmol(T))
+
+    def hmol(self, T):
+        """Return molar enthalpy [J/mol]."""
+        H = self.polyarray.hmol(T)
+        H = np.where(self.assigned, self._h_assigned, H)
+        return self._average(H)
+
+    def smol(self, T, P=None):
+        """Return molar entropy [J/(mol K)].
+
+        The entropy of the gaseous species is corrected for their
+        partial pressures; pressure P defaults to the standard-state
+        pressure.
+        """
+        S = self.polyarray.smol(T)
+        gas = self.polyarray.phase == 0
+        Xgas = np.where(gas, self.X, 0.0)
+        Xgas = Xgas / Xgas.sum(axis=-1, keepdims=True)
+        with np.errstate(divide='ignore'):
+            lnp = np.log(Xgas)
+        if P is not None:
+            lnp = lnp + np.log(np.asarray(P, dtype=float) /
+                               constants.P0)[..., None]
+        S = S - np.where(gas & (self.X > 0), lnp, 0.0) * constants.R_CEA
+        return self._average(S)
+
+    # ----------------------------------------------------------------
+    # Mass-specific state functions
+    # ----------------------------------------------------------------
+    def cp(self, T):
+        """Return specific heat cap. at const. pressure [J/(kg K)]."""
+        return self.cpmol(T) / self.M
+
+    def h(self, T):
+        """Return specific enthalpy [J/kg]."""
+        return self.hmol(T) / self.M
+
+    def s(self, T, P=None):
+        """Return specific entropy [J/(kg K)]."""
+        return self.smol(T, P) / self.M
+
+    def gamma(self, T):
+        """Return the ratio of specific heats []."""
+        cp = self.cpmol(T)
+        return cp / (cp - constants.R_CEA)
+
+    def sound_speed(self, T):
+        """Return the (frozen) speed of sound [m/s]."""
+        T = np.asarray(T, dtype=float)
+        return np.sqrt(self.gamma(T) * self.R * T)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _average(self, values):
+        # Mole-fraction weighted sum over species; absent species
+        # don't contribute (their values may be undefined).
+        return (np.where(self.X > 0, values, 0.0) * self.X).sum(axis=-1)
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def formula_matrix(records, elements):
+    """Return the (nelements, nspecies) matrix of atoms per species."""
+    matrix = np.zeros((len(elements), len(records)))
+    for j, record in enumerate(records):
+        for element, atoms in record.composition.items():
+            if element in elements:
+                matrix[elements.index(element), j] = atoms
+    return matrix
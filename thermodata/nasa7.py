@@ -0,0 +1,192 @@
+"""Conversion of database species to 7-coefficient NASA polynomials.
+
+CHEMKIN and Cantera use the older 7-coefficient form in two intervals
+about a common breakpoint:
+
+    Cp/R = a1 + a2 T + a3 T**2 + a4 T**3 + a5 T**4
+    H/RT = a1 + a2 T/2 + ... + a5 T**4/5 + a6/T
+    S/R  = a1 ln(T) + a2 T + ... + a5 T**4/4 + a7
+
+Each species is sampled from its 9-coefficient intervals and refitted
+by `fitting.fit`, with Cp, H and S continuous at the breakpoint and H
+and S exact at 298.15 K (or the nearest temperature of the fit range).
+Species sharing a fit range and breakpoint (most of the database) are
+fitted together against a single factorisation.
+
+    >>> result = convert(db.gaseous)
+    >>> result.cp_error.max()             # J/mol-K
+    >>> write_chemkin(result, 'therm.dat')
+    >>> write_yaml(result, 'species.yaml')
+
+The fit range of a species is its data range clipped to `T_range`;
+species whose range does not include the common breakpoint are given
+a breakpoint at the middle of their range. The writers stream one
+species at a time.
+"""
+import collections
+
+import numpy as np
+
+from thermodata import constants
+from thermodata import fitting
+from thermodata.polyarray import PolyArray, BASIS
+
+
+# Default fit range and common breakpoint, K
+T_RANGE = (200., 6000.)
+T_MID = 1000.
+
+# Exponents of the 7-coefficient heat capacity
+EXPONENTS = (0.0, 1.0, 2.0, 3.0, 4.0)
+
+Nasa7 = collections.namedtuple(
+    'Nasa7', 'records, T, T_mid, low, high, cp_error, h_error, s_error')
+Nasa7.__doc__ = """7-coefficient NASA polynomials.
+
+Fields
+------
+
+    records : source SpeciesRecords
+    T : (nspecies, 3) low, common (breakpoint) and high temperatures, K
+    T_mid : common breakpoint of the conversion, K
+    low, high : (nspecies, 7) coefficients a1..a7 of the low and high
+        temperature intervals
+    cp_error : maximum heat capacity error, J/mol-K
+    h_error : maximum enthalpy error, J/mol
+    s_error : maximum entropy error, J/mol-K
+"""
+
+
+def convert(records, T_range=T_RANGE, T_mid=T_MID, points=50):
+    """Return the 7-coefficient polynomials of a set of species.
+
+    Arguments
+    ---------
+
+        records : sequence of SpeciesRecord (species without
+            temperature intervals are skipped)
+        T_range : (T_low, T_high) limits of the fit range, K
+        T_mid : common breakpoint, K
+        points : number of samples per interval
+    """
+    records = [r for r in records if r.nintervals]
+    pa = PolyArray(records)
+    lo = np.maximum(pa.lim[:, 0], T_range[0])
+    hi = np.minimum(pa.lim[:, 1], T_range[1])
+    if np.any(lo >= hi):
+        errmsg = "{} outside the fit range.".format(
+            records[int(np.argmax(lo >= hi))].name)
+        raise ValueError(errmsg)
+    mid = np.where((lo < T_mid) & (T_mid < hi), T_mid, (lo + hi) / 2)
+
+    T = np.stack((lo, mid, hi), axis=-1)
+    low = np.zeros((len(records), 7))
+    high = np.zeros((len(records), 7))
+    errors = np.zeros((3, len(records)))
+    groups, inverse = np.unique(T, axis=0, return_inverse=True)
+    for g, (Tl, Tm, Th) in enumerate(groups):
+        members = np.flatnonzero(inverse.ravel() == g)
+        low[members], high[members], errors[:, members] = _convert(
+            PolyArray([records[i] for i in members]), Tl, Tm, Th, points)
+    return Nasa7(tuple(records), T, T_mid, low, high, *errors)
+
+def write_chemkin(result, path):
+    """Write CHEMKIN thermo data; returns the names of skipped species.
+
+    Species with non-integral element counts (e.g. 'Air') or more than
+    five elements cannot be written in the CHEMKIN format and are
+    skipped.
+    """
+    skipped = []
+    with open(path, 'w') as f:
+        f.write('THERMO\n')
+        f.write('{:>10.3f}{:>10.3f}{:>10.3f}\n'.format(
+            result.T[:, 0].min(), result.T_mid, result.T[:, 2].max()))
+        for i, record in enumerate(result.records):
+            text = _chemkin(record, result.T[i], result.low[i],
+                            result.high[i])
+            if text is None:
+                skipped.append(record.name)
+            else:
+                f.write(text)
+        f.write('END\n')
+    return tuple(skipped)
+
+def write_yaml(result, path):
+    """Write a Cantera YAML species list."""
+    with open(path, 'w') as f:
+        f.write('species:\n')
+        for i, record in enumerate(result.records):
+            f.write(_yaml(record, result.T[i], result.low[i],
+                          result.high[i]))
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _convert(pa, T_low, T_mid, T_high, points):
+    # Refit species sharing a fit range and breakpoint; returns the low
+    # and high coefficients and the maximum errors.
+    T = np.concatenate((np.linspace(T_low, T_mid, points),
+                        np.linspace(T_mid, T_high, points)[1:]))
+    T0 = min(max(fitting.T_REFERENCE, T_low), T_high)
+    result = fitting.fit(T, pa.cpmol(T).T, pa.hmol(T0), pa.smol(T0),
+                         breaks=(T_mid,), exponents=EXPONENTS,
+                         T_reference=T0)
+    coeffs = result.coeffs[..., 2:]         # a3..a7, b1, b2
+
+    # Errors against the source polynomials over the samples
+    R = constants.R_CEA
+    index = (T > T_mid).astype(int)
+    cp, h, s = (np.einsum('tk,stk->ts', BASIS[kind](T),
+                          result.coeffs[:, index])
+                for kind in ('cp', 'h', 's'))
+    cp0, h0, s0 = pa.evaluate(T)
+    errors = (np.abs(cp - cp0).max(axis=0) * R,
+              (np.abs(h - h0) * T[:, None]).max(axis=0) * R,
+              np.abs(s - s0).max(axis=0) * R)
+    return coeffs[:, 0], coeffs[:, 1], errors
+
+def _chemkin(record, T, low, high):
+    # CHEMKIN thermo entry (four 80-column lines) or None
+    composition = record.composition
+    counts = [(e, int(round(n))) for e, n in composition.items()]
+    if len(counts) > 5 or any(abs(n - composition[e]) > 1e-9
+                              for e, n in counts):
+        return None
+    elements = ''.join('{:<2s}{:>3d}'.format(e, n) for e, n in counts[:4])
+    fifth = ''.join('{:<2s}{:>3d}'.format(e, n) for e, n in counts[4:])
+    phase = 'G' if record.phase == 0 else (
+        'L' if record.name.endswith('(L)') else 'S')
+    lines = ['{:<18s}{:<6s}{:<20s}{}{:>10.3f}{:>10.3f}{:>8.2f}{:<6s}1'
+             .format(record.name[:18], record.refcode[:6], elements, phase,
+                     T[0], T[2], T[1], fifth)]
+    values = list(high) + list(low)
+    for k, start in enumerate((0, 5, 10)):
+        row = ''.join('{:>15.8E}'.format(x)
+                      for x in values[start:start + 5])
+        lines.append('{:<79s}{}'.format(row, k + 2))
+    return '\n'.join(lines) + '\n'
+
+def _yaml(record, T, low, high):
+    # Cantera YAML species entry
+    composition = ', '.join('{}: {:g}'.format(e.capitalize(), n)
+                            for e, n in record.composition.items())
+    return '\n'.join([
+        '- name: {}'.format(_quote(record.name)),
+        '  composition: {{{}}}'.format(composition),
+        '  thermo:',
+        '    model: NASA7',
+        '    temperature-ranges: [{:g}, {:g}, {:g}]'.format(*T),
+        '    data:',
+        '    - [{}]'.format(', '.join('{:.9e}'.format(x) for x in low)),
+        '    - [{}]'.format(', '.join('{:.9e}'.format(x) for x in high)),
+        '  note: {}'.format(_quote(record.refcode)),
+    ]) + '\n'
+
+def _quote(string):
+    # YAML scalar; quoted unless plain
+    if string and all(c.isalnum() or c in '()+-_,.' for c in string) and \
+            string[0] not in '-(':
+        return string
+    return "'{}'".format(string.replace("'", "''"))
@@ -0,0 +1,177 @@
+"""Stable phases of condensed species.
+
+The database stores each phase of a substance as a species of its own
+(e.g. 'H2O(cr)' and 'H2O(L)', or 'Fe(a)', 'Fe(c)', 'Fe(d)' and
+'Fe(L)'), each with its own temperature range. A PhaseIndex groups the
+phases of every condensed substance by chemical formula and computes
+the phase transition temperatures once, so that the stable phase and
+its properties may be looked up for arrays of temperatures.
+
+    >>> index = PhaseIndex(db.condensed)
+    >>> index.transitions['H2O']       # array([273.15])
+    >>> index.stable_phase('Fe', [300., 1200., 1700., 2000.])
+    >>> cp, h, s = index.evaluate(['H2O', 'AL2O3'], [[250.], [3000.]])
+
+Substances are keyed by the name of their first phase without its
+phase designation, e.g. 'H2O' or 'AL2O3' (the name of any of their
+phases is also accepted). The transition between consecutive phases is
+at the common bound of their temperature ranges; where ranges overlap
+or leave a gap, it is the temperature at which the Gibbs energies of
+the phases are equal (or the middle of the gap if they don't cross).
+Below and above the data range the lowest and highest phase is taken.
+"""
+import re
+import collections
+
+import numpy as np
+
+from thermodata.polyarray import PolyArray
+
+
+# Trailing phase designation of a species name, e.g. '(cr)' or '(L)'
+_designation = re.compile(r'\([^()]*\)$')
+
+
+class PhaseIndex(object):
+    """Index of the phases of condensed substances.
+
+    Arguments
+    ---------
+
+        records : sequence of condensed SpeciesRecord (e.g. the
+            `condensed` category of a thermoinp.DB)
+
+    Attributes
+    ----------
+
+        substances : substance keys
+        phases : dict of substance -> names of its phases (ascending
+            temperature)
+        transitions : dict of substance -> transition temperatures, K
+        polyarray : PolyArray of all phases (grouped by substance)
+    """
+
+    def __init__(self, records):
+        groups = collections.OrderedDict()
+        for record in records:
+            if record.phase == 0 or not record.nintervals:
+                continue
+            formula = tuple(sorted(record.composition.items()))
+            groups.setdefault(formula, []).append(record)
+
+        ordered, keys, start = [], [], []
+        for members in groups.values():
+            members.sort(key=lambda r: (r.intervals[0].lim[0], r.phase))
+            key = _designation.sub('', members[0].name)
+            if key in keys:
+                key = members[0].name
+            keys.append(key)
+            start.append(len(ordered))
+            ordered.extend(members)
+
+        self.substances = tuple(keys)
+        self.polyarray = PolyArray(ordered)
+        self._start = np.array(start + [len(ordered)], dtype=int)
+        self._lookup = {key: i for i, key in enumerate(keys)}
+        for i, key in enumerate(keys):
+            for record in ordered[start[i]:self._start[i + 1]]:
+                self._lookup.setdefault(record.name, i)
+
+        self.phases = collections.OrderedDict(
+            (key, self.polyarray.names[self._start[i]:self._start[i + 1]])
+            for i, key in enumerate(keys)
+        )
+        transitions = self._transitions()
+        self.transitions = collections.OrderedDict(
+            (key, transitions[self._start[i] - i:self._start[i + 1] - i - 1])
+            for i, key in enumerate(keys)
+        )
+
+        # Transition temperatures padded to a rectangular array for the
+        # vectorised lookup
+        nmax = max([len(t) for t in self.transitions.values()] + [1])
+        self._breaks = np.full((len(keys), nmax), np.inf)
+        for i, t in enumerate(self.transitions.values()):
+            self._breaks[i, :len(t)] = t
+
+    def __len__(self):
+        return len(self.substances)
+
+    def __contains__(self, name):
+        return name in self._lookup
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def index(self, substances):
+        """Return substance indices for substance or phase names."""
+        if isinstance(substances, str):
+            return self._index(substances)
+        return np.array([self._index(name) for name in substances],
+                        dtype=int)
+
+    def stable(self, substances, T):
+        """Return `polyarray` indices of the stable phases.
+
+        Arguments
+        ---------
+
+            substances : substance name(s); broadcasts against T
+            T : temperature(s), K
+        """
+        group = self.index(substances)
+        T = np.asarray(T, dtype=float)
+        group, T = np.broadcast_arrays(group, T)
+        count = (T[..., None] >= self._breaks[group]).sum(axis=-1)
+        return self._start[group] + count
+
+    def stable_phase(self, substances, T):
+        """Return the names of the stable phases (object array)."""
+        names = np.array(self.polyarray.names, dtype=object)
+        return names[self.stable(substances, T)]
+
+    def evaluate(self, substances, T):
+        """Return (Cp/R, H/RT, S/R) of the stable phases."""
+        return self.polyarray.pointwise(T, self.stable(substances, T))
+
+    def gnd(self, substances, T):
+        """Return G/RT of the stable phases []."""
+        _, h, s = self.evaluate(substances, T)
+        return h - s
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _index(self, name):
+        try:
+            return self._lookup[name]
+        except KeyError:
+            raise KeyError("{} not in phase index.".format(name))
+
+    def _transitions(self):
+        # Transition temperatures between consecutive phases of every
+        # substance, computed for all pairs at once.
+        pa = self.polyarray
+        paired = np.ones(len(pa), dtype=bool)
+        paired[self._start[:-1]] = False
+        upper = np.flatnonzero(paired)      # higher phase of each pair
+        lower = upper - 1
+        lo = np.minimum(pa.lim[lower, 1], pa.lim[upper, 0])
+        hi = np.maximum(pa.lim[lower, 1], pa.lim[upper, 0])
+
+        def difference(T):
+            # G/RT of the lower less the higher phase
+            _, h1, s1 = pa.pointwise(T, lower)
+            _, h2, s2 = pa.pointwise(T, upper)
+            return (h1 - s1) - (h2 - s2)
+
+        # Bisection where the Gibbs energies cross within [lo, hi]
+        dlo, dhi = difference(lo), difference(hi)
+        cross = (hi > lo) & (np.sign(dlo) != np.sign(dhi))
+        a, b = lo.copy(), hi.copy()
+        for _ in range(60):
+            mid = (a + b) / 2
+            dmid = difference(mid)
+            left = np.sign(dmid) == np.sign(dlo)
+            a, b = np.where(left, mid, a), np.where(left, b, mid)
+        return np.where(cross, (a + b) / 2, (lo + hi) / 2)
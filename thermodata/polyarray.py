@@ -0,0 +1,242 @@
+"""Vectorised evaluation of NASA polynomials.
+
+This module stacks the polynomial coefficients of a sequence of
+species (SpeciesRecords from `thermoinp`) into dense arrays so that
+state functions can be evaluated for every species, and for any
+number of temperatures, in a single pass.
+
+    >>> db = thermoinp.DB()
+    >>> pa = PolyArray([db['CO2'], db['H2O'], db['N2']])
+    >>> pa.cpmol(298.15)            # shape (3,)
+    >>> pa.gnd([500., 1000., 2000.]) # shape (3, 3)
+
+Temperature arrays of any shape are accepted; results have the shape
+of the temperature array with a trailing species axis. The interval
+for each species is selected as it is by `thermodata.Thermo`, i.e. the
+first interval whose upper bound is not exceeded. Temperatures outside
+the data range extrapolate the nearest interval; use `valid` to mask
+these. Species without intervals (reactants with an assigned enthalpy
+only) evaluate to NaN.
+
+Non-dimensional (suffix `nd`) and molar (suffix `mol`, J/mol and
+J/mol-K) state functions are provided, mirroring the methods of
+`poly.NASAPolyND` and `poly.NASAPolyML` respectively.
+"""
+import numpy as np
+
+from thermodata import constants
+
+
+# Exponents of the 2002-spec polynomial as used throughout the source
+# data (the eighth term is unused).
+EXPONENTS = (-2.0, -1.0, 0.0, 1.0, 2.0, 3.0, 4.0, 0.0)
+
+
+class PolyArray(object):
+    """Polynomial coefficients for a sequence of species.
+
+    Arguments
+    ---------
+
+        records : sequence of SpeciesRecord (NASAPoly intervals)
+
+    Attributes
+    ----------
+
+        names : species names
+        coeffs : (nspecies, nintervals, 9) coefficients a1..a7, b1, b2
+        bounds : (nspecies, nintervals, 2) interval bounds (NaN padded)
+        lim : (nspecies, 2) overall data range
+        nintervals : (nspecies,) number of intervals
+        molwt : (nspecies,) molar mass, kg/kmol
+        phase : (nspecies,) phase (0 for gases)
+    """
+
+    def __init__(self, records):
+        self.records = tuple(records)
+        self.names = tuple(r.name for r in self.records)
+
+        nspecies = len(self.records)
+        nmax = max([r.nintervals for r in self.records] + [1])
+        coeffs = np.zeros((nspecies, nmax, 9))
+        bounds = np.full((nspecies, nmax, 2), np.nan)
+        for i, record in enumerate(self.records):
+            for k, interval in enumerate(record.intervals or ()):
+                if tuple(interval.exp) != EXPONENTS:
+                    errmsg = "{} has non-standard exponents.".format(
+                        record.name)
+                    raise ValueError(errmsg)
+                bounds[i, k] = interval.lim
+                coeffs[i, k, :7] = interval.a[:7]
+                coeffs[i, k, 7:] = interval.b
+
+        self.coeffs = coeffs
+        self.bounds = bounds
+        self.nintervals = np.array([r.nintervals for r in self.records],
+                                   dtype=int)
+        self.molwt = np.array([r.molwt for r in self.records])
+        self.phase = np.array([r.phase for r in self.records], dtype=int)
+
+        defined = self.nintervals > 0
+        last = np.maximum(self.nintervals - 1, 0)
+        self.lim = np.full((nspecies, 2), np.nan)
+        self.lim[defined, 0] = bounds[defined, 0, 0]
+        self.lim[defined, 1] = bounds[defined, last[defined], 1]
+        self._defined = defined
+
+        # Upper bounds used to select intervals. The final interval of
+        # each species is open-ended so that counting the exceeded
+        # bounds gives the interval index directly.
+        breaks = bounds[:, :-1, 1].copy()
+        breaks[np.arange(nmax - 1) >= last[:, None]] = np.inf
+        # Most species share their breakpoints so these are stored once
+        # per distinct pattern.
+        self._breaks, self._pattern = np.unique(breaks, axis=0,
+                                                return_inverse=True)
+        self._pattern = self._pattern.ravel()
+        self._matrix = coeffs.reshape(nspecies * nmax, 9).T
+        self._offsets = np.arange(nspecies) * nmax
+
+    def __len__(self):
+        return len(self.records)
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def index(self, T):
+        """Return the interval index per temperature and species."""
+        T = _temperature(T)
+        index = (T[..., None, None] > self._breaks).sum(axis=-1)
+        return index[..., self._pattern]
+
+    def valid(self, T):
+        """Return a mask; True where T is within the data range."""
+        T = _temperature(T)[..., None]
+        return (self.lim[:, 0] <= T) & (T <= self.lim[:, 1])
+
+    def evaluate(self, T):
+        """Return (Cp/R, H/RT, S/R) for each temperature and species.
+
+        This shares the interval selection and temperature basis
+        between the three state functions.
+        """
+        cp, h, s = np.moveaxis(self._evaluate(T, ('cp', 'h', 's')), -2, 0)
+        return cp, h, s
+
+    def pointwise(self, T, species):
+        """Return (Cp/R, H/RT, S/R) for paired temperatures and species.
+
+        `species` holds species indices and broadcasts against T; each
+        temperature is evaluated for its own species only.
+        """
+        T = _temperature(T)
+        T, species = np.broadcast_arrays(T, np.asarray(species, dtype=int))
+        breaks = self._breaks[self._pattern[species]]
+        coeffs = self.coeffs[species, (T[..., None] > breaks).sum(axis=-1)]
+        defined = self._defined[species]
+        return tuple(
+            np.where(defined, (BASIS[kind](T) * coeffs).sum(axis=-1), np.nan)
+            for kind in ('cp', 'h', 's')
+        )
+
+    def cpnd(self, T):
+        """Return non-dim. heat cap. at const. pressure, Cp/R []."""
+        return self._evaluate(T, ('cp',))[..., 0, :]
+
+    def hnd(self, T):
+        """Return non-dimensional enthalpy, H/RT []."""
+        return self._evaluate(T, ('h',))[..., 0, :]
+
+    def snd(self, T):
+        """Return non-dimensional entropy, S/R []."""
+        return self._evaluate(T, ('s',))[..., 0, :]
+
+    def gnd(self, T):
+        """Return non-dimensional Gibbs energy, G/RT []."""
+        return self._evaluate(T, ('g',))[..., 0, :]
+
+    def cpmol(self, T):
+        """Return molar heat cap. at const. pressure [J/(mol K)]."""
+        return self.cpnd(T) * constants.R_CEA
+
+    def hmol(self, T):
+        """Return molar enthalpy [J/mol]."""
+        T = _temperature(T)
+        return self.hnd(T) * constants.R_CEA * T[..., None]
+
+    def smol(self, T):
+        """Return molar entropy [J/(mol K)]."""
+        return self.snd(T) * constants.R_CEA
+
+    def gmol(self, T):
+        """Return molar Gibbs energy [J/mol]."""
+        T = _temperature(T)
+        return self.gnd(T) * constants.R_CEA * T[..., None]
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _evaluate(self, T, kinds):
+        # Evaluate the state functions named in `kinds`; returns an
+        # array of shape T.shape + (len(kinds), nspecies). Every
+        # interval is evaluated in a single matrix product and the
+        # applicable interval is then picked per temperature and
+        # species.
+        T = _temperature(T)
+        basis = np.stack([BASIS[kind](T) for kind in kinds], axis=-2)
+        values = basis.reshape(-1, 9) @ self._matrix
+        size = values.shape[-1]
+        start = np.arange(len(values)).reshape(basis.shape[:-1]) * size
+        rows = (self.index(T) + self._offsets)[..., None, :]
+        values = values.ravel()[start[..., None] + rows]
+        if self._defined.all():
+            return values
+        return np.where(self._defined, values, np.nan)
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def cp_basis(T):
+    """Return the basis of the dimensionless heat capacity, Cp/R.
+
+    The basis has a trailing axis of 9 terms, so that Cp/R is its
+    product with coefficients a1..a7, b1, b2 (see `PolyArray.coeffs`);
+    likewise for `h_basis`, `s_basis` and `g_basis`.
+    """
+    one, zero = np.ones_like(T), np.zeros_like(T)
+    return np.stack((T**-2, 1/T, one, T, T**2, T**3, T**4,
+                     zero, zero), axis=-1)
+
+def h_basis(T):
+    """Return the basis of the dimensionless enthalpy, H/RT."""
+    zero = np.zeros_like(T)
+    return np.stack((-T**-2, np.log(T)/T, np.ones_like(T), T/2.0,
+                     T**2/3.0, T**3/4.0, T**4/5.0, 1/T, zero), axis=-1)
+
+def s_basis(T):
+    """Return the basis of the dimensionless entropy, S/R."""
+    zero = np.zeros_like(T)
+    return np.stack((-T**-2/2.0, -1/T, np.log(T), T, T**2/2.0,
+                     T**3/3.0, T**4/4.0, zero, np.ones_like(T)), axis=-1)
+
+def g_basis(T):
+    """Return the basis of the dimensionless Gibbs energy, G/RT."""
+    return h_basis(T) - s_basis(T)
+
+# Basis functions by state function
+BASIS = {'cp' : cp_basis,
+         'h' : h_basis,
+         's' : s_basis,
+         'g' : g_basis}
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _temperature(T):
+    # Validate temperature(s); returns a float array.
+    T = np.asarray(T, dtype=float)
+    if np.any(T <= 0):
+        raise ValueError("Invalid temperature (T<=0)")
+    return T
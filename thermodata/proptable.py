@@ -0,0 +1,231 @@
+"""Mixture property tables for flow solvers.
+
+CFD solvers commonly interpolate the thermodynamic properties of the
+gas from tables over temperature and composition. A PropertyTable
+mixes a set of streams (e.g. fuel and oxidizer) of database species and
+tabulates the frozen properties of the mixtures over a grid of
+temperatures and stream mass fractions:
+
+    >>> table = PropertyTable([{'CH4': 1.}, {'N2': 0.79, 'O2': 0.21}])
+    >>> result = table.run(np.linspace(200., 3000., 2801),
+    ...                    np.linspace(0., 1., 501))   # mixture fraction
+    >>> result.data['cp']                 # shape (2801, 501), J/kg-K
+    >>> write_binary(result, 'ch4-air.npz')
+    >>> write_ascii(result, 'ch4-air.dat')
+
+With two streams the composition coordinate is the mass fraction of
+the first stream (the mixture fraction); in general the fractions are
+an array (ncompositions, nstreams) of stream mass fractions, so that
+tables over arbitrary compositions are made with one stream per
+species.
+
+The species properties are evaluated once per temperature through
+`polyarray` and mixed for every composition by a single matrix product;
+the composition axis is split into blocks which are evaluated by a
+pool of worker processes. See `FIELDS` for the tabulated properties
+and their units.
+"""
+import collections
+import json
+import multiprocessing
+
+import numpy as np
+
+from thermodata import constants
+from thermodata import thermoinp
+from thermodata import workers
+from thermodata.mixture import Mixture
+from thermodata.polyarray import PolyArray
+
+
+# Tabulated properties
+FIELDS = (('cp', 'specific heat at constant pressure, J/kg-K'),
+          ('gamma', 'ratio of specific heats'),
+          ('h', 'specific enthalpy, J/kg'),
+          ('a', 'speed of sound, m/s'),
+          ('molwt', 'molecular weight, kg/kmol'))
+
+Table = collections.namedtuple('Table',
+                               'T, fractions, streams, species, data')
+Table.__doc__ = """Mixture property table.
+
+Fields
+------
+
+    T : temperatures, K
+    fractions : (ncompositions, nstreams) stream mass fractions
+    streams : (nstreams, nspecies) species mass fractions of the
+        streams
+    species : species names
+    data : structured array (nT, ncompositions) of `FIELDS`
+"""
+
+
+class PropertyTable(object):
+    """Property table generator for mixtures of streams.
+
+    Arguments
+    ---------
+
+        streams : sequence of species-keyed dicts of relative amounts
+            (mol)
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+
+    Attributes
+    ----------
+
+        species : species names (of all streams)
+        Y : (nstreams, nspecies) species mass fractions of the streams
+    """
+
+    def __init__(self, streams, db=None):
+        if db is None:
+            db = thermoinp.shared()
+        mixtures = [Mixture.from_composition(s, db) for s in streams]
+        species = []
+        for mixture in mixtures:
+            species.extend(n for n in mixture.species if n not in species)
+        self.species = tuple(species)
+        self.polyarray = PolyArray([db[name] for name in species])
+        undefined = [n for n, k in zip(species, self.polyarray.nintervals)
+                     if k == 0]
+        if undefined:
+            errmsg = "{} has no temperature intervals.".format(
+                ', '.join(undefined))
+            raise ValueError(errmsg)
+
+        self.Y = np.zeros((len(mixtures), len(species)))
+        for i, mixture in enumerate(mixtures):
+            columns = [species.index(n) for n in mixture.species]
+            self.Y[i, columns] = mixture.Y
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def fractions(self, fractions):
+        """Return stream mass fractions as an (n, nstreams) array.
+
+        One-dimensional fractions of a two-stream table are the mass
+        fractions of the first stream.
+        """
+        fractions = np.asarray(fractions, dtype=float)
+        if fractions.ndim == 1 and len(self.Y) == 2:
+            fractions = np.stack((fractions, 1.0 - fractions), axis=-1)
+        if fractions.ndim != 2 or fractions.shape[1] != len(self.Y):
+            raise ValueError("Fractions do not match streams.")
+        return fractions
+
+    def mole_fractions(self, fractions):
+        """Return species mole fractions (n, nspecies)."""
+        Y = self.fractions(fractions) @ self.Y
+        moles = Y / self.polyarray.molwt
+        return moles / moles.sum(axis=-1, keepdims=True)
+
+    def evaluate(self, T, fractions):
+        """Return the properties (structured array) in this process."""
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        X = self.mole_fractions(fractions)
+        R = constants.R_CEA
+        cp, h, _ = self.polyarray.evaluate(T)
+        cpmol = cp @ X.T * R
+        hmol = (h * T[:, None]) @ X.T * R
+        molwt = X @ self.polyarray.molwt
+        M = molwt * constants.M
+
+        data = np.zeros(cpmol.shape, [(name, float) for name, _ in FIELDS])
+        data['cp'] = cpmol / M
+        data['gamma'] = cpmol / (cpmol - R)
+        data['h'] = hmol / M
+        data['a'] = np.sqrt(data['gamma'] * R * T[:, None] / M)
+        data['molwt'] = molwt
+        return data
+
+    def run(self, T, fractions, processes=None, block=None):
+        """Tabulate the properties over a grid; returns a Table.
+
+        Arguments
+        ---------
+
+            T : temperatures, K
+            fractions : stream mass fractions (see `fractions`)
+            processes : number of worker processes (defaults to the
+                number of CPUs; 1 evaluates in this process)
+            block : number of compositions per unit of work (by default
+                the compositions are split into four blocks per
+                process)
+        """
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        fractions = self.fractions(fractions)
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if block is None:
+            block = max(1, -(-len(fractions) // (4 * processes)))
+        data = np.zeros((len(T), len(fractions)),
+                        [(name, float) for name, _ in FIELDS])
+        tasks = [(i, (T, fractions[i:i + block]))
+                 for i in range(0, len(fractions), block)]
+        for i, values in workers.imap(self, 'evaluate', tasks, processes):
+            data[:, i:i + values.shape[1]] = values
+        return Table(T, fractions, self.Y, self.species, data)
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def write_binary(table, path, dtype=np.float32):
+    """Write a table to a NumPy .npz archive.
+
+    The grid, the stream compositions and a JSON description of the
+    fields are stored with the properties; properties are stored as
+    `dtype` (single precision by default).
+    """
+    metadata = {'shape': list(table.data.shape),
+                'species': list(table.species),
+                'fields': collections.OrderedDict(FIELDS)}
+    arrays = {name: table.data[name].astype(dtype) for name, _ in FIELDS}
+    np.savez(path, T=table.T, fractions=table.fractions,
+             streams=table.streams, metadata=json.dumps(metadata),
+             **arrays)
+
+def read_binary(path):
+    """Return the Table of a .npz archive written by `write_binary`."""
+    with np.load(path) as archive:
+        metadata = json.loads(str(archive['metadata']))
+        data = np.zeros(tuple(metadata['shape']),
+                        [(name, float) for name in metadata['fields']])
+        for name in metadata['fields']:
+            data[name] = archive[name]
+        return Table(archive['T'], archive['fractions'],
+                     archive['streams'], tuple(metadata['species']), data)
+
+def write_ascii(table, path):
+    """Write a table as text, one row per grid point.
+
+    A commented header describes the grid, the streams and the
+    columns; rows run over the compositions for each temperature in
+    turn.
+    """
+    nstreams = table.fractions.shape[1]
+    columns = (['T, K'] +
+               ['f{}, stream {} mass fraction'.format(j, j)
+                for j in range(nstreams)] +
+               ['{}, {}'.format(name, units) for name, units in FIELDS])
+    header = ['thermodata property table',
+              'shape: {} {}'.format(*table.data.shape),
+              'species: {}'.format(' '.join(table.species))]
+    header.extend('stream {}: {}'.format(j, ' '.join(
+        '{:.9g}'.format(y) for y in Y)) for j, Y in enumerate(table.streams))
+    header.extend('column {}: {}'.format(k + 1, c)
+                  for k, c in enumerate(columns))
+
+    # One format string per temperature row block
+    n = len(table.fractions)
+    fmt = (' '.join(['%.8e'] * len(columns)) + '\n') * n
+    with open(path, 'w') as f:
+        f.write(''.join('# {}\n'.format(line) for line in header))
+        for k, T in enumerate(table.T):
+            rows = np.column_stack(
+                [np.full(n, T), table.fractions] +
+                [table.data[name][k] for name, _ in FIELDS])
+            f.write(fmt % tuple(rows.ravel().tolist()))
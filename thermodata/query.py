@@ -0,0 +1,245 @@
+"""Vectorised queries over the species of a database.
+
+Questions such as "which gases have Cp(1500 K) above 60 J/mol-K" are
+answered by evaluating the property for every candidate species in a
+single pass through `polyarray` and filtering the values with NumPy
+comparisons. Queries are made through `thermoinp.DB.query`:
+
+    >>> db.query('cp', 1500., gt=60., category='allgases')
+    >>> db.query('h_formation', ge=-100e3, le=0., species='C.*')
+
+Results are lists of (SpeciesRecord, value) pairs sorted by value.
+
+Species metadata (phase, molar mass, category, ...) are held in
+columnar arrays (see `columns`) and selected by predicate expressions,
+which combine with & (and), | (or) and ~ (not) and compile to boolean
+masks over the columns:
+
+    >>> ions = (Field('category') == 'gaseous') & (Field('charge') != 0)
+    >>> db.where(ions & (Field('molwt') < 50.))
+    >>> db.subset(where=Field('source') == 'j')
+
+The `thermoinp` module does not itself depend on NumPy; this module is
+imported on first use.
+"""
+import numpy as np
+
+from thermodata.polyarray import PolyArray
+
+
+# Queried properties: molar state functions of temperature (PolyArray
+# methods, J/mol and J/mol-K) and species constants (SpeciesRecord
+# fields, J/mol and kg/kmol).
+FUNCTIONS = {'cp': 'cpmol', 'h': 'hmol', 's': 'smol', 'g': 'gmol'}
+CONSTANTS = ('h_formation', 'molwt')
+
+# Comparison arguments of `evaluate`
+COMPARISONS = (('gt', np.greater), ('ge', np.greater_equal),
+               ('lt', np.less), ('le', np.less_equal))
+
+# Species metadata columns
+COLUMNS = (('phase', int),
+           ('molwt', float),
+           ('nintervals', int),
+           ('isproduct', bool),
+           ('category', 'U9'),          # 'condensed', 'gaseous' or
+                                        # 'reactant'
+           ('source', 'U1'),            # reference code source letter
+           ('h_formation', float),      # NaN where undefined
+           ('charge', float))
+
+
+class Predicate(object):
+    """Boolean expression over the species metadata columns.
+
+    Predicates are made by comparing Fields and are combined with the
+    operators & (and), | (or) and ~ (not).
+
+    Arguments
+    ---------
+
+        function : callable returning a boolean mask for a structured
+            array of metadata (see `columns`)
+    """
+
+    def __init__(self, function):
+        self._function = function
+
+    def mask(self, columns):
+        """Return the boolean mask of the rows of `columns`."""
+        return np.asarray(self._function(columns), dtype=bool)
+
+    def __and__(self, other):
+        return Predicate(lambda c: self.mask(c) & other.mask(c))
+
+    def __or__(self, other):
+        return Predicate(lambda c: self.mask(c) | other.mask(c))
+
+    def __invert__(self):
+        return Predicate(lambda c: ~self.mask(c))
+
+
+class Field(Predicate):
+    """Metadata column in a predicate expression.
+
+    Comparisons with a value return Predicates. A Field is itself the
+    predicate that the column is true (non-zero), e.g.
+    Field('isproduct').
+
+    Arguments
+    ---------
+
+        name : column name (see `COLUMNS`)
+    """
+
+    # Comparisons return predicates, so fields are unhashable.
+    __hash__ = None
+
+    def __init__(self, name):
+        if name not in dict(COLUMNS):
+            errmsg = "{} is not a metadata column.".format(name)
+            raise ValueError(errmsg)
+        self.name = name
+
+    def mask(self, columns):
+        """Return the boolean mask of the rows of `columns`."""
+        return columns[self.name].astype(bool)
+
+    def isin(self, values):
+        """Return the predicate that the column is one of `values`."""
+        values = list(values)
+        return Predicate(lambda c: np.isin(c[self.name], values))
+
+    def _compare(self, compare, value):
+        return Predicate(lambda c: compare(c[self.name], value))
+
+    def __eq__(self, value):
+        return self._compare(np.equal, value)
+
+    def __ne__(self, value):
+        return self._compare(np.not_equal, value)
+
+    def __lt__(self, value):
+        return self._compare(np.less, value)
+
+    def __le__(self, value):
+        return self._compare(np.less_equal, value)
+
+    def __gt__(self, value):
+        return self._compare(np.greater, value)
+
+    def __ge__(self, value):
+        return self._compare(np.greater_equal, value)
+
+
+# Named selections, e.g. for `thermodata.ChemDB.from_category`
+CATEGORIES = {
+    'gases': Field('phase') == 0,
+    'condensed': Field('phase') > 0,
+    'products': Field('isproduct'),
+    'reactants': ~Field('isproduct'),
+    'gas_products': (Field('phase') == 0) & Field('isproduct'),
+    'gas_reactants': (Field('phase') == 0) & ~Field('isproduct'),
+    'condensed_products': (Field('phase') > 0) & Field('isproduct'),
+    'condensed_reactants': (Field('phase') > 0) & ~Field('isproduct'),
+    'ions': Field('charge') != 0,
+}
+
+
+def evaluate(db, prop, records, T=None):
+    """Return the values of a property for a sequence of records.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB instance holding the records
+        prop : property name (see `FUNCTIONS` and `CONSTANTS`)
+        records : sequence of SpeciesRecord
+        T : temperature of state functions, K
+
+    Values are NaN where a species has no value, i.e. at temperatures
+    outside its data range, without temperature intervals or without
+    a heat of formation.
+    """
+    if prop in CONSTANTS:
+        return np.array([np.nan if getattr(r, prop) is None else
+                         getattr(r, prop) for r in records], dtype=float)
+    if prop not in FUNCTIONS:
+        errmsg = "{} is not a queryable property.".format(prop)
+        raise ValueError(errmsg)
+    if T is None:
+        errmsg = "{} requires a temperature.".format(prop)
+        raise ValueError(errmsg)
+
+    # One evaluation of every species of the database, indexed by the
+    # candidates (species without intervals are absent).
+    pa, rows = _polyarray(db)
+    index = np.array([rows.get(id(r), -1) for r in records], dtype=int)
+    values = getattr(pa, FUNCTIONS[prop])(T)
+    values = np.where(pa.valid(T), values, np.nan)
+    values = np.append(values, np.nan)      # row -1: undefined
+    return values[index]
+
+def columns(db):
+    """Return the species metadata of a database (structured array).
+
+    There is one row per record of `db.all` and one field per column
+    of `COLUMNS`: `source` is the first letter of the reference code
+    (e.g. 'g' for Glenn or 'j' for JANAF) and `charge` the ionic
+    charge (-1 for the electron). The array is built once per database.
+    """
+    try:
+        return db._query_columns
+    except AttributeError:
+        pass
+    rows = []
+    for category in db.list_categories():
+        for r in getattr(db, category):
+            rows.append((r.phase, r.molwt, r.nintervals, r.isproduct,
+                         category, r.refcode[:1],
+                         np.nan if r.h_formation is None else r.h_formation,
+                         -r.composition.get('E', 0.0)))
+    db._query_columns = np.array(rows, dtype=list(COLUMNS))
+    return db._query_columns
+
+def where(db, predicate):
+    """Return the records of a database selected by a predicate."""
+    index = np.flatnonzero(predicate.mask(columns(db)))
+    records = db.all
+    return [records[i] for i in index.tolist()]
+
+def select(records, values, reverse=False, **bounds):
+    """Return (record, value) pairs within bounds, sorted by value.
+
+    Bounds are the keyword arguments of `COMPARISONS`, e.g. gt=60.;
+    NaN values are excluded.
+    """
+    mask = ~np.isnan(values)
+    for key, compare in COMPARISONS:
+        bound = bounds.pop(key, None)
+        if bound is not None:
+            mask &= compare(np.where(mask, values, 0.0), bound)
+    if bounds:
+        errmsg = "Unknown comparison {}.".format(', '.join(sorted(bounds)))
+        raise TypeError(errmsg)
+    index = np.flatnonzero(mask)
+    order = index[np.argsort(values[index], kind='stable')]
+    if reverse:
+        order = order[::-1]
+    return [(records[i], v) for i, v in zip(order.tolist(),
+                                            values[order].tolist())]
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _polyarray(db):
+    # PolyArray of every species with intervals, cached on the database,
+    # and a dict of record id -> row.
+    try:
+        return db._query_polyarray
+    except AttributeError:
+        records = [r for r in db.all if r.nintervals]
+        rows = {id(r): i for i, r in enumerate(records)}
+        db._query_polyarray = PolyArray(records), rows
+        return db._query_polyarray
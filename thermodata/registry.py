@@ -0,0 +1,126 @@
+"""Registry of database versions sharing identical species data.
+
+Regression comparisons keep several versions of thermo.inp loaded at
+once, most of whose species are identical. A Registry loads each
+version as a `thermoinp.DB` and interns its records by content hash
+(`thermoinp.SpeciesRecord.content_hash`) and its temperature intervals
+by value, so that identical species and coefficient rows are held once
+and memory grows only with the differences between versions:
+
+    >>> registry = Registry()
+    >>> registry.load('2002', 'thermo-2002.inp')
+    >>> registry.load('2016', 'thermo-2016.inp')
+    >>> registry['2016'].lookup('CH4')      # a thermoinp.DB
+    >>> registry.diff('2002', '2016')       # see `dbdiff`
+
+Interned records are shared between the versions holding them, so the
+source text of a shared record (`SpeciesRecord.formatted`) is that of
+the first version loaded with it.
+"""
+from thermodata import thermoinp
+
+
+class Registry(object):
+    """Database versions with interned species records.
+
+    Attributes
+    ----------
+
+        versions : dict of label -> thermoinp.DB, in order of loading
+    """
+
+    def __init__(self):
+        self.versions = {}
+        self._records = {}
+        self._intervals = {}
+
+    def __getitem__(self, label):
+        return self.versions[label]
+
+    def __contains__(self, label):
+        return label in self.versions
+
+    def __iter__(self):
+        return iter(self.versions)
+
+    def __len__(self):
+        return len(self.versions)
+
+    @property
+    def nrecords(self):
+        """Number of distinct records of all the versions."""
+        return len(self._records)
+
+    @property
+    def nintervals(self):
+        """Number of distinct temperature intervals of all the versions."""
+        return len(self._intervals)
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def load(self, label, path=None, polytype=''):
+        """Load a database version from a thermo.inp file.
+
+        Arguments
+        ---------
+
+            label : version label
+            path : source file (the packaged database if unspecified)
+            polytype : polynomial class, as for thermoinp.DB
+
+        Returns the interned thermoinp.DB.
+        """
+        return self.add(label, thermoinp.DB(polytype, path))
+
+    def add(self, label, db):
+        """Add a database version, interning its records.
+
+        Returns a thermoinp.DB of the interned records of `db`.
+        """
+        if label in self.versions:
+            errmsg = "Version {} is already registered.".format(label)
+            raise ValueError(errmsg)
+        interned = db.from_records(self._intern(r, db.polytype)
+                                   for r in db.all)
+        interned.polytype = db.polytype
+        self.versions[label] = interned
+        return interned
+
+    def remove(self, label):
+        """Remove a database version (and records held by it alone)."""
+        del self.versions[label]
+        held = set()
+        for db in self.versions.values():
+            held.update(map(id, db.all))
+        self._records = {key: r for key, r in self._records.items()
+                         if id(r) in held}
+        intervals = set(map(id, (i for r in self._records.values()
+                                 for i in r.intervals or ())))
+        self._intervals = {key: i for key, i in self._intervals.items()
+                           if id(i) in intervals}
+
+    def diff(self, old, new):
+        """Return the dbdiff.Diff between two versions (by label)."""
+        return self.versions[old].diff(self.versions[new])
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _intern(self, record, polytype):
+        # The registered record of the content of `record`; records
+        # are keyed by interval class as well, which the hash omits.
+        key = polytype, record.content_hash
+        try:
+            return self._records[key]
+        except KeyError:
+            pass
+        if record.intervals:
+            intervals = tuple(self._intervals.setdefault(
+                (type(i), tuple(i)), i) for i in record.intervals)
+            if any(a is not b for a, b in zip(intervals, record.intervals)):
+                shared = record._replace(intervals=intervals)
+                shared.__dict__.update(record.__dict__)
+                record = shared
+        self._records[key] = record
+        return record
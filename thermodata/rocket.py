@@ -0,0 +1,289 @@
+"""Rocket nozzle performance.
+
+A native equivalent of the rocket problem of CEA for an infinite-area
+combustor: the chamber is the equilibrium (HP) state of the
+propellants at the chamber pressure, and the products expand
+isentropically through the nozzle either in equilibrium (shifting
+composition) or with the chamber composition frozen.
+
+    >>> propellants = Mixture.from_composition(
+    ...     {'H2': 1., 'O2': np.linspace(4., 8., 21)}, basis='mass')
+    >>> rocket = Rocket(propellants, Pc=7e6)
+    >>> rocket.throat().c_star           # shape (21,)
+    >>> rocket.exit(area_ratio=[10., 40., 80.]).Isp   # shape (21, 3)
+
+Propellant mixes are batched through the `mixture.Mixture` (any
+leading shape) and area or pressure ratios form trailing axes of the
+exit results. Every station is solved for the whole batch at once; the
+expansion is warm-started from the throat state.
+
+Units are SI: specific impulse and characteristic velocity in m/s
+(N-s/kg), pressure in Pa. `Isp` is the impulse for expansion to the
+exit pressure (optimum expansion; CF is then Isp/c*) and `Ivac` is the
+vacuum impulse. Exit conditions are found for supersonic area ratios
+only.
+"""
+import collections
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.equilibrium import Equilibrium, EquilibriumState
+
+
+TOLERANCE = 4e-5          # Throat and area ratio convergence (as CEA)
+MAX_ITERATIONS = 20
+
+Station = collections.namedtuple(
+    'Station',
+    'state, P, T, u, mach, area_ratio, pressure_ratio, c_star, Cf, Isp, '
+    'Ivac, converged, iterations'
+)
+Station.__doc__ = """Nozzle station (throat or exit).
+
+Fields
+------
+
+    state : EquilibriumState of the products (frozen composition for
+        frozen expansion)
+    P : pressure, Pa
+    T : temperature, K
+    u : velocity, m/s
+    mach : Mach number (equilibrium or frozen speed of sound)
+    area_ratio : A/A*
+    pressure_ratio : Pc/P
+    c_star : characteristic velocity, m/s
+    Cf : thrust coefficient
+    Isp : specific impulse (optimum expansion), m/s
+    Ivac : vacuum specific impulse, m/s
+    converged : convergence flag
+    iterations : number of iterations on the station pressure
+"""
+
+
+class Rocket(object):
+    """Rocket performance for a batch of propellant mixes.
+
+    Arguments
+    ---------
+
+        reactants : Mixture (or species-keyed dict of amounts, see
+            `Mixture.from_composition`)
+        Pc : chamber pressure, Pa
+        T0 : propellant temperature, K (species with an assigned
+            enthalpy are taken at their reference temperature)
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+
+    Remaining keyword arguments are passed to the `Equilibrium` solver.
+
+    Attributes
+    ----------
+
+        chamber : EquilibriumState of the chamber
+        solver : Equilibrium instance
+    """
+
+    def __init__(self, reactants, Pc, T0=298.15, db=None, **options):
+        if db is None:
+            db = thermoinp.shared()
+        if not isinstance(reactants, Mixture):
+            reactants = Mixture.from_composition(reactants, db)
+        self.reactants = reactants
+        self.solver = Equilibrium(reactants.elements, db, **options)
+        self._b = reactants.element_moles(self.solver.elements)
+        self.chamber = self.solver.hp(self._b, reactants.h(T0), Pc)
+        self._throats = {}
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def throat(self, frozen=False):
+        """Return the throat Station (where the flow is sonic)."""
+        if frozen not in self._throats:
+            self._throats[frozen] = self._solve_throat(frozen)
+        return self._throats[frozen]
+
+    def exit(self, area_ratio=None, pressure_ratio=None, frozen=False):
+        """Return the exit Station for area or pressure ratios.
+
+        Arguments
+        ---------
+
+            area_ratio : supersonic exit to throat area ratios, Ae/At
+            pressure_ratio : chamber to exit pressure ratios, Pc/Pe
+            frozen : expand with the chamber composition frozen
+
+        Exactly one of area_ratio and pressure_ratio is given; its
+        shape is appended to the propellant batch shape.
+        """
+        if (area_ratio is None) == (pressure_ratio is None):
+            raise ValueError("Specify one of area or pressure ratio.")
+        throat = self.throat(frozen)
+        ratio = np.asarray(area_ratio if pressure_ratio is None
+                           else pressure_ratio, dtype=float)
+        if np.any(ratio < 1):
+            raise ValueError("Ratios must be at least 1.")
+        ndim = ratio.ndim
+        lnPc = np.log(_expand(self.chamber.P, ndim))
+
+        if pressure_ratio is not None:
+            P = np.exp(lnPc - np.log(ratio))
+            state = self._isentrope(P, frozen, _expand_state(throat.state,
+                                                             ndim))
+            return self._station(state, frozen, throat,
+                                 np.ones(state.T.shape, dtype=bool),
+                                 np.zeros(state.T.shape, dtype=int))
+
+        # Initial estimate of ln(Pc/Pe) (RP-1311 eq. 6.20 and 6.21)
+        chamber = self.chamber
+        gamma = chamber.gamma if frozen else chamber.gamma_s
+        lneps = np.log(ratio)
+        lnPt = np.log(_expand(throat.P, ndim))
+        lnPr = np.where(
+            ratio < 2,
+            lnPc - lnPt + np.sqrt(3.294 * lneps**2 + 1.535 * lneps),
+            _expand(gamma, ndim) + 1.4 * lneps)
+        lnP = lnPc - lnPr
+        flux = _expand(throat.state.rho * throat.u, ndim)
+
+        state = _expand_state(throat.state, ndim)
+        converged = np.zeros(lnP.shape, dtype=bool)
+        iterations = np.zeros(converged.shape, dtype=int)
+        for _ in range(MAX_ITERATIONS):
+            state = self._isentrope(np.exp(lnP), frozen, state)
+            u2, a2 = self._velocities(state, frozen, ndim)
+            u2 = np.maximum(u2, 1e-10 * a2)
+            error = np.log(flux / (state.rho * np.sqrt(u2))) - lneps
+            converged = np.abs(error) <= TOLERANCE
+            if np.all(converged):
+                break
+            iterations += ~converged
+            # d ln(A/A*) / d lnP for isentropic flow
+            slope = -(state.P / state.rho) * (1.0 / a2 - 1.0 / u2)
+            step = np.where(converged, 0.0, -error / slope)
+            lnP = np.minimum(lnP + np.clip(step, -1.0, 1.0), lnPt)
+        return self._station(state, frozen, throat, converged, iterations)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _solve_throat(self, frozen):
+        # Iterate on the throat pressure until the velocity is sonic;
+        # d(u**2)/dlnP = -2P/rho along the isentrope.
+        chamber = self.chamber
+        gamma = chamber.gamma if frozen else chamber.gamma_s
+        lnP = np.log(chamber.P) - gamma / (gamma - 1) * np.log(
+            (gamma + 1) / 2)
+        state = chamber
+        iterations = np.zeros(chamber.T.shape, dtype=int)
+        for _ in range(MAX_ITERATIONS):
+            state = self._isentrope(np.exp(lnP), frozen, state)
+            u2, a2 = self._velocities(state, frozen, 0)
+            converged = np.abs(u2 - a2) <= TOLERANCE * a2
+            if np.all(converged):
+                break
+            iterations += ~converged
+            lnP = lnP + np.where(converged, 0.0,
+                                 (u2 - a2) / (2 * state.P / state.rho))
+        return self._station(state, frozen, None, converged, iterations)
+
+    def _isentrope(self, P, frozen, guess):
+        # State at pressure P and the chamber entropy
+        ndim = np.ndim(P) - self.chamber.T.ndim
+        s = _expand(self.chamber.s, ndim)
+        if not frozen:
+            # Estimate the temperature from the guess by the frozen
+            # isentropic relation.
+            b = _expand(self._b, ndim, trailing=1)
+            T = guess.T * (P / guess.P)**(1 - 1 / guess.gamma)
+            return self.solver.sp(b, s, P, guess=guess, T=T)
+
+        # Frozen composition; Newton iteration on lnT with
+        # ds/dlnT = cp.
+        chamber = _expand_state(self.chamber, ndim)
+        shape = np.broadcast_shapes(np.shape(P), chamber.T.shape)
+        T = np.broadcast_to(guess.T, shape).copy()
+        for _ in range(MAX_ITERATIONS):
+            state = _frozen_state(chamber, T, P)
+            dlnT = (s - state.s) / state.cp
+            T = T * np.exp(dlnT)
+            if np.all(np.abs(dlnT) <= 1e-10):
+                break
+        return _frozen_state(chamber, T, P)
+
+    def _velocities(self, state, frozen, ndim):
+        # Squared flow velocity and speed of sound
+        u2 = 2.0 * (_expand(self.chamber.h, ndim) - state.h)
+        a = state.sound_speed if frozen else state.sound_speed_eq
+        return u2, a**2
+
+    def _station(self, state, frozen, throat, converged, iterations):
+        ndim = state.T.ndim - self.chamber.T.ndim
+        u2, a2 = self._velocities(state, frozen, ndim)
+        u = np.sqrt(np.maximum(u2, 0.0))
+        Pc = _expand(self.chamber.P, ndim)
+        if throat is None:
+            flux = state.rho * u
+        else:
+            flux = _expand(throat.state.rho * throat.u, ndim)
+        c_star = Pc / flux
+        return Station(state=state,
+                       P=state.P,
+                       T=state.T,
+                       u=u,
+                       mach=u / np.sqrt(a2),
+                       area_ratio=flux / (state.rho * u),
+                       pressure_ratio=Pc / state.P,
+                       c_star=c_star,
+                       Cf=u / c_star,
+                       Isp=u,
+                       Ivac=u + state.P / (state.rho * u),
+                       converged=converged,
+                       iterations=iterations)
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def _expand(x, ndim, trailing=0):
+    # Append `ndim` unit axes after the batch axes of x, i.e. before its
+    # `trailing` axes.
+    x = np.asarray(x)
+    index = x.ndim - trailing
+    return x.reshape(x.shape[:index] + (1,) * ndim + x.shape[index:])
+
+def _expand_state(state, ndim):
+    # EquilibriumState with unit axes appended to the batch axes
+    if ndim == 0:
+        return state
+    return EquilibriumState(state.solver,
+                            _expand(state.T, ndim),
+                            _expand(state.P, ndim),
+                            _expand(state.n, ndim),
+                            _expand(state.nj, ndim, 1),
+                            _expand(state.nc, ndim, 1),
+                            _expand(state.active, ndim, 1),
+                            _expand(state.pi, ndim, 1),
+                            _expand(state.converged, ndim),
+                            _expand(state.iterations, ndim))
+
+def _frozen_state(chamber, T, P):
+    # State of the chamber composition at temperatures T and pressures
+    # P (the composition is broadcast to the shape of T and P).
+    shape = np.broadcast_shapes(np.shape(T), np.shape(P), chamber.T.shape)
+
+    def expand(x, trailing=1):
+        return np.broadcast_to(x, shape + x.shape[x.ndim - trailing:])
+
+    return EquilibriumState(chamber.solver,
+                            np.broadcast_to(T, shape),
+                            np.broadcast_to(P, shape),
+                            expand(chamber.n, 0),
+                            expand(chamber.nj),
+                            expand(chamber.nc),
+                            expand(chamber.active),
+                            expand(chamber.pi),
+                            expand(chamber.converged, 0),
+                            expand(chamber.iterations, 0))
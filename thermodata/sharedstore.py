@@ -0,0 +1,193 @@
+"""Database shared between processes through shared memory.
+
+Worker processes which each parse `thermoinp.DB()` hold a private copy
+of the data, and SpeciesRecords sent to them are pickled as nested
+tuples. A SharedStore instead publishes the database once, in the
+binary format (see `binary`), in a `multiprocessing.shared_memory`
+block. Workers attach to it by a small picklable handle and read the
+arrays in place:
+
+    >>> store = publish(thermoinp.DB())
+    >>> pool = multiprocessing.Pool(4, init, (store.handle,))
+    ...
+    >>> def init(handle):
+    ...     global db
+    ...     db = attach(handle).to_db()
+
+Records read from a store pickle as the store handle and their
+position, and are rebuilt from the attached store (once per process)
+when unpickled, so sending species to workers costs neither memory
+nor serialization time.
+
+The process which publishes a store owns the shared memory block and
+releases it with `unlink` (or on leaving a `with` block); attached
+processes `close` their view of it. Stores are attached once per
+process.
+"""
+import atexit
+import collections
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from thermodata import binary
+from thermodata import thermoinp
+
+
+# Attached stores of this process, by shared memory name
+_stores = {}
+
+
+StoreHandle = collections.namedtuple('StoreHandle', 'name size')
+StoreHandle.__doc__ = """Handle of a shared database.
+
+Fields
+------
+
+    name : name of the shared memory block
+    size : size of the binary database image, bytes
+"""
+
+
+class SharedSpeciesRecord(thermoinp.SpeciesRecord):
+    """SpeciesRecord of a shared database.
+
+    Pickles as the handle of its store and its position.
+    """
+
+    def __reduce__(self):
+        return _record, (self._handle, self._position, self._polytype)
+
+
+class SharedStore(binary.BinaryDB):
+    """Binary database in a shared memory block.
+
+    Stores are made by `publish` and `attach` rather than directly.
+
+    Arguments
+    ---------
+
+        handle : StoreHandle
+        shm : SharedMemory block (attached by name if unspecified)
+        verify : verify the section checksums on attaching
+
+    Attributes
+    ----------
+
+        handle : StoreHandle, to be passed to other processes
+        owner : the store was published by this process
+
+    The arrays (`meta`, `coeffs`, `bounds` and `dh`) are read-only
+    views of the shared memory, which must be released before the
+    store is closed.
+    """
+
+    def __init__(self, handle, shm=None, verify=False):
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=handle.name)
+        self.handle = handle
+        self.path = handle.name
+        self.owner = False
+        self._cache = {}
+        self._shm = shm
+        image = np.frombuffer(shm.buf, dtype=np.uint8, count=handle.size)
+        image.flags.writeable = False
+        self._open(image, verify)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def record(self, key, polytype=''):
+        """Return the SharedSpeciesRecord of a species.
+
+        As `binary.BinaryDB.record`; records are read once per process.
+        """
+        index = self.index(key)
+        try:
+            return self._cache[index, polytype]
+        except KeyError:
+            record, = self._records([index], polytype)
+            self._cache[index, polytype] = record
+            return record
+
+    def close(self):
+        """Close this process's view of the shared memory."""
+        if _stores.get(self.handle.name) is self:
+            del _stores[self.handle.name]
+        for name, _, _, _ in binary.SECTIONS:
+            setattr(self, name, None)
+        self._map = None
+        self._shm.close()
+
+    def unlink(self):
+        """Release the shared memory block (by its owner)."""
+        self._shm.unlink()
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _records(self, index, polytype, cls=SharedSpeciesRecord):
+        index = list(index)
+        records = super(SharedStore, self)._records(index, polytype, cls)
+        for record, position in zip(records, index):
+            record._handle = self.handle
+            record._position = position
+            record._polytype = polytype
+        return records
+
+
+# --------------------------------------------------------------------
+# Functions
+# --------------------------------------------------------------------
+def publish(db, text=True):
+    """Publish a database in shared memory.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB instance
+        text : store the source datasets (see `binary.write`)
+
+    Returns the owning SharedStore, attached in this process.
+    """
+    image = binary.dumps(db, text)
+    shm = shared_memory.SharedMemory(create=True, size=len(image))
+    shm.buf[:len(image)] = image
+    store = SharedStore(StoreHandle(shm.name, len(image)), shm)
+    store.owner = True
+    _stores[shm.name] = store
+    return store
+
+def attach(handle):
+    """Return the SharedStore of a handle, attached once per process."""
+    try:
+        return _stores[handle.name]
+    except KeyError:
+        store = _stores[handle.name] = SharedStore(handle)
+        return store
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _record(handle, position, polytype):
+    # Unpickle a SharedSpeciesRecord
+    return attach(handle).record(position, polytype)
+
+@atexit.register
+def _close_stores():
+    # Close the attached stores before their shared memory blocks are
+    # finalised (which fails while views of them exist)
+    for store in list(_stores.values()):
+        try:
+            store.close()
+        except BufferError:
+            pass
@@ -0,0 +1,306 @@
+"""Shock waves and isentropic flow of thermally perfect gases.
+
+The relations of this module hold for a gas of fixed (frozen)
+composition with temperature-dependent specific heats, given as a
+`mixture.Mixture` of database species. The calorically perfect
+formulas are used as initial estimates only; the jump conditions and
+isentropes are then solved with the species polynomials.
+
+    >>> air = Mixture.from_composition({'N2': 0.78, 'O2': 0.21,
+    ...                                 'Ar': 0.01})
+    >>> shock = normal_shock(air, np.linspace(2., 20., 100), 220., 1e3)
+    >>> shock.T, shock.iterations, shock.elapsed
+    >>> oblique_shock(air, 8., 220., 1e3, theta=np.radians(15.)).beta
+    >>> isentropic(air, [0.5, 1., 2.], T0=1500., P0=1e6).area_ratio
+
+All functions are vectorised: the Mach numbers, upstream states and
+the mixture batch broadcast against one another. Results include the
+Newton iteration count of every state and the wall-clock time of the
+call (`elapsed`, s). Temperatures beyond the range of the species data
+extrapolate the polynomials.
+"""
+import time
+import collections
+
+import numpy as np
+
+
+TOLERANCE = 1e-10         # Relative convergence tolerance
+MAX_ITERATIONS = 50
+
+Shock = collections.namedtuple(
+    'Shock',
+    'T, P, rho, u, mach, beta, theta, iterations, converged, elapsed')
+Shock.__doc__ = """State downstream of a shock wave.
+
+Fields
+------
+
+    T : temperature, K
+    P : pressure, Pa
+    rho : density, kg/m**3
+    u : velocity (shock-fixed frame), m/s
+    mach : Mach number
+    beta : wave angle, rad
+    theta : flow deflection angle, rad
+    iterations : Newton iterations
+    converged : convergence flag
+    elapsed : wall-clock time of the calculation, s
+"""
+
+Flow = collections.namedtuple(
+    'Flow',
+    'T, P, rho, u, mach, area_ratio, iterations, converged, elapsed')
+Flow.__doc__ = """State of an isentropic flow.
+
+Fields
+------
+
+    T : temperature, K
+    P : pressure, Pa
+    rho : density, kg/m**3
+    u : velocity, m/s
+    mach : Mach number
+    area_ratio : area relative to the sonic area, A/A*
+    iterations : Newton iterations
+    converged : convergence flag
+    elapsed : wall-clock time of the calculation, s
+"""
+
+
+def normal_shock(mixture, M1, T1, P1):
+    """Return the state downstream of a normal shock.
+
+    Arguments
+    ---------
+
+        mixture : Mixture of the gas
+        M1 : upstream Mach number (> 1)
+        T1 : upstream temperature, K
+        P1 : upstream pressure, Pa
+    """
+    start = time.perf_counter()
+    M1, T1, P1 = _broadcast(mixture, M1, T1, P1)
+    if np.any(M1 <= 1):
+        raise ValueError("Upstream flow must be supersonic.")
+    u1 = M1 * mixture.sound_speed(T1)
+    T2, P2, rho2, u2, iterations, converged = _jump(mixture, u1, T1, P1)
+    return Shock(T2, P2, rho2, u2, u2 / mixture.sound_speed(T2),
+                 np.full(M1.shape, np.pi / 2), np.zeros(M1.shape),
+                 iterations, converged, time.perf_counter() - start)
+
+def oblique_shock(mixture, M1, T1, P1, beta=None, theta=None):
+    """Return the state downstream of an oblique shock.
+
+    Arguments
+    ---------
+
+        mixture, M1, T1, P1 : see `normal_shock`
+        beta : wave angle, rad
+        theta : flow deflection angle, rad (the weak solution is
+            returned; states beyond the maximum deflection are NaN
+            and not converged)
+
+    Exactly one of beta and theta is given.
+    """
+    start = time.perf_counter()
+    if (beta is None) == (theta is None):
+        raise ValueError("Specify one of wave or deflection angle.")
+    angle = beta if theta is None else theta
+    M1, T1, P1, angle = _broadcast(mixture, M1, T1, P1, angle)
+    a1 = mixture.sound_speed(T1)
+    mu = np.arcsin(1.0 / M1)
+    if theta is None:
+        beta = angle
+        if np.any(beta < mu) or np.any(beta > np.pi / 2):
+            raise ValueError("Wave angle outside Mach and normal angles.")
+        shock = _oblique(mixture, M1 * a1, T1, P1, beta)
+        iterations, converged = shock[-2:]
+    else:
+        beta, iterations, converged = _wave_angle(mixture, M1 * a1, T1,
+                                                  P1, mu, angle)
+        shock = _oblique(mixture, M1 * a1, T1, P1, beta)
+        iterations = iterations + shock[-2]
+    T2, P2, rho2, u2, deflection = shock[:5]
+    return Shock(T2, P2, rho2, u2, u2 / mixture.sound_speed(T2), beta,
+                 deflection, iterations, converged,
+                 time.perf_counter() - start)
+
+def isentropic(mixture, M, T0, P0):
+    """Return the isentropic flow state from stagnation conditions.
+
+    Arguments
+    ---------
+
+        mixture : Mixture of the gas
+        M : Mach number
+        T0 : stagnation temperature, K
+        P0 : stagnation pressure, Pa
+    """
+    start = time.perf_counter()
+    M, T0, P0 = _broadcast(mixture, M, T0, P0)
+    h0 = mixture.h(T0)
+    T, iterations, converged = _static(mixture, h0, M, T0)
+    Tstar, its, conv = _static(mixture, h0, np.ones(M.shape), T0)
+    P = P0 * _pressure_ratio(mixture, T, T0)
+    Pstar = P0 * _pressure_ratio(mixture, Tstar, T0)
+    R = mixture.R
+    rho, rhostar = P / (R * T), Pstar / (R * Tstar)
+    u = M * mixture.sound_speed(T)
+    ustar = mixture.sound_speed(Tstar)
+    with np.errstate(divide='ignore'):
+        area_ratio = rhostar * ustar / (rho * u)
+    return Flow(T, P, rho, u, M, area_ratio, iterations + its,
+                converged & conv, time.perf_counter() - start)
+
+def stagnation(mixture, M, T, P):
+    """Return the stagnation (T0, P0) of a flow state.
+
+    Arguments
+    ---------
+
+        mixture : Mixture of the gas
+        M : Mach number
+        T : static temperature, K
+        P : static pressure, Pa
+    """
+    M, T, P = _broadcast(mixture, M, T, P)
+    u = M * mixture.sound_speed(T)
+    T0, _, _ = _temperature(mixture, mixture.h(T) + u**2 / 2, T)
+    return T0, P / _pressure_ratio(mixture, T, T0)
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _broadcast(mixture, *args):
+    # Broadcast arguments against each other and the mixture batch
+    shape = np.broadcast_shapes(mixture.X.shape[:-1],
+                                *(np.shape(x) for x in args))
+    return tuple(np.broadcast_to(np.asarray(x, dtype=float), shape)
+                 for x in args)
+
+def _temperature(mixture, h, T):
+    # Newton iteration for the temperature at enthalpy h from T
+    iterations = np.zeros(np.shape(h), dtype=int)
+    converged = np.zeros(np.shape(h), dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        dT = (h - mixture.h(T)) / mixture.cp(T)
+        T = T + dT
+        iterations += ~converged
+        converged = np.abs(dT) <= TOLERANCE * T
+        if np.all(converged):
+            break
+    return T, iterations, converged
+
+def _pressure_ratio(mixture, T, T0):
+    # Isentropic P/P0 of a frozen mixture between T0 and T
+    return np.exp((mixture.s(T) - mixture.s(T0)) / mixture.R)
+
+def _static(mixture, h0, M, T0):
+    # Newton iteration for the static temperature at Mach number M:
+    # h0 - h(T) = M**2 gamma R T / 2, with the derivative of gamma
+    # neglected (it only affects the rate of convergence).
+    gamma = mixture.gamma(T0)
+    T = T0 / (1 + (gamma - 1) / 2 * M**2)
+    R = mixture.R
+    iterations = np.zeros(T.shape, dtype=int)
+    converged = np.zeros(T.shape, dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        gamma = mixture.gamma(T)
+        residual = h0 - mixture.h(T) - M**2 * gamma * R * T / 2
+        slope = -mixture.cp(T) - M**2 * gamma * R / 2
+        dT = -residual / slope
+        T = T + dT
+        iterations += ~converged
+        converged = np.abs(dT) <= TOLERANCE * T
+        if np.all(converged):
+            break
+    return T, iterations, converged
+
+def _jump(mixture, u1, T1, P1):
+    # Normal shock jump conditions by Newton iteration on the density
+    # ratio, e = rho1/rho2, and the downstream temperature:
+    #   h(T2) = h1 + u1**2 (1 - e**2) / 2
+    #   P1 + rho1 u1**2 (1 - e) = rho1 R T2 / e
+    R = mixture.R
+    h1 = mixture.h(T1)
+    rho1 = P1 / (R * T1)
+    mass = rho1 * u1**2
+
+    # Calorically perfect estimate
+    gamma = mixture.gamma(T1)
+    Msq = u1**2 / (gamma * R * T1)
+    e = ((gamma - 1) * Msq + 2) / ((gamma + 1) * Msq)
+    T2 = T1 * (2 * gamma * Msq - (gamma - 1)) / (gamma + 1) / (
+        (gamma + 1) * Msq / ((gamma - 1) * Msq + 2))
+
+    iterations = np.zeros(e.shape, dtype=int)
+    converged = np.zeros(e.shape, dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        r1 = mixture.h(T2) - h1 - u1**2 * (1 - e**2) / 2
+        r2 = P1 + mass * (1 - e) - rho1 * R * T2 / e
+        a11, a12 = u1**2 * e, mixture.cp(T2)
+        a21, a22 = -mass + rho1 * R * T2 / e**2, -rho1 * R / e
+        det = a11 * a22 - a12 * a21
+        de = -(r1 * a22 - a12 * r2) / det
+        dT = -(a11 * r2 - a21 * r1) / det
+        e, T2 = e + de, T2 + dT
+        iterations += ~converged
+        converged = ((np.abs(de) <= TOLERANCE * e) &
+                     (np.abs(dT) <= TOLERANCE * T2))
+        if np.all(converged):
+            break
+    P2 = P1 + mass * (1 - e)
+    return T2, P2, rho1 / e, u1 * e, iterations, converged
+
+def _oblique(mixture, V1, T1, P1, beta):
+    # Oblique shock at wave angle beta: a normal shock in the normal
+    # velocity component with the tangential component unchanged.
+    un1, ut = V1 * np.sin(beta), V1 * np.cos(beta)
+    T2, P2, rho2, un2, iterations, converged = _jump(mixture, un1, T1, P1)
+    theta = beta - np.arctan2(un2, ut)
+    return T2, P2, rho2, np.hypot(un2, ut), theta, iterations, converged
+
+def _wave_angle(mixture, V1, T1, P1, mu, theta):
+    # Weak-shock wave angle for deflection theta. The angle of maximum
+    # deflection is bracketed by golden-section search, then theta is
+    # found by bisection-safeguarded secant iteration between the Mach
+    # angle and that angle.
+    def deflection(beta):
+        result = _oblique(mixture, V1, T1, P1, beta)
+        return result[4], result[5]
+
+    ratio = (np.sqrt(5.0) - 1) / 2
+    lo, hi = mu.copy(), np.full(mu.shape, np.pi / 2)
+    iterations = np.zeros(mu.shape, dtype=int)
+    while np.any(hi - lo > 1e-6):
+        b1, b2 = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+        (t1, n1), (t2, n2) = deflection(b1), deflection(b2)
+        iterations += n1 + n2
+        lo, hi = np.where(t1 < t2, b1, lo), np.where(t1 < t2, hi, b2)
+    bmax = (lo + hi) / 2
+    tmax, n = deflection(bmax)
+    iterations += n
+    attached = theta <= tmax
+
+    lo, hi = mu.copy(), bmax
+    flo, fhi = -theta, tmax - theta
+    beta = np.where(attached, (lo + hi) / 2, np.nan)
+    converged = ~attached
+    for _ in range(MAX_ITERATIONS):
+        # Secant step within the bracket, else bisection
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = lo - flo * (hi - lo) / (fhi - flo)
+        inside = (step > lo) & (step < hi)
+        beta = np.where(converged, beta, np.where(inside, step,
+                                                  (lo + hi) / 2))
+        f, n = deflection(np.where(converged, bmax, beta))
+        f = f - theta
+        iterations += np.where(converged, 0, n)
+        lo, flo = np.where(f < 0, beta, lo), np.where(f < 0, f, flo)
+        hi, fhi = np.where(f >= 0, beta, hi), np.where(f >= 0, f, fhi)
+        converged |= np.abs(f) <= TOLERANCE * np.maximum(theta, 1e-3)
+        if np.all(converged):
+            break
+    return beta, iterations, converged & attached
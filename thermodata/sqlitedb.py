@@ -0,0 +1,309 @@
+"""SQLite storage of the database with indexed queries.
+
+The species of a `thermoinp.DB` are exported to an SQLite file for
+tooling and ad hoc analysis, and read back through SQLiteDB, a
+`thermoinp.DB` whose species are read from the file on demand:
+
+    >>> export(thermoinp.DB(), 'thermo.sqlite')
+    >>> export(other_db, 'thermo.sqlite', append=True)   # merge
+    >>> db = SQLiteDB('thermo.sqlite')
+    >>> db.lookup('CH4')
+    >>> db.subset('C.*', T=(300., 5000.), sql='molwt < ?', params=(50.,))
+
+Tables
+------
+
+    species : one row per record; id, the SpeciesRecord fields,
+        isproduct, category (see `thermoinp.DB.list_categories`), the
+        data range tmin and tmax (NULL without intervals) and the
+        source dataset (text)
+    intervals : one row per interval; species_id, position, tmin,
+        tmax, coefficients a1..a7, b1, b2 and dh
+    composition : one row per element of a species; species_id,
+        element and atoms
+
+Species are indexed on name, phase, category, molwt and (tmin, tmax),
+intervals on species_id and (tmin, tmax), and the composition on
+element. The schema version is the SQLite user_version.
+
+Where several records share a name (within a source, or in databases
+merged with append=True) the last exported is the one looked up, as
+in `thermoinp.DB`.
+"""
+import os
+import re
+import sqlite3
+
+from thermodata import thermoinp
+
+
+SCHEMA_VERSION = 1
+
+_TABLES = (
+    'CREATE TABLE IF NOT EXISTS species ('
+    'id INTEGER PRIMARY KEY, name TEXT NOT NULL, comments TEXT, '
+    'nintervals INTEGER, refcode TEXT, formula TEXT, phase INTEGER, '
+    'molwt REAL, h_formation REAL, h_assigned REAL, T_reference REAL, '
+    'isproduct INTEGER, category TEXT, tmin REAL, tmax REAL, text TEXT)',
+    'CREATE TABLE IF NOT EXISTS intervals ('
+    'species_id INTEGER REFERENCES species(id), position INTEGER, '
+    'tmin REAL, tmax REAL, a1 REAL, a2 REAL, a3 REAL, a4 REAL, a5 REAL, '
+    'a6 REAL, a7 REAL, b1 REAL, b2 REAL, dh REAL)',
+    'CREATE TABLE IF NOT EXISTS composition ('
+    'species_id INTEGER REFERENCES species(id), element TEXT, '
+    'atoms REAL)',
+)
+
+_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS species_name ON species(name)',
+    'CREATE INDEX IF NOT EXISTS species_phase ON species(phase)',
+    'CREATE INDEX IF NOT EXISTS species_category ON species(category)',
+    'CREATE INDEX IF NOT EXISTS species_molwt ON species(molwt)',
+    'CREATE INDEX IF NOT EXISTS species_range ON species(tmin, tmax)',
+    'CREATE INDEX IF NOT EXISTS intervals_species '
+    'ON intervals(species_id)',
+    'CREATE INDEX IF NOT EXISTS intervals_range ON intervals(tmin, tmax)',
+    'CREATE INDEX IF NOT EXISTS composition_element '
+    'ON composition(element)',
+)
+
+# Regular expression metacharacters ending the literal prefix of a
+# name pattern (parentheses are literal, as in `thermoinp.DB.lookup`)
+_METACHARACTERS = '.^$*+?{}[]\\|'
+
+
+def export(db, path, append=False):
+    """Export a database to an SQLite file.
+
+    Arguments
+    ---------
+
+        db : thermoinp.DB instance
+        path : file name; the file must not exist unless appending
+        append : add the species to an existing file (merging
+            databases)
+
+    All rows are inserted with executemany in a single transaction.
+    """
+    if os.path.exists(path) and not append:
+        raise IOError("{} exists.".format(path))
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            for statement in _TABLES:
+                connection.execute(statement)
+            connection.execute(
+                'PRAGMA user_version = {:d}'.format(SCHEMA_VERSION))
+            first, = connection.execute(
+                'SELECT COALESCE(MAX(id), 0) + 1 FROM species').fetchone()
+
+            species, intervals, composition = [], [], []
+            records = ((category, record)
+                       for category in db.list_categories()
+                       for record in getattr(db, category))
+            for i, (category, r) in enumerate(records, first):
+                bounds = [k.lim for k in r.intervals or ()]
+                species.append((
+                    i, r.name, r.comments, r.nintervals, r.refcode,
+                    r.formula, r.phase, r.molwt, r.h_formation,
+                    r.h_assigned, r.T_reference, int(r.isproduct),
+                    category, bounds[0][0] if bounds else None,
+                    bounds[-1][1] if bounds else None, r.formatted))
+                intervals.extend(
+                    (i, k, k_.lim[0], k_.lim[1]) + tuple(k_.a[:7]) +
+                    tuple(k_.b) + (k_.dh,)
+                    for k, k_ in enumerate(r.intervals or ()))
+                composition.extend((i, element, atoms) for element, atoms
+                                   in r.composition.items())
+
+            connection.executemany(
+                'INSERT INTO species VALUES ({})'.format(
+                    ', '.join('?' * 16)), species)
+            connection.executemany(
+                'INSERT INTO intervals VALUES ({})'.format(
+                    ', '.join('?' * 14)), intervals)
+            connection.executemany(
+                'INSERT INTO composition VALUES (?, ?, ?)', composition)
+            for statement in _INDEXES:
+                connection.execute(statement)
+    finally:
+        connection.close()
+
+
+class SQLiteDB(thermoinp.DB):
+    """Database interface to an SQLite file written by `export`.
+
+    Arguments
+    ---------
+
+        path : SQLite file name
+        polytype : polynomial class of the intervals, as for
+            thermoinp.DB
+
+    `lookup`, `subset` and item access select species in SQL and
+    parse only the selected records. Categories (and so `all`) are
+    read in full on first use and cached.
+    """
+
+    def __init__(self, path, polytype=''):
+        if not os.path.isfile(path):
+            raise IOError("{} does not exist.".format(path))
+        self.path = path
+        self._select_polytype(polytype)
+        self._connection = sqlite3.connect(path)
+        self._connection.create_function('REGEXP', 2, _regexp)
+        self._categories = {}
+
+    # ----------------------------------------------------------------
+    # Categories
+    # ----------------------------------------------------------------
+    @property
+    def _condensed(self):
+        return self._category('condensed')
+
+    @property
+    def _gaseous(self):
+        return self._category('gaseous')
+
+    @property
+    def _reactant(self):
+        return self._category('reactant')
+
+    @property
+    def _dict(self):
+        return {s.name: s for s in self.all}
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    @classmethod
+    def from_records(cls, records, polytype=''):
+        """Create an in-memory thermoinp.DB of SpeciesRecords.
+
+        As `thermoinp.DB.from_records`; the categories of an SQLiteDB
+        are read from its file and cannot be assigned.
+        """
+        return thermoinp.DB.from_records(records, polytype)
+
+    def lookup(self, string):
+        """Query the database for species names matching `string`.
+
+        Returns a list of SpeciesRecord sorted by name, as
+        `thermoinp.DB.lookup`; the pattern is matched in SQL.
+        """
+        condition, params = _pattern(string)
+        return self._fetch(condition, params, unique=True, order='name')
+
+    def subset(self, species=(), filt=None, where=None, T=None, sql=None,
+               params=()):
+        """Create an in-memory subset of this database.
+
+        Returns a thermoinp.DB. Name patterns, the temperature range
+        and an SQL condition are evaluated in SQL; the filter function
+        and predicate (see `thermoinp.DB.subset`) are then applied to
+        the selected records.
+
+        Arguments
+        ---------
+
+            species : name pattern(s), as for `lookup`
+            filt : filter function on SpeciesRecord
+            where : thermodata.query.Predicate
+            T : temperature, K, at which species have data, or a
+                range (Tmin, Tmax) which their data covers
+            sql : condition on the columns of the species table, e.g.
+                'phase = 0 AND molwt < ?'
+            params : parameters of `sql`
+        """
+        conditions, values = [], []
+        if species:
+            if isinstance(species, str):
+                species = (species,)
+            patterns = [_pattern(s) for s in species]
+            conditions.append('({})'.format(
+                ' OR '.join(c for c, _ in patterns)))
+            values.extend(v for _, p in patterns for v in p)
+        if T is not None:
+            try:
+                Tmin, Tmax = T
+            except TypeError:
+                Tmin = Tmax = T
+            conditions.append('tmin <= ? AND tmax >= ?')
+            values.extend((Tmin, Tmax))
+        if sql:
+            conditions.append('({})'.format(sql))
+            values.extend(params)
+        records = self._fetch(' AND '.join(conditions) or '1', values,
+                              unique=True, order='name')
+        db = thermoinp.DB.from_records(records)
+        db.polytype = self.polytype
+        if filt is None and where is None:
+            return db
+        return db.subset(filt=filt, where=where)
+
+    def close(self):
+        """Close the database file."""
+        self._connection.close()
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _category(self, category):
+        # Records of a category, read on first use
+        try:
+            return self._categories[category]
+        except KeyError:
+            records = self._fetch('category = ?', (category,))
+            self._categories[category] = records
+            return records
+
+    def _fetch(self, condition, params=(), unique=False, order='id'):
+        # Parse the records of the rows matching an SQL condition; with
+        # `unique` only the last record of each name.
+        if unique:
+            condition = ('id IN (SELECT MAX(id) FROM species WHERE {} '
+                         'GROUP BY name)'.format(condition))
+        rows = self._connection.execute(
+            'SELECT text, isproduct FROM species WHERE {} ORDER BY {}'
+            .format(condition, order), tuple(params))
+        return [thermoinp.SpeciesRecord.from_dataset(
+            text.split('\n'), bool(isproduct), self.polytype)
+            for text, isproduct in rows]
+
+    # ----------------------------------------------------------------
+    # Magic methods
+    # ----------------------------------------------------------------
+    def __getitem__(self, key):
+        """Retrieve SpeciesRecord by species name (dict-like)."""
+        records = self._fetch('name = ?', (key,), unique=True)
+        if not records:
+            raise KeyError(key)
+        return records[0]
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+def _escape(string):
+    # Escape parentheses as `thermoinp.DB.lookup` does
+    return string.replace('(', r'\(').replace(')', r'\)')
+
+def _regexp(pattern, name):
+    # SQL REGEXP: re.match of an escaped pattern
+    return re.match(pattern, name) is not None
+
+def _pattern(string):
+    # SQL condition and parameters of a name pattern: REGEXP, narrowed
+    # to an index range on name by the pattern's literal prefix. An
+    # alternation has no common prefix and is matched by REGEXP alone.
+    prefix = '' if '|' in string else string
+    for k, c in enumerate(prefix):
+        if c in _METACHARACTERS:
+            # A quantifier applies to the preceding character
+            prefix = string[:k - 1 if c in '*?{' else k]
+            break
+    if not prefix:
+        return 'REGEXP(?, name)', (_escape(string),)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return ('(name >= ? AND name < ? AND REGEXP(?, name))',
+            (prefix, upper, _escape(string)))
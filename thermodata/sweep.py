@@ -0,0 +1,197 @@
+"""Equilibrium sweeps over mixture ratio, pressure and temperature.
+
+Design studies evaluate equilibrium over regular grids of oxidant to
+fuel mass ratio (O/F), pressure and temperature. A Sweep solves such a
+grid with the batched `equilibrium` solver:
+
+  - Every O/F and pressure combination forms one batch, which is
+    marched through the temperatures in order. Each step is
+    warm-started from the element potentials of its neighbour at the
+    previous temperature (continuation), so that after the first
+    temperature only a few Newton iterations are needed per state.
+  - The grid is partitioned by O/F into blocks which are solved by a
+    pool of worker processes.
+  - Results are streamed block by block into a NumPy (.npy) file,
+    opened as a memory map, rather than held in memory.
+
+    >>> sweep = Sweep({'H2': 1.}, {'O2': 1.})
+    >>> result = sweep.run(np.linspace(2., 12., 101), [1e5, 1e6, 1e7],
+    ...                    np.linspace(1000., 4000., 301), 'h2o2.npy')
+    >>> result['X'][..., result.species.index('H2O')]
+
+The result is a structured array of shape (nof, nP, nT) (see `FIELDS`
+for the fields and their units); 'X' holds the mole fractions of the
+output species.
+"""
+import multiprocessing
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata import workers
+from thermodata.mixture import Mixture
+from thermodata.equilibrium import Equilibrium
+
+
+# Scalar fields of a sweep result (besides the mole fractions, 'X')
+FIELDS = (('of', 'O/F mass ratio'),
+          ('P', 'pressure, Pa'),
+          ('T', 'temperature, K'),
+          ('converged', 'convergence flag'),
+          ('iterations', 'Newton iterations'),
+          ('molwt', 'molecular weight, kg/kmol'),
+          ('rho', 'density, kg/m**3'),
+          ('h', 'specific enthalpy, J/kg'),
+          ('s', 'specific entropy, J/kg-K'),
+          ('cp', 'frozen specific heat, J/kg-K'),
+          ('gamma', 'frozen ratio of specific heats'))
+
+
+class Sweep(object):
+    """Equilibrium sweep for a fuel and oxidant.
+
+    Arguments
+    ---------
+
+        fuel, oxidant : species-keyed dicts of relative amounts (mol)
+        db : thermoinp.DB instance (the full database is loaded if
+            unspecified)
+
+    Remaining keyword arguments are passed to the `Equilibrium` solver
+    (species, condensed, ions, max_iterations).
+
+    Attributes
+    ----------
+
+        fuel, oxidant : Mixture instances
+        solver : Equilibrium instance
+    """
+
+    def __init__(self, fuel, oxidant, db=None, **options):
+        if db is None:
+            db = thermoinp.shared()
+        self.fuel = Mixture.from_composition(fuel, db)
+        self.oxidant = Mixture.from_composition(oxidant, db)
+        elements = self.fuel.elements + tuple(
+            e for e in self.oxidant.elements if e not in self.fuel.elements)
+        self.solver = Equilibrium(elements, db, **options)
+        self._b_fuel = self.fuel.element_moles(self.solver.elements)
+        self._b_oxidant = self.oxidant.element_moles(self.solver.elements)
+
+    # ----------------------------------------------------------------
+    # External methods
+    # ----------------------------------------------------------------
+    def element_moles(self, of):
+        """Return element amounts for O/F mass ratios, mol/kg."""
+        of = np.asarray(of, dtype=float)[..., None]
+        return (self._b_fuel + of * self._b_oxidant) / (1.0 + of)
+
+    def dtype(self, species=None):
+        """Return the result dtype for the output species."""
+        species = self._output_species(species)
+        return np.dtype([(name, int if name == 'iterations' else
+                          bool if name == 'converged' else float)
+                         for name, _ in FIELDS] +
+                        [('X', float, (len(species),))])
+
+    def solve(self, of, P, T, species=None):
+        """Solve the grid in this process; returns a structured array.
+
+        Arguments
+        ---------
+
+            of : O/F mass ratios
+            P : pressures, Pa
+            T : temperatures, K (the continuation axis)
+            species : output species names (all products by default)
+        """
+        of, P, T = (np.atleast_1d(np.asarray(x, dtype=float))
+                    for x in (of, P, T))
+        columns = self._columns(species)
+        result = np.zeros((len(of), len(P), len(T)), self.dtype(species))
+        b = self.element_moles(of)[:, None, :]
+        state = None
+        for k, temperature in enumerate(T):
+            state = self.solver.tp(b, temperature, P, guess=state)
+            out = result[:, :, k]
+            out['of'] = of[:, None]
+            out['P'] = P
+            out['T'] = temperature
+            out['converged'] = state.converged
+            out['iterations'] = state.iterations
+            for name in ('molwt', 'rho', 'h', 's', 'cp', 'gamma'):
+                out[name] = getattr(state, name)
+            out['X'] = state.X[..., columns]
+        return result
+
+    def run(self, of, P, T, path, species=None, processes=None, block=None):
+        """Solve the grid and stream the results to a .npy file.
+
+        Arguments
+        ---------
+
+            of, P, T, species : see `solve`
+            path : output file name
+            processes : number of worker processes (defaults to the
+                number of CPUs; 1 solves in this process)
+            block : number of O/F ratios per unit of work (by default
+                the grid is split into four blocks per process)
+
+        Returns the result as a read-only memory map.
+        """
+        of = np.atleast_1d(np.asarray(of, dtype=float))
+        P, T = np.atleast_1d(P), np.atleast_1d(T)
+        species = self._output_species(species)
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if block is None:
+            block = max(1, -(-len(of) // (4 * processes)))
+        result = np.lib.format.open_memmap(
+            path, mode='w+', dtype=self.dtype(species),
+            shape=(len(of), len(P), len(T)))
+        tasks = [(i, (of[i:i + block], P, T, species))
+                 for i in range(0, len(of), block)]
+        for i, values in workers.imap(self, 'solve', tasks, processes):
+            result[i:i + len(values)] = values
+            result.flush()
+        del result
+        return SweepResult(path, species)
+
+    # ----------------------------------------------------------------
+    # Internal methods
+    # ----------------------------------------------------------------
+    def _output_species(self, species):
+        return tuple(self.solver.species if species is None else species)
+
+    def _columns(self, species):
+        # Indices of the output species among the solver species
+        species = self._output_species(species)
+        try:
+            return [self.solver.species.index(name) for name in species]
+        except ValueError:
+            missing = set(species) - set(self.solver.species)
+            errmsg = "{} not in products.".format(', '.join(missing))
+            raise KeyError(errmsg)
+
+
+class SweepResult(np.memmap):
+    """Sweep result; a read-only memory map of the .npy file.
+
+    Attributes
+    ----------
+
+        path : file name
+        species : names of the species in field 'X'
+    """
+
+    def __new__(cls, path, species):
+        array = np.load(path, mmap_mode='r')
+        self = array.view(cls)
+        self.path = path
+        self.species = tuple(species)
+        return self
+
+    def __array_finalize__(self, obj):
+        super(SweepResult, self).__array_finalize__(obj)
+        self.path = getattr(obj, 'path', None)
+        self.species = getattr(obj, 'species', ())
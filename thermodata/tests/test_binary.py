@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import binary
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+
+
+class TestBinaryDB(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'thermo.tdb')
+        binary.write(self.db, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_arrays(self):
+        """Arrays are memory-mapped views in the PolyArray layout."""
+        bdb = binary.BinaryDB(self.path, verify=True)
+        self.assertEqual(len(bdb), len(self.db.all))
+        self.assertIsInstance(bdb.coeffs.base, np.memmap)
+        records = [r for r in self.db.all if r.nintervals]
+        pa = PolyArray(records)
+        for record in records[::97]:
+            span = bdb.slice(bdb.names.index(record.name))
+            k = records.index(record)
+            np.testing.assert_array_equal(
+                bdb.coeffs[span], pa.coeffs[k, :record.nintervals])
+            np.testing.assert_array_equal(
+                bdb.bounds[span], pa.bounds[k, :record.nintervals])
+
+    def test_records(self):
+        """Records and the database round-trip exactly."""
+        bdb = binary.BinaryDB(self.path)
+        for name in ('CO2', 'Air', 'H2O(L)', 'Fe(a)', 'e-'):
+            record = bdb.record(name)
+            self.assertEqual(record, self.db[name])
+            self.assertEqual(record.isproduct, self.db[name].isproduct)
+        db = bdb.to_db(polytype='ml')
+        self.assertEqual(db.all, self.db.all)
+        self.assertEqual(db.format(), self.db.format())
+        with self.assertRaises(KeyError):
+            bdb.record('Adamantium')
+
+    def test_without_text(self):
+        binary.write(self.db, self.path, text=False)
+        bdb = binary.BinaryDB(self.path)
+        self.assertEqual(bdb.record('N2'), self.db['N2'])
+        self.assertIs(bdb.record('N2').formatted, None)
+
+    def test_checksums(self):
+        """Corrupt sections and headers are detected."""
+        bdb = binary.BinaryDB(self.path)
+        offset, _, _ = bdb._sections['coeffs']
+        del bdb
+        with open(self.path, 'r+b') as f:
+            f.seek(offset)
+            f.write(b'\xff')
+        bdb = binary.BinaryDB(self.path)
+        with self.assertRaises(ValueError):
+            bdb.verify()
+        del bdb
+        with open(self.path, 'r+b') as f:
+            f.seek(10)
+            f.write(b'\x07')
+        with self.assertRaises(ValueError):
+            binary.BinaryDB(self.path)
+
+    def test_truncated(self):
+        """Files cut short are corrupt, not mapped out of bounds."""
+        size = os.path.getsize(self.path)
+        header = binary._HEADER.size + binary._SECTION.size
+        for length in (size // 2, header):
+            with open(self.path, 'r+b') as f:
+                f.truncate(length)
+            with self.assertRaisesRegex(ValueError, 'corrupt'):
+                binary.BinaryDB(self.path)
+        with open(self.path, 'rb') as f:
+            image = f.read()
+        with self.assertRaisesRegex(ValueError, 'corrupt'):
+            binary.BinaryDB.from_buffer(image)
+
+    def test_not_binary(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'thermo\n')
+        with self.assertRaises(ValueError):
+            binary.BinaryDB(self.path)
@@ -0,0 +1,59 @@
+import unittest
+
+from thermodata import dbdiff
+from thermodata import thermoinp
+
+
+def _replace(record, **fields):
+    # Copy of a record with replaced fields
+    copy = record._replace(**fields)
+    copy._isproduct = record.isproduct
+    copy._formatted = record.formatted
+    return copy
+
+
+class TestDiff(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def test_content_hash(self):
+        """Hashes depend on the data, not the interval class."""
+        db = thermoinp.DB(polytype='ml')
+        for name in ('CO2', 'Air', 'H2O(L)', 'e-'):
+            self.assertEqual(db[name].content_hash,
+                             self.db[name].content_hash)
+        record = self.db['CO2']
+        self.assertNotEqual(
+            _replace(record, molwt=record.molwt + 1e-12).content_hash,
+            record.content_hash)
+
+    def test_identical(self):
+        changes = self.db.diff(thermoinp.DB())
+        self.assertFalse(changes)
+        self.assertEqual(changes.changed, frozenset())
+
+    def test_changes(self):
+        """Added, removed and modified species and intervals."""
+        co2 = self.db['CO2']
+        lim = co2.intervals[1].lim
+        interval = co2.intervals[1]._replace(dh=co2.intervals[1].dh + 1.)
+        records = [r for r in self.db.all if r.name not in ('N2', 'Ar')]
+        records = [_replace(r, intervals=(r.intervals[0], interval) +
+                            r.intervals[2:]) if r.name == 'CO2' else
+                   _replace(r, comments='Revised.') if r.name == 'Air'
+                   else r for r in records]
+        new = thermoinp.DB.from_records(records)
+        changes = dbdiff.diff(self.db, new)
+        self.assertEqual(changes.added, ())
+        self.assertEqual(changes.removed, ('Ar', 'N2'))
+        self.assertEqual([c.name for c in changes.modified],
+                         ['Air', 'CO2'])
+        air, co2 = changes.modified
+        self.assertEqual((air.fields, air.intervals), (('comments',), ()))
+        self.assertEqual((co2.fields, co2.intervals), ((), (lim,)))
+        self.assertTrue(changes.invalidates(['O2', 'CO2']))
+        self.assertFalse(changes.invalidates(['O2', 'H2O']))
+        self.assertEqual(dbdiff.diff(new, self.db).added, ('Ar', 'N2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import re
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.equilibrium import Equilibrium
+
+
+def read_reference(fname='cea_reference.out'):
+    """Return [(composition, T, P, mole fractions), ...] of the TP
+    problems of a CEA output file (see data/cea_reference.inp)."""
+    path = os.path.join(os.path.dirname(__file__), 'data', fname)
+    cases = []
+    tp = fractions = False
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if line.startswith(' problem'):
+                tp = fields[1] == 'tp'
+                if tp:
+                    case = {'composition': {}, 'X': {}}
+                    cases.append(case)
+            elif not tp or not fields:
+                continue
+            elif fields[0] == 'NAME':
+                case['composition'][fields[1]] = float(fields[2])
+            elif line.startswith(' T, K'):
+                case['T'] = float(fields[2])
+            elif line.startswith(' P, BAR'):
+                case['P'] = float(fields[2]) * 1e5
+            elif line.startswith(' MOLE FRACTIONS'):
+                fractions = True
+            elif fractions and len(fields) == 2:
+                # CEA writes exponents without the 'e', e.g. 5.8046-2
+                value = re.sub(r'(\d)([-+]\d+)$', r'\1e\2', fields[1])
+                case['X'][fields[0].lstrip('*')] = float(value)
+            else:
+                fractions = False
+    return [(c['composition'], c['T'], c['P'], c['X']) for c in cases]
+
+
+class TestEquilibrium(unittest.TestCase):
+    db = thermoinp.DB()
+    reactants = Mixture.from_composition({'H2': 2., 'O2': 1.}, db)
+    eq = Equilibrium(reactants.elements, db)
+    b = reactants.element_moles(eq.elements)
+
+    def test_reference(self):
+        """Compositions match CEA (as printed, to 5 digits)."""
+        cases = read_reference()
+        self.assertEqual(len(cases), 5)
+        for composition, T, P, X in cases:
+            reactants = Mixture.from_composition(composition, self.db)
+            eq = Equilibrium(reactants.elements, self.db)
+            state = eq.tp(reactants.element_moles(eq.elements), T, P)
+            self.assertTrue(state.converged)
+            computed = state.mole_fractions()
+            for name, value in X.items():
+                if value > 1e-6:
+                    self.assertAlmostEqual(computed[name] / value, 1.0,
+                                           delta=1e-4, msg=name)
+
+    def test_element_balance(self):
+        state = self.eq.tp(self.b, [1000., 2000., 3000., 4000.], 1e5)
+        self.assertTrue(np.all(state.converged))
+        A = np.hstack((self.eq._A, self.eq._Ac))
+        np.testing.assert_allclose(state.moles @ A.T,
+                                   np.broadcast_to(self.b, (4, 2)),
+                                   rtol=1e-6)
+
+    def test_hp(self):
+        """Adiabatic flame temperatures conserve enthalpy."""
+        h = self.reactants.h(298.15)
+        P = np.array([1e5, 1e6, 1e7])
+        state = self.eq.hp(self.b, h, P)
+        self.assertTrue(np.all(state.converged))
+        np.testing.assert_allclose(state.h, h, atol=1.0)  # J/kg
+        self.assertTrue(np.all(np.diff(state.T) > 0))
+        # CEA: 3072.79, 3388.86 and 3730.28 K (data/cea_reference.out)
+        np.testing.assert_allclose(state.T, [3072.79, 3388.86, 3730.28],
+                                   atol=0.01)
+
+    def test_sp(self):
+        """Isentropic states at the entropy of an HP state."""
+        hp = self.eq.hp(self.b, self.reactants.h(298.15), 1e6)
+        sp = self.eq.sp(self.b, hp.s, 1e6)
+        self.assertAlmostEqual(sp.T / hp.T, 1.0, places=5)
+        expanded = self.eq.sp(self.b, hp.s, 1e5)
+        self.assertTrue(expanded.T < hp.T)
+        self.assertAlmostEqual(expanded.s / hp.s, 1.0, places=6)
+
+    def test_guess(self):
+        """A neighbouring state reduces the iteration count."""
+        first = self.eq.tp(self.b, 3000., 1e5)
+        cold = self.eq.tp(self.b, 3050., 1e5)
+        warm = self.eq.tp(self.b, 3050., 1e5, guess=first)
+        self.assertTrue(warm.iterations < cold.iterations)
+        self.assertAlmostEqual(warm.mole_fractions()['H2O'] /
+                               cold.mole_fractions()['H2O'], 1.0, places=5)
+
+    def test_derivatives(self):
+        """Equilibrium derivatives agree with finite differences."""
+        state = self.eq.tp(self.b, 3000., 1e5)
+        d = 1e-3
+        up = self.eq.tp(self.b, 3000. * (1 + d), 1e5)
+        down = self.eq.tp(self.b, 3000. * (1 - d), 1e5)
+        self.assertAlmostEqual((up.h - down.h) / (6000. * d) / state.cp_eq,
+                               1.0, places=4)
+        dlnV = np.log(down.rho / up.rho) / np.log((1 + d) / (1 - d))
+        self.assertAlmostEqual(dlnV / state.dlnV_dlnT, 1.0, places=4)
+        up = self.eq.sp(self.b, state.s, 1e5 * (1 + d))
+        down = self.eq.sp(self.b, state.s, 1e5 * (1 - d))
+        a = np.sqrt(2e5 * d / (up.rho - down.rho))
+        self.assertAlmostEqual(a / state.sound_speed_eq, 1.0, places=4)
+        self.assertTrue(state.gamma_s < state.gamma)
+
+    def test_condensed(self):
+        """Graphite forms in a fuel-rich mixture at low temperature."""
+        reactants = Mixture.from_composition({'CH4': 1., 'O2': 0.5},
+                                             self.db)
+        eq = Equilibrium(reactants.elements, self.db)
+        state = eq.tp(reactants.element_moles(eq.elements), 1000., 1e5)
+        self.assertTrue(state.converged)
+        X = state.mole_fractions(1e-3)
+        self.assertIn('C(gr)', X)
+
+    def test_ions(self):
+        eq = Equilibrium(('O', 'N'), self.db, condensed=False, ions=True)
+        self.assertEqual(eq.elements, ('O', 'N', 'E'))
+        air = Mixture.from_composition({'N2': 0.79, 'O2': 0.21}, self.db)
+        state = eq.tp(air.element_moles(eq.elements), 6000., 1e4)
+        self.assertTrue(state.converged)
+        self.assertIn('NO+', state.mole_fractions())
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, self.eq.tp, [1., 2., 3.], 1000., 1e5)
+
+
+if __name__ == '__main__':
+    unittest.main()
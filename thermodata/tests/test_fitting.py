@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+from thermodata import fitting
+
+
+class TestFit(unittest.TestCase):
+    db = thermoinp.DB()
+    species = ('CO2', 'H2O', 'N2', 'CH4')
+    pa = PolyArray(map(db.__getitem__, species))
+    T = np.linspace(200., 6000., 291)
+    cp = pa.cpmol(T).T
+    h298 = pa.hmol(298.15)
+    s298 = pa.smol(298.15)
+
+    def test_refit(self):
+        """Database polynomials are recovered from their own data."""
+        result = fitting.fit(self.T, self.cp, self.h298, self.s298)
+        self.assertEqual(result.coeffs.shape, (4, 2, 9))
+        np.testing.assert_array_equal(result.bounds[0],
+                                      [[200., 1000.], [1000., 6000.]])
+        self.assertTrue(np.all(result.error < 1e-3))
+        fitted = PolyArray([self.record(result, i)
+                            for i in range(len(self.species))])
+        T = [250., 298.15, 800., 2500., 5000.]
+        np.testing.assert_allclose(fitted.hmol(T), self.pa.hmol(T),
+                                   rtol=1e-6, atol=1e-2)
+        np.testing.assert_allclose(fitted.smol(T), self.pa.smol(T),
+                                   rtol=1e-6)
+
+    def test_continuity(self):
+        """Cp, H and S are continuous at the breakpoints."""
+        breaks = (500., 1500., 3000.)
+        result = fitting.fit(self.T, self.cp, self.h298, self.s298,
+                             breaks)
+        fitted = PolyArray([self.record(result, 0)])
+        for Tb in breaks:
+            for values in fitted.evaluate([Tb, Tb + 1e-9]):
+                self.assertAlmostEqual(values[0, 0], values[1, 0], places=6)
+        np.testing.assert_allclose(fitted.hmol(298.15), self.h298[:1])
+
+    def test_stacked(self):
+        """Per-species grids give the shared-grid result."""
+        T = np.broadcast_to(self.T, self.cp.shape)
+        shared = fitting.fit(self.T, self.cp, self.h298, self.s298)
+        stacked = fitting.fit(T, self.cp, self.h298, self.s298)
+        np.testing.assert_allclose(stacked.coeffs, shared.coeffs,
+                                   rtol=1e-8)
+
+    def test_intervals(self):
+        result = fitting.fit(self.T, self.cp, self.h298, self.s298)
+        record = self.record(result, 1)
+        self.assertEqual(record.name, 'H2O')
+        self.assertEqual(record.composition, {'H': 2.0, 'O': 1.0})
+        expected = fitting.intervals(result.coeffs[1], result.bounds[1],
+                                     polycls=self.db.polytype)
+        for parsed, interval in zip(record.intervals, expected):
+            self.assertEqual(parsed.lim, interval.lim)
+            np.testing.assert_allclose(parsed.a, interval.a, rtol=1e-9)
+
+    def test_breaks(self):
+        self.assertRaises(ValueError, fitting.fit, self.T, self.cp,
+                          self.h298, self.s298, (100.,))
+
+    def record(self, result, i):
+        source = self.db[self.species[i]]
+        text = fitting.format_record(source.name, source.composition,
+                                     source.molwt, result.coeffs[i],
+                                     result.bounds[i], source.h_formation)
+        return thermoinp.SpeciesRecord.from_dataset(
+            text.split('\n'), polycls=self.db.polytype)
+
+
+if __name__ == '__main__':
+    unittest.main()
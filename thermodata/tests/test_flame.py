@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata import flame
+
+
+class TestCompleteCombustion(unittest.TestCase):
+
+    def test_lean(self):
+        moles = flame.complete_combustion({'C': 1., 'H': 4., 'O': 6.})
+        self.assertEqual(moles['CO2'], 1.)
+        self.assertEqual(moles['H2O'], 2.)
+        self.assertEqual(moles['O2'], 1.)
+        self.assertEqual(moles['CO'], 0.)
+
+    def test_rich(self):
+        """Oxygen goes to CO, then H2O, then CO2."""
+        moles = flame.complete_combustion({'C': 1., 'H': 4., 'O': 2.})
+        self.assertEqual(moles['CO'], 1.)
+        self.assertEqual(moles['H2O'], 1.)
+        self.assertEqual(moles['H2'], 1.)
+        moles = flame.complete_combustion({'C': 2., 'O': 1.})
+        self.assertEqual(moles['C(gr)'], 1.)
+
+    def test_batch(self):
+        moles = flame.complete_combustion({'H': 2., 'O': [0.5, 1., 2.]})
+        np.testing.assert_allclose(moles['H2O'], [0.5, 1., 1.])
+        np.testing.assert_allclose(moles['O2'], [0., 0., 0.5])
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, flame.complete_combustion,
+                          {'H': 2., 'F': 2.})
+
+
+class TestFlameTemperature(unittest.TestCase):
+    db = thermoinp.DB()
+    methane = Mixture.from_composition({'CH4': 1., 'O2': 2., 'N2': 7.52},
+                                       db)
+
+    def test_frozen(self):
+        result = flame.flame_temperature(self.methane, db=self.db)
+        self.assertTrue(result.converged)
+        np.testing.assert_allclose(result.products.h(result.T),
+                                   self.methane.h(298.15), atol=1.0)
+        self.assertEqual(set(result.products.species),
+                         {'CO2', 'H2O', 'N2'})
+
+    def test_equilibrium(self):
+        """Dissociation lowers the flame temperature."""
+        frozen = flame.flame_temperature(self.methane, db=self.db)
+        result = flame.flame_temperature(self.methane, db=self.db,
+                                         equilibrium=True)
+        self.assertTrue(result.converged)
+        # CEA: 2223.66 K (data/cea_reference.out)
+        self.assertAlmostEqual(result.T, 2223.66, delta=0.01)
+        self.assertTrue(result.T < frozen.T)
+
+    def test_metallised(self):
+        """Equilibrium flames of elements without complete combustion
+        products start from the solver's estimate."""
+        reactants = {'H2': 2., 'O2': 1., 'AL': 0.1}
+        self.assertRaises(ValueError, flame.flame_temperature, reactants,
+                          db=self.db)
+        result = flame.flame_temperature(reactants, db=self.db,
+                                         equilibrium=True)
+        self.assertTrue(result.converged)
+        mixture = Mixture.from_composition(reactants, self.db)
+        np.testing.assert_allclose(result.products.h, mixture.h(298.15),
+                                   atol=1.0)
+        self.assertIn('AL2O3(L)', result.products.mole_fractions(1e-3))
+
+    def test_batch(self):
+        air = np.linspace(40., 120., 9)
+        reactants = Mixture.from_composition({'Jet-A(g)': 1., 'Air': air},
+                                             self.db)
+        T0 = np.linspace(300., 500., 9)
+        result = flame.flame_temperature(reactants, T0, db=self.db)
+        self.assertEqual(result.T.shape, (9,))
+        self.assertTrue(result.converged.all())
+        single = flame.flame_temperature(
+            {'Jet-A(g)': 1., 'Air': air[4]}, T0[4], db=self.db)
+        self.assertAlmostEqual(result.T[4], single.T)
+
+    def test_assigned(self):
+        """Cryogenic reactants enter at their assigned enthalpy."""
+        reactants = Mixture.from_composition({'H2(L)': 2., 'O2(L)': 1.},
+                                             self.db)
+        self.assertTrue(reactants.assigned.all())
+        cold = flame.flame_temperature(reactants, db=self.db)
+        warm = flame.flame_temperature({'H2': 2., 'O2': 1.}, db=self.db)
+        self.assertTrue(cold.converged)
+        self.assertTrue(cold.T < warm.T)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.fuel import heating_values
+
+
+class TestHeatingValues(unittest.TestCase):
+    db = thermoinp.DB()
+    result = heating_values(db.all, db)
+
+    def get(self, field, name):
+        return getattr(self.result, field)[self.result.species.index(name)]
+
+    def test_methane(self):
+        self.assertAlmostEqual(self.get('LHV', 'CH4') / 1e6, 50.03, places=2)
+        self.assertAlmostEqual(self.get('HHV', 'CH4') / 1e6, 55.51, places=2)
+        self.assertEqual(self.get('oxygen', 'CH4'), 2.0)
+        self.assertAlmostEqual(self.get('stoichiometric', 'CH4'), 17.2,
+                               places=1)
+
+    def test_products(self):
+        products = self.result.products
+        i = self.result.species.index('NH3')
+        self.assertEqual(products['H2O'][i], 1.5)
+        self.assertEqual(products['N2'][i], 0.5)
+        self.assertEqual(products['O2'][i], 0.0)
+        self.assertEqual(products['CO'][i], 0.0)
+
+    def test_no_water(self):
+        """Without hydrogen the lower and higher values agree."""
+        self.assertEqual(self.get('LHV', 'CO'), self.get('HHV', 'CO'))
+
+    def test_assigned(self):
+        """Liquid hydrogen releases less than the gas (heat of
+        vaporisation and sensible heat)."""
+        self.assertTrue(self.get('LHV', 'H2(L)') < self.get('LHV', 'H2'))
+        self.assertTrue(np.isfinite(self.get('LHV', 'RP-1')))
+
+    def test_not_fuels(self):
+        for name in ('O2', 'CO2', 'N2O', 'Air', 'CL2', 'HCO+'):
+            self.assertTrue(np.isnan(self.get('LHV', name)))
+
+    def test_oxidizer(self):
+        result = heating_values(['H2', 'CH4'], self.db, oxidizer='O2')
+        np.testing.assert_allclose(result.stoichiometric, [7.937, 3.989],
+                                   rtol=1e-3)
+        self.assertRaises(ValueError, heating_values, ['H2'], self.db,
+                          oxidizer='N2')
+
+
+if __name__ == '__main__':
+    unittest.main()
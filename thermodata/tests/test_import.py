@@ -0,0 +1,93 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from thermodata import _constants
+from thermodata import constants
+
+# Import time budget of the core modules (-X importtime, cumulative),
+# relative to the import time of BASELINE measured in the same run
+BASELINE = 'json'
+BUDGET = {'thermodata': 0.5,
+          'thermodata.thermoinp': 3.0,
+          'thermodata.thermodata': 3.0}
+
+# Modules which the core modules import only on use
+DEFERRED = ('numpy', 'xml.etree.ElementTree', 'hashlib', 'sqlite3',
+            'multiprocessing')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def _python(*args):
+    # Run a Python subprocess from the repository root with bytecode
+    # cached outside the tree; returns stderr (and stdout) text
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = ROOT
+    result = subprocess.run((sys.executable,) + args, cwd=ROOT, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True)
+    return result.stdout, result.stderr
+
+
+class TestImport(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache)
+
+    def test_deferred(self):
+        """Heavy dependencies are not imported with the core modules."""
+        code = ('import sys, thermodata.thermodata\n'
+                'print(" ".join(m for m in {!r} if m in sys.modules))'
+                .format(DEFERRED))
+        out, _ = _python('-c', code)
+        self.assertEqual(out.split(), [])
+
+    def test_budget(self):
+        """Import times (with cached bytecode) are within budget."""
+        for module, budget in sorted(BUDGET.items()):
+            baseline = self.import_time(BASELINE)
+            self.assertLess(self.import_time(module) / baseline, budget,
+                            module)
+
+    def import_time(self, module):
+        # Best of three cumulative import times of a module, s
+        prefix = '-Xpycache_prefix={}'.format(self.cache)
+        _python(prefix, '-c', 'import ' + module)
+        times = []
+        for _ in range(3):
+            _, err = _python(prefix, '-Ximporttime', '-c',
+                             'import ' + module)
+            match = re.search(r'\|\s*(\d+) \| {}$'.format(
+                re.escape(module)), err, re.MULTILINE)
+            times.append(int(match.group(1)) * 1e-6)
+        return min(times)
+
+    def test_lazy_submodules(self):
+        """Submodules are imported on access to the package."""
+        out, _ = _python('-c', 'import sys, thermodata\n'
+                         'print("thermodata.query" in sys.modules)\n'
+                         'thermodata.query.Field("phase")\n'
+                         'print("thermodata.query" in sys.modules)')
+        self.assertEqual(out.split(), ['False', 'True'])
+
+
+class TestConstants(unittest.TestCase):
+
+    def test_frozen(self):
+        """Frozen constants are those of the XML data."""
+        self.assertEqual(_constants.VALUES, constants.parse())
+        self.assertEqual(constants.R_CEA, 8.31451)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.intervalindex import IntervalIndex, TemperatureIndex
+
+
+class TestIntervalIndex(unittest.TestCase):
+    rng = np.random.default_rng(7)
+    lo = rng.choice(np.arange(0., 50., 5.), 200)
+    hi = lo + rng.choice(np.arange(0., 30., 5.), 200)
+    index = IntervalIndex(lo, hi)
+
+    def test_stab(self):
+        """Stabbing queries match a linear scan (closed intervals)."""
+        for x in np.arange(-5., 85., 2.5):
+            expected = np.flatnonzero((self.lo <= x) & (x <= self.hi))
+            np.testing.assert_array_equal(self.index.stab(x), expected)
+
+    def test_covering(self):
+        for a, b in [(5., 5.), (5., 20.), (12.5, 31.), (0., 80.), (-1., 3.)]:
+            expected = np.flatnonzero((self.lo <= a) & (b <= self.hi))
+            np.testing.assert_array_equal(self.index.covering(a, b),
+                                          expected)
+        self.assertEqual(len(self.index.covering(20., 10.)), 0)
+
+    def test_within(self):
+        for a, b in [(5., 5.), (5., 20.), (12.5, 31.), (0., 80.)]:
+            expected = np.flatnonzero((a <= self.lo) & (self.hi <= b))
+            np.testing.assert_array_equal(self.index.within(a, b), expected)
+
+    def test_empty(self):
+        index = IntervalIndex([], [])
+        self.assertEqual(len(index.stab(300.)), 0)
+        self.assertEqual(len(index.covering(300., 400.)), 0)
+        with self.assertRaises(ValueError):
+            IntervalIndex([2.], [1.])
+
+
+class TestTemperatureIndex(unittest.TestCase):
+    db = thermoinp.DB()
+    index = TemperatureIndex(db.all)
+
+    def test_valid(self):
+        """Species valid at 15000 K (plasma data ranges)."""
+        valid = self.index.valid(15000.)
+        expected = [r for r in self.db.all if r.nintervals and
+                    r.intervals[0].lim[0] <= 15000. <= r.intervals[-1].lim[1]]
+        self.assertEqual(valid, expected)
+        self.assertIn(self.db['N+'], valid)
+        self.assertNotIn(self.db['CH4'], valid)
+
+    def test_covering_and_within(self):
+        covering = self.index.covering(300., 5000.)
+        self.assertIn(self.db['CO2'], covering)
+        self.assertNotIn(self.db['H2O(L)'], covering)
+        within = self.index.within(200., 1000.)
+        self.assertIn(self.db['H2O(L)'], within)
+        self.assertTrue(all(r.intervals[-1].lim[1] <= 1000.
+                            for r in within))
+
+    def test_interval(self):
+        """Intervals at a breakpoint include both neighbours."""
+        pairs = [i for r, i in self.index.interval(1000.)
+                 if r is self.db['H2']]
+        self.assertEqual(pairs, list(self.db['H2'].intervals[:2]))
+
+    def test_subset(self):
+        subset = self.db.subset(species='C', T=(300., 5000.))
+        self.assertIn('CO2', subset._dict)
+        self.assertNotIn('CH3OH(L)', subset._dict)
+        self.assertEqual(set(self.db.subset(T=15000.)._dict),
+                         set(r.name for r in self.index.valid(15000.)))
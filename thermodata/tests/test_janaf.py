@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.janaf import JanafTables
+
+
+class TestJanafTables(unittest.TestCase):
+    db = thermoinp.DB()
+    tables = JanafTables(db)
+
+    def setUp(self):
+        self.tmpd = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpd)
+
+    def row(self, name, T):
+        rows = self.tables.table(name)
+        return rows[rows['T'] == T][0]
+
+    def test_water(self):
+        """Standard values agree with JANAF."""
+        row = self.row('H2O', 298.15)
+        self.assertAlmostEqual(row['cp'], 33.59, places=2)
+        self.assertAlmostEqual(row['s'], 188.83, places=2)
+        self.assertAlmostEqual(row['gef'], row['s'], places=4)
+        self.assertAlmostEqual(row['dh'], 0.0, places=2)
+        self.assertAlmostEqual(row['dfh'] / 1000, -241.826, places=3)
+        self.assertAlmostEqual(row['dfg'] / 1000, -228.58, places=1)
+        self.assertAlmostEqual(row['logkf'], 40.05, places=2)
+        row = self.row('H2O', 1000.)
+        self.assertAlmostEqual(row['dfg'] / 1000, -192.6, places=1)
+
+    def test_references(self):
+        """Elements in their reference states have no formation terms."""
+        self.assertEqual(self.tables.references['H'], ('H2',))
+        self.assertEqual(self.tables.references['FE'][-1], 'Fe(L)')
+        for name in ('O2', 'C(gr)', 'Fe(c)', 'Fe(L)'):
+            rows = self.tables.table(name)
+            np.testing.assert_allclose(rows['dfh'], 0., atol=1e-6)
+            np.testing.assert_allclose(rows['logkf'], 0., atol=1e-9)
+
+    def test_shared_name(self):
+        """Records sharing a name are tabulated together."""
+        rows = self.tables.table('Fe(a)')
+        self.assertEqual(rows['T'][0], 200.)
+        self.assertEqual(rows['T'][-1], 1100.)
+        self.assertTrue(np.all(np.diff(rows['T']) > 0))
+
+    def test_undefined(self):
+        """Formation terms are undefined outside the reference range."""
+        row = self.row('HBr', 200.)
+        self.assertTrue(np.isnan(row['dfh']))
+        self.assertFalse(np.isnan(row['s']))
+        self.assertFalse(np.isnan(self.row('HBr', 300.)['dfh']))
+
+    def test_formatted(self):
+        lines = self.tables.formatted('CO2').splitlines()
+        self.assertEqual(lines[0], 'CO2')
+        self.assertEqual(len(lines), 4 + len(self.tables.table('CO2')))
+        self.assertIn('-393.510', lines[6])
+
+    def test_write(self):
+        path = os.path.join(self.tmpd, 'tables.txt')
+        tables = JanafTables(self.db, species=('H2O', 'CO2', 'N2'))
+        tables.write(path, processes=1)
+        with open(path) as f:
+            text = f.read()
+        self.assertEqual(text, ''.join(tables.formatted(name) + '\n'
+                                       for name in tables.species))
+        tables.write(path, processes=2, block=1)
+        with open(path) as f:
+            self.assertEqual(f.read(), text)
+
+    def test_unknown(self):
+        self.assertRaises(KeyError, JanafTables, self.db, species=['XYZ'])
+        self.assertRaises(KeyError, self.tables.table, 'XYZ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata import kinetics
+
+
+class TestParseReaction(unittest.TestCase):
+
+    def test_coefficients(self):
+        r = kinetics.parse_reaction('2 H2 + O2 <=> 2 H2O')
+        self.assertEqual(r.reactants, {'H2': 2.0, 'O2': 1.0})
+        self.assertEqual(r.products, {'H2O': 2.0})
+
+    def test_ions(self):
+        """A '+' without surrounding whitespace is part of the name."""
+        r = kinetics.parse_reaction('H2O+ + e- = H2O')
+        self.assertEqual(r.reactants, {'H2O+': 1.0, 'e-': 1.0})
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, kinetics.parse_reaction, 'H2 + O2')
+
+    def test_format(self):
+        r = kinetics.parse_reaction('2 H2 + O2 => 2 H2O')
+        self.assertEqual(kinetics.format_reaction(r),
+                         '2 H2 + O2 <=> 2 H2O')
+
+
+class TestEquilibriumConstants(unittest.TestCase):
+    db = thermoinp.DB()
+    kc = kinetics.EquilibriumConstants(
+        ['C(gr) + O2 = CO2',
+         'H2 + O2 <=> 2 OH',
+         '2 H2O <=> 2 H2 + O2'],
+        db)
+
+    def test_species(self):
+        self.assertEqual(self.kc.species,
+                         ('C(gr)', 'O2', 'CO2', 'H2', 'OH', 'H2O'))
+
+    def test_dn(self):
+        """Condensed species do not contribute to dn."""
+        self.assertEqual(tuple(self.kc.dn), (0.0, 0.0, 1.0))
+
+    def test_formation(self):
+        """log Kf for CO2 matches the reference table."""
+        T = (298.15, 1000., 3000.)
+        log_Kf = (69.0913, 20.6776, 6.8842)
+        for a, b in zip(np.log10(self.kc.Kp(T)[:, 0]), log_Kf):
+            self.assertAlmostEqual(a, b, places=3)
+
+    def test_batched(self):
+        """Batched evaluation matches evaluation per temperature."""
+        T = np.linspace(500., 3000., 6)
+        batch = self.kc.lnKc(T)
+        for i, t in enumerate(T):
+            self.assertTrue(np.allclose(batch[i], self.kc.lnKc(t)))
+
+    def test_kc(self):
+        """Kc = Kp (P0/RT)**dn."""
+        T = 2000.
+        ratio = self.kc.Kc(T) / self.kc.Kp(T)
+        expected = (1e5 / (8.314510 * T)) ** self.kc.dn
+        self.assertTrue(np.allclose(ratio, expected))
+
+    def test_unknown_species(self):
+        self.assertRaises(KeyError, kinetics.EquilibriumConstants,
+                          ['H2 + Xx = H2Xx'], self.db)
+
+    def test_no_net_change(self):
+        self.assertRaises(ValueError, kinetics.EquilibriumConstants,
+                          ['H2 = H2'], self.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
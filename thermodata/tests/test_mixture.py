@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+
+
+class TestMixture(unittest.TestCase):
+    db = thermoinp.DB()
+    air = Mixture.from_composition({'N2': 0.79, 'O2': 0.21}, db)
+
+    def test_molwt(self):
+        self.assertAlmostEqual(self.air.molwt, 28.85, places=2)
+        self.assertAlmostEqual(self.air.Y.sum(), 1.0)
+
+    def test_gamma(self):
+        self.assertAlmostEqual(self.air.gamma(300.), 1.40, places=2)
+        self.assertEqual(self.air.gamma([300., 1000.]).shape, (2,))
+
+    def test_element_moles(self):
+        b = self.air.element_moles(('O', 'N', 'C'))
+        self.assertAlmostEqual(b[0] / b[1], 0.42 / 1.58)
+        self.assertEqual(b[2], 0.0)
+
+    def test_batch(self):
+        mix = Mixture.from_composition(
+            {'H2': np.linspace(1., 3., 5), 'O2': 1.}, self.db)
+        self.assertEqual(mix.X.shape, (5, 2))
+        self.assertEqual(mix.cp(1000.).shape, (5,))
+
+    def test_mass_basis(self):
+        mix = Mixture.from_composition({'H2': 2.016, 'O2': 31.999},
+                                       self.db, basis='mass')
+        np.testing.assert_allclose(mix.X, [0.5, 0.5], rtol=1e-3)
+
+    def test_assigned(self):
+        """Reactants without intervals use their assigned enthalpy."""
+        mix = Mixture.from_composition({'RP-1': 1.}, self.db)
+        self.assertTrue(mix.assigned[0])
+        record = self.db['RP-1']
+        self.assertAlmostEqual(mix.hmol(record.T_reference),
+                               record.h_assigned)
+
+    def test_unknown(self):
+        self.assertRaises(KeyError, Mixture.from_composition,
+                          {'XYZ': 1.}, self.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import constants
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+from thermodata import nasa7
+
+
+class TestConvert(unittest.TestCase):
+    db = thermoinp.DB()
+    names = ('CO2', 'H2O', 'N2', 'OH', 'Air', 'Fe(c)', 'H2O(L)')
+    result = nasa7.convert(map(db.__getitem__, names))
+
+    def setUp(self):
+        self.tmpd = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpd)
+
+    def evaluate(self, i, T):
+        # Cp, H and S of the 7-coefficient fit
+        a = np.where((T > self.result.T[i, 1])[:, None],
+                     self.result.high[i], self.result.low[i])
+        T = np.asarray(T)
+        cp = (a[:, :5] * T[:, None]**np.arange(5)).sum(axis=-1)
+        h = (a[:, :5] * T[:, None]**np.arange(5) / np.arange(1, 6)).sum(
+            axis=-1) + a[:, 5] / T
+        s = a[:, 0] * np.log(T) + (a[:, 1:5] * T[:, None]**np.arange(1, 5)
+                                   / np.arange(1, 5)).sum(axis=-1) + a[:, 6]
+        return cp, h, s
+
+    def test_accuracy(self):
+        """Gas fits reproduce the source within a fraction of a J."""
+        i = self.names.index('CO2')
+        np.testing.assert_array_equal(self.result.T[i], [200., 1000., 6000.])
+        self.assertTrue(self.result.cp_error[i] < 1.0)
+        T = np.array([298.15, 700., 1500., 4000.])
+        cp, h, s = self.evaluate(i, T)
+        pa = PolyArray([self.db['CO2']])
+        cp0, h0, s0 = pa.evaluate(T)
+        np.testing.assert_allclose(cp, cp0[:, 0], rtol=5e-3)
+        np.testing.assert_allclose(s, s0[:, 0], rtol=5e-4)
+        self.assertAlmostEqual(h[0] * constants.R_CEA * 298.15, -393510.,
+                               places=2)
+
+    def test_continuity(self):
+        for i in range(len(self.names)):
+            Tm = self.result.T[i, 1]
+            low = self.evaluate(i, np.array([Tm]))
+            high = self.evaluate(i, np.array([Tm + 1e-9]))
+            np.testing.assert_allclose(np.ravel(low), np.ravel(high),
+                                       rtol=1e-7)
+
+    def test_breakpoint(self):
+        """Ranges excluding the common breakpoint are split in half."""
+        i = self.names.index('Fe(c)')
+        lo, hi = self.db['Fe(c)'].intervals[0].lim[0], 1665.
+        np.testing.assert_allclose(self.result.T[i], [lo, (lo + hi) / 2, hi])
+
+    def test_chemkin(self):
+        path = os.path.join(self.tmpd, 'therm.dat')
+        skipped = nasa7.write_chemkin(self.result, path)
+        self.assertEqual(skipped, ('Air',))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'THERMO')
+        self.assertEqual(lines[-1], 'END')
+        entries = lines[2:-1]
+        self.assertEqual(len(entries), 4 * (len(self.names) - 1))
+        self.assertTrue(all(len(line) == 80 for line in entries))
+        self.assertEqual([line[79] for line in entries[:4]],
+                         ['1', '2', '3', '4'])
+        self.assertTrue(entries[0].startswith('CO2 '))
+        self.assertEqual(entries[0][24:34], 'C   1O   2')
+        self.assertAlmostEqual(float(entries[1][:15]), self.result.high[0, 0],
+                               places=7)
+
+    def test_chemkin_breakpoint(self):
+        """The header holds the breakpoint of the conversion."""
+        path = os.path.join(self.tmpd, 'therm.dat')
+        result = nasa7.convert([self.db['CO2']], T_mid=1500.)
+        nasa7.write_chemkin(result, path)
+        with open(path) as f:
+            header, entry = f.read().splitlines()[1:3]
+        self.assertEqual(header.split(), ['200.000', '1500.000', '6000.000'])
+        self.assertEqual(float(entry[65:73]), 1500.)
+
+    def test_yaml(self):
+        path = os.path.join(self.tmpd, 'species.yaml')
+        nasa7.write_yaml(self.result, path)
+        with open(path) as f:
+            text = f.read()
+        self.assertTrue(text.startswith('species:\n- name: CO2\n'))
+        self.assertIn('  composition: {C: 1, O: 2}', text)
+        self.assertIn("- name: H2O(L)", text)
+        self.assertEqual(text.count('model: NASA7'), len(self.names))
+
+
+if __name__ == '__main__':
+    unittest.main()
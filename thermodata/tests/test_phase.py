@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.phase import PhaseIndex
+
+
+class TestPhaseIndex(unittest.TestCase):
+    db = thermoinp.DB()
+    index = PhaseIndex(db.condensed)
+
+    def test_groups(self):
+        self.assertEqual(self.index.phases['H2O'], ('H2O(cr)', 'H2O(L)'))
+        self.assertEqual(self.index.phases['Fe'][-1], 'Fe(L)')
+        self.assertIn('Mg(OH)2', self.index)
+        self.assertIn('AL(L)', self.index)
+
+    def test_transitions(self):
+        np.testing.assert_allclose(self.index.transitions['H2O'], [273.15])
+        np.testing.assert_allclose(self.index.transitions['Fe'],
+                                   [1042., 1184., 1665., 1809.])
+
+    def test_crossing(self):
+        """Overlapping ranges transition where the Gibbs energies meet."""
+        T = self.index.transitions['SrCL2'][0]
+        self.assertTrue(900. < T < 990.)
+        g = self.index.polyarray.gnd(T)
+        names = self.index.polyarray.names
+        self.assertAlmostEqual(g[names.index('SrCL2(a)')],
+                               g[names.index('SrCL2(b)')])
+
+    def test_stable_phase(self):
+        phases = self.index.stable_phase('Fe', [300., 1100., 1200., 1700.,
+                                                2000.])
+        self.assertEqual(list(phases),
+                         ['Fe(a)', 'Fe(a)', 'Fe(c)', 'Fe(d)', 'Fe(L)'])
+        phases = self.index.stable_phase(['H2O', 'AL2O3(a)'],
+                                         [[250.], [3000.]])
+        self.assertEqual(phases.tolist(), [['H2O(cr)', 'AL2O3(a)'],
+                                           ['H2O(L)', 'AL2O3(L)']])
+
+    def test_evaluate(self):
+        T = np.array([250., 300.])
+        cp, h, s = self.index.evaluate('H2O', T)
+        names = self.index.polyarray.names
+        expected = self.index.polyarray.evaluate(T)
+        for i, name in enumerate(('H2O(cr)', 'H2O(L)')):
+            j = names.index(name)
+            self.assertAlmostEqual(cp[i], expected[0][i, j])
+            self.assertAlmostEqual(s[i], expected[2][i, j])
+
+    def test_unknown(self):
+        self.assertRaises(KeyError, self.index.stable, 'XYZ', 300.)
+
+
+if __name__ == '__main__':
+    unittest.main()
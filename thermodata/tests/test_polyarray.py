@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.polyarray import PolyArray
+
+
+class TestPolyArray(unittest.TestCase):
+    db = thermoinp.DB()
+    pa = PolyArray([db['CO2'], db['RP-1'], db['In(cr)']])
+
+    # Cp (J/mol-K) and H (kJ/mol) for CO2 from ThermoBuild (see
+    # data/tableCO2.txt).
+    T = (200, 298.15, 500, 1000, 3000, 6000, 10000, 20000)
+    Cp = (32.361, 37.135, 44.624, 54.309, 62.156, 66.768, 83.091, 83.838)
+    H = (-396.922, -393.510, -385.203, -360.110, -240.694, -48.672,
+         250.017, 1118.275)
+
+    def test_cpmol(self):
+        """Heat capacity matches the reference table."""
+        for a, b in zip(self.pa.cpmol(self.T)[:, 0], self.Cp):
+            self.assertAlmostEqual(a, b, places=3)
+
+    def test_hmol(self):
+        """Enthalpy matches the reference table."""
+        for a, b in zip(self.pa.hmol(self.T)[:, 0] / 1000, self.H):
+            self.assertAlmostEqual(a, b, places=3)
+
+    def test_gnd(self):
+        """G/RT is consistent with H/RT and S/R."""
+        T = np.linspace(300., 3000., 7)
+        g = self.pa.gnd(T)
+        self.assertTrue(np.allclose(g, self.pa.hnd(T) - self.pa.snd(T),
+                                    equal_nan=True))
+
+    def test_evaluate(self):
+        """evaluate returns all three state functions at once."""
+        cp, h, s = self.pa.evaluate(1500.)
+        self.assertTrue(np.allclose(cp, self.pa.cpnd(1500.),
+                                    equal_nan=True))
+        self.assertTrue(np.allclose(s, self.pa.snd(1500.), equal_nan=True))
+
+    def test_shape(self):
+        """Results have the temperature shape plus a species axis."""
+        self.assertEqual(self.pa.cpnd(500.).shape, (3,))
+        self.assertEqual(self.pa.cpnd(np.full((4, 5), 500.)).shape,
+                         (4, 5, 3))
+
+    def test_index_breakpoint(self):
+        """Breakpoints belong to the lower interval (as in Thermo)."""
+        self.assertEqual(self.pa.index(1000.)[0], 0)
+        self.assertEqual(self.pa.index(1000.1)[0], 1)
+        self.assertEqual(self.pa.index(50000.)[0], 2)
+
+    def test_no_intervals(self):
+        """Species without intervals evaluate to NaN."""
+        self.assertTrue(np.isnan(self.pa.cpnd(298.15)[1]))
+
+    def test_valid(self):
+        """valid masks temperatures outside the data range."""
+        mask = self.pa.valid(500.)
+        self.assertTrue(mask[0])
+        self.assertFalse(mask[1])
+        self.assertFalse(mask[2])
+
+    def test_invalid_temperature(self):
+        """Non-positive temperatures are rejected."""
+        self.assertRaises(ValueError, self.pa.cpnd, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.proptable import PropertyTable, FIELDS
+from thermodata.proptable import write_binary, read_binary, write_ascii
+
+
+class TestPropertyTable(unittest.TestCase):
+    db = thermoinp.DB()
+    table = PropertyTable([{'CH4': 1.}, {'N2': 0.79, 'O2': 0.21}], db)
+    T = np.linspace(300., 2500., 12)
+    Z = np.linspace(0., 1., 11)
+
+    def setUp(self):
+        self.tmpd = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpd)
+
+    def test_mixture(self):
+        """Table entries are the properties of the mixture."""
+        data = self.table.evaluate(self.T, self.Z)
+        self.assertEqual(data.shape, (12, 11))
+        X = self.table.mole_fractions(self.Z[3:4])[0]
+        mixture = Mixture([self.db[n] for n in self.table.species], X)
+        T = self.T[5]
+        np.testing.assert_allclose(
+            [data[name][5, 3] for name, _ in FIELDS],
+            [mixture.cp(T), mixture.gamma(T), mixture.h(T),
+             mixture.sound_speed(T), mixture.molwt])
+
+    def test_streams(self):
+        """Mixture fraction one is the first stream."""
+        data = self.table.evaluate(300., [0., 1.])
+        self.assertAlmostEqual(data['molwt'][0, 1], 16.04246, places=4)
+        composition = self.table.fractions([[0.2, 0.8]])
+        np.testing.assert_allclose(self.table.mole_fractions(composition),
+                                   self.table.mole_fractions([0.2]))
+        self.assertRaises(ValueError, self.table.fractions, [[0.2]])
+
+    def test_run(self):
+        """Blocks reassemble into the single-pass result."""
+        result = self.table.run(self.T, self.Z, processes=1, block=3)
+        expected = self.table.evaluate(self.T, self.Z)
+        for name, _ in FIELDS:
+            np.testing.assert_array_equal(result.data[name], expected[name])
+
+    def test_binary(self):
+        result = self.table.run(self.T, self.Z, processes=1)
+        path = os.path.join(self.tmpd, 'table.npz')
+        write_binary(result, path, dtype=float)
+        loaded = read_binary(path)
+        self.assertEqual(loaded.species, result.species)
+        np.testing.assert_array_equal(loaded.T, result.T)
+        np.testing.assert_array_equal(loaded.fractions, result.fractions)
+        np.testing.assert_array_equal(loaded.data, result.data)
+
+    def test_ascii(self):
+        result = self.table.run(self.T, self.Z, processes=1)
+        path = os.path.join(self.tmpd, 'table.dat')
+        write_ascii(result, path)
+        rows = np.loadtxt(path)
+        self.assertEqual(rows.shape, (12 * 11, 3 + len(FIELDS)))
+        np.testing.assert_allclose(rows[13, 0], self.T[1])
+        np.testing.assert_allclose(rows[13, 3], result.data['cp'][1, 2],
+                                   rtol=1e-8)
+
+    def test_assigned(self):
+        self.assertRaises(ValueError, PropertyTable, [{'RP-1': 1.}],
+                          self.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from thermodata import registry
+from thermodata import thermoinp
+
+
+class TestRegistry(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def revised(self):
+        # Version with CO2 revised and N2 removed
+        co2 = self.db['CO2']
+        interval = co2.intervals[0]._replace(dh=co2.intervals[0].dh + 1.)
+        revised = co2._replace(intervals=(interval,) + co2.intervals[1:])
+        revised._isproduct = co2.isproduct
+        revised._formatted = co2.formatted
+        return thermoinp.DB.from_records(
+            revised if r is co2 else r for r in self.db.all
+            if r.name != 'N2')
+
+    def test_versions(self):
+        """Versions are DBs sharing their identical records."""
+        reg = registry.Registry()
+        first = reg.load('first')
+        second = reg.add('second', self.revised())
+        self.assertEqual(list(reg), ['first', 'second'])
+        self.assertIs(reg['second'], second)
+        self.assertEqual(first.format(), self.db.format())
+        self.assertIs(first['O2'], second['O2'])
+        self.assertIsNot(first['CO2'], second['CO2'])
+        # Only one interval of CO2 is new
+        self.assertIs(first['CO2'].intervals[1], second['CO2'].intervals[1])
+        self.assertEqual(reg.nrecords, len(self.db.all) + 1)
+        changes = reg.diff('first', 'second')
+        self.assertEqual(changes.removed, ('N2',))
+        self.assertEqual([c.name for c in changes.modified], ['CO2'])
+        with self.assertRaises(ValueError):
+            reg.load('first')
+
+    def test_load_path(self):
+        """Versions load from thermo.inp files."""
+        path = os.path.join(self.tmpdir, 'thermo.inp')
+        with open(path, 'w') as f:
+            self.revised().write(f)
+        reg = registry.Registry()
+        reg.load('packaged')
+        reg.load('revised', path)
+        self.assertNotIn('N2', reg['revised'].list_species())
+        self.assertIs(reg['packaged']['Air'], reg['revised']['Air'])
+        reg.remove('packaged')
+        self.assertEqual(reg.nrecords, len(reg['revised'].all))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata.rocket import Rocket
+
+
+class TestRocket(unittest.TestCase):
+    db = thermoinp.DB()
+    propellants = Mixture.from_composition({'H2': 1., 'O2': [5., 6., 7.]},
+                                           db, basis='mass')
+    rocket = Rocket(propellants, 7e6, db=db)
+
+    def test_throat(self):
+        for frozen in (False, True):
+            throat = self.rocket.throat(frozen)
+            self.assertTrue(throat.converged.all())
+            np.testing.assert_allclose(throat.mach, 1.0, atol=1e-4)
+            np.testing.assert_allclose(throat.area_ratio, 1.0)
+            self.assertTrue(np.all(throat.pressure_ratio > 1.7))
+            self.assertTrue(np.all(throat.pressure_ratio < 1.9))
+
+    def test_area_ratio(self):
+        area_ratio = np.array([1.5, 10., 50.])
+        result = self.rocket.exit(area_ratio=area_ratio)
+        self.assertEqual(result.Isp.shape, (3, 3))
+        self.assertTrue(result.converged.all())
+        np.testing.assert_allclose(result.area_ratio,
+                                   np.broadcast_to(area_ratio, (3, 3)),
+                                   rtol=1e-4)
+        self.assertTrue(np.all(result.mach > 1))
+        self.assertTrue(np.all(np.diff(result.Isp, axis=-1) > 0))
+        np.testing.assert_allclose(result.Cf * result.c_star, result.Isp)
+        self.assertTrue(np.all(result.Ivac > result.Isp))
+
+    def test_pressure_ratio(self):
+        """Pressure and area ratio inputs agree."""
+        by_area = self.rocket.exit(area_ratio=20.)
+        by_pressure = self.rocket.exit(
+            pressure_ratio=by_area.pressure_ratio[1])
+        self.assertAlmostEqual(by_pressure.area_ratio[1], 20., places=3)
+        self.assertAlmostEqual(by_pressure.Isp[1] / by_area.Isp[1], 1.0,
+                               places=6)
+
+    def test_frozen(self):
+        """Frozen expansion conserves composition and gives less impulse."""
+        frozen = self.rocket.exit(area_ratio=[10., 40.], frozen=True)
+        shifting = self.rocket.exit(area_ratio=[10., 40.])
+        self.assertTrue(frozen.converged.all())
+        self.assertTrue(np.all(frozen.Isp < shifting.Isp))
+        np.testing.assert_allclose(frozen.state.nj[:, 1],
+                                   self.rocket.chamber.nj)
+        np.testing.assert_allclose(
+            frozen.state.s, np.repeat(self.rocket.chamber.s[:, None], 2, 1))
+
+    def test_reference(self):
+        """H2/O2 at O/F 6 and 1000 psia, as computed by CEA."""
+        propellants = Mixture.from_composition({'H2': 1., 'O2': 6.},
+                                               self.db, basis='mass')
+        rocket = Rocket(propellants, 6.894757e6, db=self.db)
+        # CEA: Tc 3588.59 K, c* 2358.6 m/s (data/cea_reference.out)
+        self.assertAlmostEqual(rocket.chamber.T, 3588.59, delta=0.01)
+        self.assertAlmostEqual(rocket.throat().c_star, 2358.6, delta=0.05)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, self.rocket.exit)
+        self.assertRaises(ValueError, self.rocket.exit, area_ratio=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
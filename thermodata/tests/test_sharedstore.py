@@ -0,0 +1,62 @@
+import multiprocessing
+import pickle
+import unittest
+
+import numpy as np
+
+from thermodata import sharedstore
+from thermodata import thermoinp
+
+
+def _molwt(record):
+    return record.name, record.molwt, type(record).__name__
+
+
+class TestSharedStore(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def setUp(self):
+        self.store = sharedstore.publish(self.db)
+
+    def tearDown(self):
+        self.store.close()
+        self.store.unlink()
+
+    def test_attach(self):
+        """Handles attach once per process to the published store."""
+        self.assertIs(sharedstore.attach(self.store.handle), self.store)
+        handle = pickle.loads(pickle.dumps(self.store.handle))
+        self.assertEqual(handle, self.store.handle)
+        self.assertFalse(self.store.coeffs.flags.writeable)
+        np.testing.assert_array_equal(
+            self.store.coeffs[self.store.slice('CO2')][:, 2],
+            [r.a[2] for r in self.db['CO2'].intervals])
+
+    def test_records(self):
+        """Records round-trip exactly and pickle as handle and index."""
+        db = self.store.to_db()
+        self.assertEqual(db.all, self.db.all)
+        self.assertEqual(db.format(), self.db.format())
+        record = db['CO2']
+        data = pickle.dumps(record)
+        self.assertLess(len(data), len(pickle.dumps(self.db['CO2'])) / 10)
+        copy = pickle.loads(data)
+        self.assertEqual(copy, record)
+        self.assertEqual(copy.isproduct, record.isproduct)
+        self.assertIs(pickle.loads(data), copy)
+
+    def test_pool(self):
+        """Workers attach to the store to unpickle records."""
+        records = self.store.to_db().lookup('C')
+        pool = multiprocessing.Pool(2)
+        try:
+            result = pool.map(_molwt, records)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(result, [(r.name, r.molwt, 'SharedSpeciesRecord')
+                                  for r in records])
+
+
+if __name__ == '__main__':
+    unittest.main()
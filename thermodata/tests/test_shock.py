@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.mixture import Mixture
+from thermodata import shock
+
+
+class TestShock(unittest.TestCase):
+    db = thermoinp.DB()
+    air = Mixture.from_composition({'N2': 0.78, 'O2': 0.21, 'Ar': 0.01},
+                                   db)
+
+    def test_normal_perfect(self):
+        """Weak shocks in cold air are nearly calorically perfect."""
+        M1 = np.array([1.2, 1.5, 2.0])
+        result = shock.normal_shock(self.air, M1, 220., 1e3)
+        self.assertTrue(result.converged.all())
+        g = 1.4
+        P = 1 + 2 * g / (g + 1) * (M1**2 - 1)
+        np.testing.assert_allclose(result.P / 1e3, P, rtol=2e-3)
+        self.assertTrue(np.all(result.mach < 1))
+
+    def test_normal_conservation(self):
+        M1, T1, P1 = np.linspace(2., 20., 10), 220., 1e3
+        result = shock.normal_shock(self.air, M1, T1, P1)
+        R = self.air.R
+        rho1 = P1 / (R * T1)
+        u1 = M1 * self.air.sound_speed(T1)
+        np.testing.assert_allclose(result.rho * result.u, rho1 * u1)
+        np.testing.assert_allclose(result.P + result.rho * result.u**2,
+                                   P1 + rho1 * u1**2)
+        np.testing.assert_allclose(self.air.h(result.T) + result.u**2 / 2,
+                                   self.air.h(T1) + u1**2 / 2)
+        self.assertEqual(result.iterations.shape, (10,))
+        self.assertTrue(result.elapsed > 0)
+
+    def test_oblique(self):
+        """The deflection of a wave angle is inverted by theta."""
+        direct = shock.oblique_shock(self.air, [3., 8.], 220., 1e3,
+                                     beta=np.radians([30., 20.]))
+        inverse = shock.oblique_shock(self.air, [3., 8.], 220., 1e3,
+                                      theta=direct.theta)
+        self.assertTrue(inverse.converged.all())
+        np.testing.assert_allclose(inverse.beta, np.radians([30., 20.]),
+                                   rtol=1e-6)
+        np.testing.assert_allclose(inverse.P, direct.P, rtol=1e-6)
+
+    def test_detached(self):
+        result = shock.oblique_shock(self.air, 3., 220., 1e3,
+                                     theta=np.radians(40.))
+        self.assertFalse(result.converged)
+        self.assertTrue(np.isnan(result.beta))
+
+    def test_isentropic(self):
+        result = shock.isentropic(self.air, [1., 2.], 300., 1e5)
+        self.assertTrue(result.converged.all())
+        self.assertAlmostEqual(result.area_ratio[0], 1.0)
+        self.assertAlmostEqual(result.area_ratio[1], 1.6875, places=2)
+        T0, P0 = shock.stagnation(self.air, 2., result.T[1], result.P[1])
+        self.assertAlmostEqual(T0, 300.)
+        self.assertAlmostEqual(P0 / 1e5, 1.0)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, shock.normal_shock, self.air, 0.5,
+                          220., 1e3)
+        self.assertRaises(ValueError, shock.oblique_shock, self.air, 3.,
+                          220., 1e3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from thermodata import registry
+from thermodata import sqlitedb
+from thermodata import thermoinp
+from thermodata.query import Field
+
+
+class TestSQLiteDB(unittest.TestCase):
+    db = thermoinp.DB()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'thermo.sqlite')
+        sqlitedb.export(self.db, self.path)
+        self.sdb = sqlitedb.SQLiteDB(self.path)
+
+    def tearDown(self):
+        self.sdb.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_export(self):
+        """Tables hold every record, interval and element."""
+        con = sqlite3.connect(self.path)
+        try:
+            count = lambda table: con.execute(
+                'SELECT COUNT(*) FROM {}'.format(table)).fetchone()[0]
+            self.assertEqual(count('species'), len(self.db.all))
+            self.assertEqual(count('intervals'),
+                             sum(r.nintervals for r in self.db.all))
+            self.assertEqual(count('composition'),
+                             sum(len(r.composition) for r in self.db.all))
+            row = con.execute('SELECT phase, molwt, category, tmin, tmax '
+                              'FROM species WHERE name = ?',
+                              ('CO2',)).fetchone()
+            self.assertEqual(row, (0, self.db['CO2'].molwt, 'gaseous',
+                                   200.0, 20000.0))
+        finally:
+            con.close()
+        with self.assertRaises(IOError):
+            sqlitedb.export(self.db, self.path)
+
+    def test_lookup(self):
+        """Lookups match `thermoinp.DB.lookup`."""
+        for pattern in ('H2', '.*H2', 'Jet-A(g)', 'H2*O', 'CH4$',
+                        'Adamantium', 'CH4|CO2', 'N2|O2', 'H2O|.*CO2'):
+            self.assertEqual(self.sdb.lookup(pattern),
+                             self.db.lookup(pattern))
+        self.assertEqual(self.sdb['Fe(a)'], self.db['Fe(a)'])
+        with self.assertRaises(KeyError):
+            self.sdb['Adamantium']
+
+    def test_subset(self):
+        """Criteria in SQL select the subset of `thermoinp.DB`."""
+        subset = self.sdb.subset('C.*', T=(300., 5000.),
+                                 sql='molwt < ?', params=(50.,))
+        expected = self.db.subset('C.*', T=(300., 5000.),
+                                  filt=lambda r: r.molwt < 50.)
+        self.assertEqual(subset.format(), expected.format())
+        subset = self.sdb.subset(T=15000., where=Field('charge') != 0)
+        expected = self.db.subset(T=15000., where=Field('charge') != 0)
+        self.assertEqual(subset.format(), expected.format())
+        self.assertEqual(self.sdb.format(), self.db.format())
+
+    def test_append(self):
+        """Appended databases override records of the same name."""
+        self.sdb.close()
+        products = self.db.subset(filt=lambda r: r.isproduct)
+        sqlitedb.export(products, self.path, append=True)
+        self.sdb = sqlitedb.SQLiteDB(self.path)
+        self.assertEqual(len(self.sdb.all),
+                         len(self.db.all) + len(products.all))
+        self.assertEqual(self.sdb.subset().format(),
+                         self.db.subset().format())
+        self.assertEqual(self.sdb.lookup('CO'), self.db.lookup('CO'))
+
+    def test_from_records(self):
+        """Databases built from records are in-memory thermoinp.DB."""
+        paths = [os.path.join(self.tmpdir, name)
+                 for name in ('sqlite.inp', 'db.inp')]
+        species = ['CH4', 'O2', 'CO2', 'JP-10(L)']
+        self.sdb.write_subsets({paths[0]: species})
+        self.db.write_subsets({paths[1]: species})
+        with open(paths[0]) as a, open(paths[1]) as b:
+            self.assertEqual(a.read(), b.read())
+        interned = registry.Registry().add('v', self.sdb)
+        self.assertIs(type(interned), thermoinp.DB)
+        self.assertEqual(interned.format(), self.db.format())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from thermodata import thermoinp
+from thermodata.sweep import Sweep
+
+
+class TestSweep(unittest.TestCase):
+    db = thermoinp.DB()
+    sweep = Sweep({'H2': 1.}, {'O2': 1.}, db, condensed=False)
+    of = [4., 8.]
+    P = [1e5, 1e6]
+    T = np.linspace(2000., 3500., 7)
+
+    def setUp(self):
+        self.tmpd = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpd)
+
+    def test_element_moles(self):
+        """O/F of 7.94 is stoichiometric, H:O = 2."""
+        b = self.sweep.element_moles(7.937)
+        H, O = (b[self.sweep.solver.elements.index(e)] for e in 'HO')
+        self.assertAlmostEqual(H / O, 2.0, places=3)
+
+    def test_solve(self):
+        """Continuation reproduces independent (cold) solutions."""
+        result = self.sweep.solve(self.of, self.P, self.T)
+        self.assertEqual(result.shape, (2, 2, 7))
+        self.assertTrue(result['converged'].all())
+        # Warm-started temperatures need fewer iterations
+        self.assertTrue(np.all(result['iterations'][..., 1:] <
+                               result['iterations'][..., :1]))
+        b = self.sweep.element_moles(self.of[1])
+        state = self.sweep.solver.tp(b, self.T[3], self.P[0])
+        np.testing.assert_allclose(result['X'][1, 0, 3], state.X,
+                                   rtol=1e-4, atol=1e-10)
+        self.assertEqual(result['of'][1, 0, 0], self.of[1])
+        self.assertEqual(result['T'][0, 0, 3], self.T[3])
+
+    def test_run(self):
+        path = os.path.join(self.tmpd, 'sweep.npy')
+        species = ('H2O', 'OH')
+        result = self.sweep.run(self.of, self.P, self.T, path,
+                                species=species, processes=1)
+        self.assertEqual(result.species, species)
+        self.assertEqual(result['X'].shape, (2, 2, 7, 2))
+        expected = self.sweep.solve(self.of, self.P, self.T, species)
+        np.testing.assert_allclose(np.load(path)['X'], expected['X'])
+
+    def test_pool(self):
+        path = os.path.join(self.tmpd, 'sweep.npy')
+        result = self.sweep.run(self.of, self.P, self.T, path,
+                                species=('H2O',), processes=2)
+        expected = self.sweep.solve(self.of, self.P, self.T, ('H2O',))
+        np.testing.assert_allclose(result['X'], expected['X'])
+
+    def test_unknown_species(self):
+        self.assertRaises(KeyError, self.sweep.solve, self.of, self.P,
+                          self.T, ('CO2',))
+
+
+if __name__ == '__main__':
+    unittest.main()
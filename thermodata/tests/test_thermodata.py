@@ -1,9 +1,13 @@
 import unittest
 import os
+import io
 import re
+import shutil
+import tempfile
 import collections
+from xml.etree import ElementTree as etree
 from thermodata.thermodata import Interval, Species, Thermo, ChemDB, Table
-from thermodata.thermodata import thermoinp
+from thermodata.thermodata import thermoinp, write_xml, _indentxml
 
 class TestSpecies(unittest.TestCase):
     """Test Species instantiated w/ and w/o formation_enthalpy."""
@@ -273,6 +277,17 @@ class TestChemDB(unittest.TestCase):
     #	self.db.select('reactants')
     #	self.assertEqual(len(self.db), 2060)
 
+    def test_from_category(self):
+        """Test instances can be created per-category."""
+        gases = ChemDB.from_category('gas_products')
+        reactants = ChemDB.from_category('condensed_reactants')
+        self.assertIn('CO2', gases)
+        self.assertNotIn('Air', gases)
+        self.assertIn('H2(L)', reactants)
+        self.assertTrue(all(s.phase > 0 for s in reactants.values()))
+        with self.assertRaises(ValueError):
+            ChemDB.from_category('plasma')
+
     def test_single_select(self):
         """Test a single species can be selected."""
         self.db.select('CH3OH(L)')
@@ -315,6 +330,61 @@ class TestChemDB(unittest.TestCase):
         self.assertEqual(self.db['KCL'], potassium_chloride)
         self.assertEqual(self.db['Ag(cr)'], silver_cryst)
 
+    def tree_xml(self):
+        """Serialise the database as a whole (reference form)."""
+        root = self.db.toxml()
+        _indentxml(root)
+        f = io.BytesIO()
+        etree.ElementTree(root).write(f, xml_declaration=True,
+                                      encoding='utf-8', method='xml')
+        return f.getvalue().decode('utf-8')
+
+    def test_write_xml(self):
+        """Streamed XML is identical to the serialised element tree."""
+        for species in ((), ('N2', 'CO2', 'CH4(L)')):
+            self.db.clear()
+            self.db.select(species)
+            f = io.StringIO()
+            write_xml(self.db.values(), f)
+            self.assertEqual(f.getvalue(), self.tree_xml())
+
+    def test_write(self):
+        """The database is written to a new file only."""
+        self.db.select(('N2', 'Air', 'H2O(L)'))
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'chemdb.xml')
+            self.db.write(path)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), self.tree_xml())
+            with self.assertRaises(IOError):
+                self.db.write(path)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_from_xml(self):
+        """XML loads to the same species and round-trips exactly."""
+        species = ('CH3OH(L)', 'KCL', 'CO2', 'CH4(L)', 'Air')
+        self.db.select(species)
+        f = io.StringIO()
+        write_xml(self.db.values(), f)
+        loaded = ChemDB.from_xml(io.BytesIO(f.getvalue().encode('utf-8')))
+
+        self.assertEqual(sorted(loaded), sorted(species))
+        self.assertEqual(loaded['CH3OH(L)'], self.methanol)
+        self.assertIs(loaded['CH4(L)'].thermo, None)
+        for name in species:
+            self.assertEqual(loaded[name].Mr, self.db[name].Mr)
+            self.assertEqual(loaded[name].Hf, self.db[name].Hf)
+            self.assertIs(loaded[name].phase, None)
+        self.assertEqual(self.tree_xml(), f.getvalue())
+        self.db = loaded
+        self.assertEqual(self.tree_xml(), f.getvalue())
+
+        loaded.clear()
+        loaded.select('KCL')
+        self.assertEqual(list(loaded), ['KCL'])
+
 
 if __name__ == '__main__':
     unittest.main()
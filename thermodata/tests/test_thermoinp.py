@@ -1,8 +1,13 @@
+import io
 import os
+import shutil
+import tempfile
+import threading
 import unittest
 
 from thermodata import thermoinp
 from thermodata import poly
+from thermodata.query import Field
 
 Species = thermoinp.SpeciesRecord
 
@@ -29,6 +34,24 @@ class TestDB(unittest.TestCase):
         db = thermoinp.DB(polytype='ml')
         self.assertIsInstance(db['Air'].intervals[0], poly.NASAPolyML)
 
+    def test_init_with_path(self):
+        """Databases are read from thermo.inp files, e.g. subsets."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'thermo.inp')
+            subset = self.db.subset(('CO2$', 'Fe(a)$', 'Air$'))
+            with open(path, 'w') as f:
+                subset.write(f)
+            db = thermoinp.DB(path=path)
+            self.assertEqual(db.format(), subset.format())
+            self.assertEqual([r.name for r in db.condensed], ['Fe(a)'])
+            with open(path, 'w') as f:
+                f.write('thermo\n')
+            with self.assertRaises(ValueError):
+                thermoinp.DB(path=path)
+        finally:
+            shutil.rmtree(tmpdir)
+
     # ----------------------------------------------------------------
     # Test parsing of source database (macroscopic; "is it there?")
     # ----------------------------------------------------------------
@@ -126,6 +149,123 @@ class TestDB(unittest.TestCase):
         subset = self.db.subset(species=('^H2$', '^N2$'))
         self.assertEqual(len(subset._dict), 2)
 
+    def test_subset_where(self):
+        """The subset method takes a predicate expression."""
+        subset = self.db.subset(where=(Field('phase') > 0) &
+                                ~Field('isproduct'))
+        self.assertEqual(subset.gaseous, [])
+        self.assertEqual(subset.condensed, [])
+        self.assertIn(self.db['H2(L)'], subset.reactant)
+        self.assertIsNot(subset._dict, self.db._dict)
+
+    # ----------------------------------------------------------------
+    # Test metadata predicates
+    # ----------------------------------------------------------------
+    def test_where_matches_filter(self):
+        """Predicates select the same species as the equivalent filter."""
+        predicate = ((Field('category') == 'gaseous') &
+                     (Field('charge') != 0) & (Field('molwt') < 50.))
+        expected = [s for s in self.db.gaseous if s.molwt < 50. and
+                    s.composition.get('E', 0.0) != 0]
+        self.assertEqual(self.db.where(predicate), expected)
+
+    def test_where_source_and_formation(self):
+        """Columns hold reference sources and heats of formation."""
+        selected = self.db.where(Field('source').isin('jc') |
+                                 (Field('h_formation') > 1e6))
+        expected = [s for s in self.db.all if s.refcode[0] in 'jc' or
+                    (s.h_formation or 0.0) > 1e6]
+        self.assertEqual(selected, expected)
+        self.assertEqual(len(self.db.columns), len(self.db.all))
+
+    def test_where_unknown_column(self):
+        """Unknown columns raise ValueError."""
+        with self.assertRaises(ValueError):
+            Field('colour')
+
+    # ----------------------------------------------------------------
+    # Test property queries
+    # ----------------------------------------------------------------
+    def test_query_state_function(self):
+        """Query results match the polynomials and are sorted."""
+        results = self.db.query('cp', 1500., gt=60., category='allgases')
+        values = [v for _, v in results]
+        self.assertEqual(values, sorted(values))
+        self.assertGreater(min(values), 60.)
+        for record, value in results[::50]:
+            self.assertEqual(record.phase, 0)
+            interval = [i for i in record.intervals
+                        if i.lim[0] <= 1500. <= i.lim[1]][0]
+            self.assertAlmostEqual(
+                value, poly.NASAPolyML(*interval).cpmol(1500.), places=6)
+
+    def test_query_excludes_out_of_range(self):
+        """Species without data at T are not returned."""
+        results = self.db.query('s', 15000.)
+        self.assertTrue(results)
+        for record, _ in results:
+            self.assertGreaterEqual(record.intervals[-1].lim[1], 15000.)
+
+    def test_query_constant_with_name(self):
+        """Queries compose with name patterns and sort in reverse."""
+        results = self.db.query('h_formation', species='C', ge=-100e3,
+                                le=0., reverse=True)
+        values = [v for _, v in results]
+        self.assertEqual(values, sorted(values, reverse=True))
+        self.assertEqual(values[0], 0.0)            # C(gr)
+        for record, value in results:
+            self.assertTrue(record.name.startswith('C'))
+            self.assertTrue(-100e3 <= value <= 0.)
+
+    def test_query_where(self):
+        """Queries compose with predicates."""
+        results = self.db.query('molwt', where=Field('charge') > 0, lt=3.)
+        self.assertEqual([s.name for s, _ in results],
+                         ['H+', 'D+', 'H2+'])
+
+    def test_query_bad_property(self):
+        """Unknown properties raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.db.query('viscosity', 300.)
+        with self.assertRaises(ValueError):
+            self.db.query('cp')
+
+    # ----------------------------------------------------------------
+    # Test shared databases
+    # ----------------------------------------------------------------
+    def test_shared(self):
+        """Shared databases are loaded once per source and polytype."""
+        db = thermoinp.shared()
+        self.assertIs(thermoinp.shared(''), db)
+        self.assertIsNot(thermoinp.shared('ml'), db)
+        self.assertIsInstance(thermoinp.shared('ml')['Air'].intervals[0],
+                              poly.NASAPolyML)
+        self.assertEqual(db.all, self.db.all)
+
+    def test_shared_threads(self):
+        """Concurrent requests wait for a single (background) load."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'thermo.inp')
+            with open(path, 'w') as f:
+                self.db.subset('C').write(f)
+            thermoinp.preload(path=path)
+            found = []
+            threads = [threading.Thread(target=lambda: found.append(
+                thermoinp.shared(path=path))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(set(map(id, found))), 1)
+            self.assertEqual(found[0].format(), self.db.subset('C').format())
+            # Failed loads are not kept
+            for _ in range(2):
+                with self.assertRaises(IOError):
+                    thermoinp.shared(path=os.path.join(tmpdir, 'missing'))
+        finally:
+            shutil.rmtree(tmpdir)
+
     # ----------------------------------------------------------------
     # Test format
     # ----------------------------------------------------------------
@@ -157,6 +297,39 @@ class TestDB(unittest.TestCase):
         testing_data = self.db.subset(species).format()
         self.assertEqual(testing_data, correct_data)
 
+    def test_write(self):
+        """Streamed output is the formatted database."""
+        f = io.StringIO()
+        self.db.write(f)
+        self.assertEqual(f.getvalue(), self.db.format())
+
+    def test_write_subsets(self):
+        """Each subset file is written as by subset and format."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            subsets = {
+                os.path.join(tmpdir, 'products.inp'):
+                    ['O2', 'N2', 'Ar', 'CO2'],
+                os.path.join(tmpdir, 'reactants.inp'):
+                    ['Jet-A(g)', 'Air', 'Jet-A(L)'],
+                os.path.join(tmpdir, 'mixed.inp'): ['Air', 'C3H8', 'Air'],
+            }
+            self.db.write_subsets(subsets)
+            for path, fname in zip(subsets, ('products_subset.txt',
+                                             'reactants_subset.txt',
+                                             'mixed_subset.txt')):
+                with open(path) as f:
+                    self.assertEqual(f.read(), self.get_data(fname))
+            valid = os.path.join(tmpdir, 'valid.inp')
+            path = os.path.join(tmpdir, 'unknown.inp')
+            with self.assertRaises(KeyError):
+                self.db.write_subsets({valid: ['N2'],
+                                       path: ['N2', 'Adamantium']})
+            self.assertFalse(os.path.exists(valid))
+            self.assertFalse(os.path.exists(path))
+        finally:
+            shutil.rmtree(tmpdir)
+
 # --------------------------------------------------------------------
 # TEST DATA
 # --------------------------------------------------------------------
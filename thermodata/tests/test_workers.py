@@ -0,0 +1,37 @@
+import unittest
+
+from thermodata import workers
+
+
+class Scale(object):
+    # Picklable block evaluator
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def evaluate(self, values, offset=0):
+        return [self.factor * v + offset for v in values]
+
+
+class TestImap(unittest.TestCase):
+    tasks = [(i, (list(range(i, i + 3)), i)) for i in range(0, 12, 3)]
+    expected = {i: [2 * v + i for v in range(i, i + 3)]
+                for i in range(0, 12, 3)}
+
+    def test_serial(self):
+        """A single process evaluates in order, without worker state."""
+        results = list(workers.imap(Scale(2), 'evaluate', self.tasks, 1))
+        self.assertEqual(results, sorted(self.expected.items()))
+        self.assertIs(workers._obj, None)
+
+    def test_pool(self):
+        results = workers.imap(Scale(2), 'evaluate', self.tasks, 2)
+        self.assertEqual(dict(results), self.expected)
+        self.assertIs(workers._obj, None)
+        results = workers.imap(Scale(2), 'evaluate', self.tasks, 2,
+                               ordered=True)
+        self.assertEqual(list(results), sorted(self.expected.items()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,16 +4,21 @@ This module is built on top of the `thermoinp` module (which serves to
 provide low-level access to the database).
 
 The main point of access to chemical species data is the class ChemDB.
-ChemDB loads the complete database from the source file on
-instantiation. Subsets are created via the `select` method by
-specifying a list/tuple of chemical species names.
+ChemDB loads the complete database on instantiation, from the source
+database shared by the process (`thermoinp.shared`, parsed once).
+Subsets are created via the `select` method by specifying a list/tuple
+of chemical species names.
 
     >>> db = ChemDB()
     >>> db.select(('Air', 'N2', 'O2', 'Ar', 'CO2'))
 
 The current database view can be written to XML via the `write`
 method. Where no path is specified, the serialised data is written to
-STDOUT.
+STDOUT. Species are written one at a time (`write_xml`) and read back
+incrementally by `ChemDB.from_xml`.
+
+    >>> db.write('chemdb.xml')
+    >>> db = ChemDB.from_xml('chemdb.xml')
 
 The module also provides a Table class for generating tabulated data.
 
@@ -36,18 +41,18 @@ Key limitations:
     there's always the source data file.
   - Only a limited amount of species data is currently represented at
     this level.
-  - XML structure is a WIP.
-  - Loading from XML (or other database formats) is not supported at
+  - XML structure is a WIP. XML written by `write` is loaded by
+    `ChemDB.from_xml`; other database formats are not supported at
     this time.
   - Species and Thermo are not intended for direct instantiation but
     they will probably get subclassed. Generally the API (as loosely
     defined as it is) is a WIP and dependent on emerging requirements.
 
 """
+import os
 import sys
 from math import log
 import collections
-from xml.etree import ElementTree as etree
 
 import thermodata.constants as constants
 import thermodata.thermoinp as thermoinp
@@ -60,6 +65,13 @@ _Interval = collections.namedtuple('Interval',
 
 class Interval(_Interval):
 
+    @classmethod
+    def from_xml(cls, node):
+        """Generate Interval instance from an <interval> element."""
+        return cls((float(node.get('Tmin')), float(node.get('Tmax'))),
+                   _parse_tuple(node.findtext('coefficients')),
+                   _parse_tuple(node.findtext('integ_constants')))
+
     def _cp_nodim(self, T):
         # Return dimensionles heat capacity for temperature
         return _dimless_heat_capacity(T, self.coeffs)
@@ -123,14 +135,15 @@ class ChemDB(dict):
     def _thermoinp_load(self):
         # Database loader. Loads the contents of `thermo.inp` into a
         # flat dictionary.
-        categ_dict = thermoinp.parse()
+        self._source = thermoinp.shared()
         self._source_dict = {species.name:self._map_species(species)
-                             for species_list in categ_dict.values()
-                             for species in species_list
+                             for species in self._source.all
                              }
 
     def toxml(self):
         """Represent database contents in XML form."""
+        etree = _etree()
+
         root = etree.Element('chemdb')
         for species_obj in self.values():
             species_obj.toxml(root)
@@ -143,22 +156,16 @@ class ChemDB(dict):
           - If file path is unspecified, XML is written to STDOUT.
           - If file exists, an exception is raised.
 
+        Species are serialised one at a time (see `write_xml`); the
+        output is that of `toxml` indented and serialised as a whole.
         """
         if path is None:
-            f = sys.stdout
-        else:
-            if os.path.isfile(path):
-                raise IOError("{} exists.".format(path))
-            f = open(path, 'w')
-
-        root = self.toxml()
-        _indentxml(root)
-        etree.ElementTree(root).write(f,
-                                      xml_declaration=True,
-                                      encoding='utf-8',
-                                      method='xml')
-        if f is not sys.stdout:
-            f.close()
+            write_xml(self.values(), sys.stdout)
+            return
+        if os.path.isfile(path):
+            raise IOError("{} exists.".format(path))
+        with open(path, 'w', encoding='utf-8') as f:
+            write_xml(self.values(), f)
 
     def _map_species(self, source):
         # map thermoinp.Species instance data to Species instances.
@@ -172,8 +179,40 @@ class ChemDB(dict):
 
     @staticmethod
     def _map_interval(source):
-        # map thermoinp.Interval instance data to Interval instances
-        return Interval(source.bounds, source.coeff, source.const)
+        # map poly.NASAPoly instance data to Interval instances
+        return Interval(source.lim, source.a[:7], source.b)
+
+    @classmethod
+    def from_xml(cls, source):
+        """Return instance with the species of an XML document.
+
+        `source` is a file name or (binary) file object holding XML
+        as written by `write`. Elements are parsed incrementally and
+        discarded once their species is built, and coefficients are
+        parsed as floats; the `toxml` representation of the loaded
+        species is that of the document. The source database is not
+        loaded; `select` selects from the species of the document.
+        """
+        etree = _etree()
+
+        inst = cls.__new__(cls)
+        intervals = []
+        root = None
+        for event, node in etree.iterparse(source, ('start', 'end')):
+            if root is None:
+                root = node
+            elif event != 'end':
+                continue
+            elif node.tag == 'interval':
+                intervals.append(Interval.from_xml(node))
+            elif node.tag == 'species':
+                species = Species.from_xml(node, intervals)
+                dict.__setitem__(inst, species.name, species)
+                intervals = []
+                root.clear()
+        inst._source = None
+        inst._source_dict = dict(inst)
+        return inst
 
     @classmethod
     def from_category(cls, string):
@@ -183,19 +222,29 @@ class ChemDB(dict):
         ----------
 
             gases : gaseous phase data
+            condensed : condensed phase data
+            products, reactants : products and reactant-only species
             gas_products : gaseous products
             gas_reactants : gaseous reactants
+            condensed_products : condensed products
+            condensed_reactants : condensed reactants
+            ions : charged species
+
+        A thermodata.query.Predicate over the species metadata may be
+        given in place of a category name.
         """
-        inst = cls()
-        filt = []
+        from thermodata import query
 
-        if string == 'gases':
-            filt = filter(
-                    lambda s: s.phase == 0,
-                    inst._source_dict.values()
-            )
+        inst = cls()
+        predicate = string
+        if not isinstance(predicate, query.Predicate):
+            try:
+                predicate = query.CATEGORIES[string]
+            except KeyError:
+                raise ValueError("Unknown category {}.".format(string))
 
-        inst.update({s.name : s for s in filt})
+        names = set(s.name for s in inst._source.where(predicate))
+        inst.update({name : inst._source_dict[name] for name in names})
         return inst
 
 
@@ -239,6 +288,8 @@ class Species(object):
 
     def toxml(self, parent):
         """Create an XML representation of the thermodynamic model"""
+        etree = _etree()
+
         attributes = {'name' : self.name}
         node = etree.SubElement(parent, 'species', attributes)
         M = etree.SubElement(node,
@@ -256,7 +307,8 @@ class Species(object):
                              {'units' : 'J/mol'}
                              )
         Hf.text = str(self.Hf)
-        self.thermo.toxml(node)
+        if self.thermo is not None:
+            self.thermo.toxml(node)
 
     def _calculate_specific_gas_constant(self):
         # Returns the specific gas constant as a function of molar
@@ -277,6 +329,29 @@ class Species(object):
         inst.phase = inp.phase
         return inst
 
+    @classmethod
+    def from_xml(cls, node, intervals):
+        """Generate Species instance from a <species> element.
+
+        The phase is not part of the XML representation and is None.
+        """
+        M = float(node.findtext('molar_mass'))
+        Hf = node.findtext('formation_enthalpy')
+        # The relative molar mass of the source data has at most seven
+        # decimals; otherwise M is kept as written.
+        Mr = round(M / constants.M, 7)
+        if constants.M * Mr != M:
+            Mr = M / constants.M
+        inst = cls(node.get('name'), Mr, None if Hf == 'None' else float(Hf),
+                   intervals)
+        inst.phase = None
+        if inst.M != M:
+            inst.M = M
+            inst._calculate_specific_gas_constant()
+            if inst.Hf is not None:
+                inst.hf = inst.Hf / M
+        return inst
+
 
 class Thermo(object):
     """Thermodynamic state functions (standard-state, P=100 kPa).
@@ -410,6 +485,8 @@ class Thermo(object):
 
     def toxml(self, parent):
         """Create an XML representation of the thermodynamic model"""
+        etree = _etree()
+
         attributes = {'Tmin' : str(self.bounds[0]),
                      'Tmax' : str(self.bounds[1])}
         node = etree.SubElement(parent, 'thermo', attributes)
@@ -547,6 +624,41 @@ def _dimless_entropy(T, a, b):
             )
 
 
+def write_xml(species, f):
+    """Write Species as a <chemdb> XML document to a text file object.
+
+    Each species element is built, indented and written in turn so
+    that memory use is independent of the number of species. The
+    output is identical to the indented element tree of
+    `ChemDB.toxml` written with an XML declaration in UTF-8.
+    """
+    etree = _etree()
+
+    f.write("<?xml version='1.0' encoding='utf-8'?>\n<chemdb")
+    empty = True
+    for obj in species:
+        if empty:
+            f.write('>')
+            empty = False
+        parent = etree.Element('chemdb')
+        obj.toxml(parent)
+        node, = parent
+        _indentxml(node, 1)
+        node.tail = None
+        f.write('\n    ')
+        f.write(etree.tostring(node, encoding='unicode'))
+    f.write(' />' if empty else '\n</chemdb>\n')
+
+def _etree():
+    # xml.etree.ElementTree, imported on first use
+    from xml.etree import ElementTree
+
+    return ElementTree
+
+def _parse_tuple(text):
+    # Parse the text of a tuple of floats, e.g. '(1.0, -2.5e-05)'
+    return tuple(float(x) for x in text.strip().strip('()').split(','))
+
 def _indentxml(elem, level=0):
     # Indent XML string representation of elements;
     # http://effbot.org/zone/element-lib.htm#prettyprint
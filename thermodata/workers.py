@@ -0,0 +1,66 @@
+"""Evaluation of blocks of work by a pool of worker processes.
+
+Grid evaluations and table writers (see `sweep`, `proptable` and
+`janaf`) split their work into blocks, which are evaluated by a method
+of one object. The object is sent once to each worker process, rather
+than with every block, and the results are yielded as the blocks
+complete (or in order):
+
+    >>> tasks = [(i, (of[i:i + 4], P, T)) for i in range(0, len(of), 4)]
+    >>> for i, values in imap(sweep, 'solve', tasks, processes=4):
+    ...     result[i:i + len(values)] = values
+
+With a single process the blocks are evaluated in order in the calling
+process, without a pool.
+"""
+import functools
+import multiprocessing
+
+
+def imap(obj, method, tasks, processes=None, ordered=False):
+    """Evaluate blocks of work with a method of an object.
+
+    Arguments
+    ---------
+
+        obj : picklable object, sent once to each worker process
+        method : name of the method of `obj` evaluating a block
+        tasks : sequence of (key, args); args is the tuple of
+            arguments of the method
+        processes : number of worker processes (defaults to the
+            number of CPUs; 1 evaluates in this process)
+        ordered : yield the results in the order of the tasks
+
+    Yields (key, result) for each task, in order of completion unless
+    `ordered`.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes == 1:
+        evaluate = getattr(obj, method)
+        for key, args in tasks:
+            yield key, evaluate(*args)
+        return
+    pool = multiprocessing.Pool(processes, _init, (obj,))
+    imap = pool.imap if ordered else pool.imap_unordered
+    try:
+        for result in imap(functools.partial(_evaluate, method), tasks):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+# --------------------------------------------------------------------
+# Internal functions
+# --------------------------------------------------------------------
+# Worker process state; the object evaluating the blocks.
+_obj = None
+
+def _init(obj):
+    global _obj
+    _obj = obj
+
+def _evaluate(method, task):
+    key, args = task
+    return key, getattr(_obj, method)(*args)